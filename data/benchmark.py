@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import transforms as T
+from transforms.calculate_transit_distance import calculate_transit_accessibility
+from transforms.geometry_store import to_geodataframe
+from transforms.synthetic import synthetic_inputs
+
+DEFAULT_SIZES = [10_000, 100_000]
+DEFAULT_REPEAT = 3
+REGRESSION_TOLERANCE = 0.25
+# Differences below these floors are timer and allocator noise, not regressions.
+REGRESSION_MIN_SECONDS = 0.05
+REGRESSION_MIN_BYTES = 4 * 1024 * 1024
+
+
+def _remove_open_space(state):
+    parcels, _ = T.remove_open_space_parcels(state['parcels'], state['public'], state['store'])
+    return parcels
+
+
+def _deduplicate(state):
+    # The key index is built once per run and shared by the later key joins.
+    state['keys'] = T.ParcelKeyIndex(state['raw_parcels'])
+    return T.deduplicate_by_mapblklot(state['raw_parcels'], state['keys'])
+
+
+def _geometry_store(state):
+    store = T.GeometryStore(state['parcels'])
+    # Later stages look these up, so build them here rather than in whichever stage asks first.
+    store.area
+    store.centroid
+    state['store'] = store
+    return state['parcels']
+
+
+def _transit_accessibility(state):
+    parcels_gdf = to_geodataframe(state['parcels'], 'geometry', state['store'])
+    metrics = calculate_transit_accessibility(parcels_gdf, state['transit_stops'])
+    return state['parcels'].assign(**metrics)
+
+
+# Each stage takes the pipeline state and returns the new parcels frame, in
+# the order the build runs them, so every transform sees realistic input.
+STAGES = [
+    ('deduplicate_by_mapblklot', _deduplicate),
+    ('fill_missing_addresses', lambda s: T.fill_missing_addresses(s['parcels'], s['land_use'])),
+    ('merge_model_data', lambda s: T.merge_model_data(s['parcels'], s['model'], s['raw_parcels'], s['keys'])),
+    ('remove_presidio_parcels', lambda s: T.remove_presidio_parcels(s['parcels'])),
+    ('GeometryStore', _geometry_store),
+    ('fill_missing_area', lambda s: T.fill_missing_area(s['parcels'], s['store'])),
+    ('fill_missing_districts', lambda s: T.fill_missing_districts(s['parcels'])),
+    ('fill_res_dummy', lambda s: T.fill_res_dummy(s['parcels'], s['land_use'])),
+    ('fill_building_sqft', lambda s: T.fill_building_sqft(s['parcels'], s['land_use'])),
+    ('fill_zoning_from_spatial_join', lambda s: T.fill_zoning_from_spatial_join(s['parcels'], s['zoning_districts'], s['store'])),
+    ('fill_zp_columns', lambda s: T.fill_zp_columns(s['parcels'])),
+    ('fill_height_from_spatial_join', lambda s: T.fill_height_from_spatial_join(s['parcels'], s['height_bulk'], s['store'])),
+    ('remove_open_space_parcels', _remove_open_space),
+    ('remove_non_housing_parcels', lambda s: T.remove_non_housing_parcels(s['parcels'], s['public'], s['store'])),
+    ('remove_shipyard_parcels', lambda s: T.remove_shipyard_parcels(s['parcels'])),
+    ('fill_envelope', lambda s: T.fill_envelope(s['parcels'])),
+    ('fill_sdb_columns', lambda s: T.fill_sdb_columns(s['parcels'])),
+    ('compute_historic_from_districts', lambda s: T.compute_historic_from_districts(s['parcels'], s['historic_districts'], s['store'])),
+    ('fill_historic_columns', lambda s: T.fill_historic_columns(s['parcels'])),
+    ('calculate_expected_units', lambda s: T.calculate_expected_units(s['parcels'])),
+    ('calculate_transit_accessibility', _transit_accessibility),
+]
+
+
+def run_benchmarks(n, repeat=DEFAULT_REPEAT, seed=0, stages=None):
+    state = synthetic_inputs(n, seed)
+    state['parcels'] = None
+    records = []
+
+    for name, func in STAGES:
+        if stages and name not in stages:
+            state['public'] = T.PublicParcelSet()
+            state['parcels'] = func(state)
+            continue
+
+        seconds = []
+        for _ in range(repeat):
+            # Every repeat starts from the same input; PublicParcelSet is the
+            # only stateful argument, so give each run a fresh one.
+            state['public'] = T.PublicParcelSet()
+            start = time.perf_counter()
+            output = func(state)
+            seconds.append(time.perf_counter() - start)
+
+        tracker = T.MemoryTracker()
+        state['public'] = T.PublicParcelSet()
+        with tracker.track(name):
+            func(state)
+        memory = tracker.records[0]
+
+        records.append({
+            'benchmark': name,
+            'n': n,
+            'rows_in': None if state['parcels'] is None else len(state['parcels']),
+            'rows_out': len(output),
+            'seconds': min(seconds),
+            'allocated_bytes': memory['allocated_bytes'],
+            'peak_rss_bytes': memory['peak_rss_bytes'],
+        })
+        state['parcels'] = output
+
+    return records
+
+
+def run_backends(n, backends, repeat=DEFAULT_REPEAT, seed=0):
+    state = synthetic_inputs(n, seed)
+    labeler = T.parcel_overlay_labeler(state['height_bulk'], state['zoning_districts'], state['historic_districts'])
+    # Shapes and overlay labels are shared by every backend, so build them outside the timings.
+    store = T.GeometryStore(state['raw_parcels'])
+    labeler.labels(store)
+
+    records = []
+    outputs = {}
+    for backend in backends:
+        seconds = []
+        for _ in range(repeat):
+            public = T.PublicParcelSet()
+            start = time.perf_counter()
+            parcels = T.build_model_parcels(state['raw_parcels'], state['model'], state['land_use'], labeler,
+                                            public, store, backend=backend)
+            seconds.append(time.perf_counter() - start)
+        outputs[backend] = parcels, public.to_frame()
+
+        tracker = T.MemoryTracker()
+        with tracker.track(backend):
+            T.build_model_parcels(state['raw_parcels'], state['model'], state['land_use'], labeler,
+                                  T.PublicParcelSet(), store, backend=backend)
+        records.append({
+            'benchmark': f'build_model_parcels[{backend}]',
+            'n': n,
+            'rows_in': len(state['raw_parcels']),
+            'rows_out': len(parcels),
+            'seconds': min(seconds),
+            'allocated_bytes': tracker.records[0]['allocated_bytes'],
+            'peak_rss_bytes': tracker.records[0]['peak_rss_bytes'],
+        })
+    return records, outputs
+
+
+def trace_stages(n, seed=0, memory=True, profile=(), profile_dir=None):
+    state = synthetic_inputs(n, seed)
+    state['parcels'] = None
+    state['public'] = T.PublicParcelSet()
+    with T.Tracer(memory=memory, profile=profile, profile_dir=profile_dir) as tracer:
+        for _, func in STAGES:
+            state['parcels'] = func(state)
+    return tracer
+
+
+def environment():
+    return {
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+    }
+
+
+def find_regressions(records, baseline, tolerance=REGRESSION_TOLERANCE):
+    previous = {(r['benchmark'], r['n']): r for r in baseline['results']}
+    regressions = []
+    for record in records:
+        base = previous.get((record['benchmark'], record['n']))
+        if base is None:
+            continue
+        for metric, floor in [('seconds', REGRESSION_MIN_SECONDS), ('allocated_bytes', REGRESSION_MIN_BYTES)]:
+            current, before = record[metric], base[metric]
+            if current > before * (1 + tolerance) and current - before > floor:
+                regressions.append({
+                    'benchmark': record['benchmark'],
+                    'n': record['n'],
+                    'metric': metric,
+                    'baseline': before,
+                    'current': current,
+                    'ratio': current / before if before else float('inf'),
+                })
+    return regressions
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Time and memory-profile the transforms on synthetic parcels.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help='Parcel counts to benchmark')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help='Timed runs per stage; the fastest is kept')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--stages', nargs='+', help=f'Only report these stages. One of: {", ".join(name for name, _ in STAGES)}')
+    parser.add_argument('--backends', nargs='+', choices=T.MODEL_BACKENDS,
+                        help='Also time build_model_parcels on these backends and check they match pandas')
+    parser.add_argument('--output', help='Write the results to this JSON file')
+    parser.add_argument('--baseline', help='Compare against this saved results file and flag regressions')
+    parser.add_argument('--tolerance', type=float, default=REGRESSION_TOLERANCE, help='Allowed slowdown before flagging')
+    parser.add_argument('--trace', help='Run the stages once more under the tracer and write a Chrome trace to this file')
+    parser.add_argument('--profile', nargs='+', default=[], help='Transforms to cProfile during the traced run')
+    parser.add_argument('--profile-dir', default='profiles', help='Where to write the --profile .prof files')
+    args = parser.parse_args()
+    unknown = [name for name in args.stages or [] if name not in dict(STAGES)]
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(unknown)}")
+    if args.profile and not args.trace:
+        parser.error('--profile needs --trace')
+    return args
+
+
+def main():
+    args = parse_args()
+
+    records = []
+    mismatches = {}
+    for n in args.sizes:
+        print(f'Benchmarking {n:,} parcels...')
+        records.extend(run_benchmarks(n, args.repeat, args.seed, args.stages))
+        if args.backends:
+            backend_records, outputs = run_backends(n, sorted(set(args.backends) | {'pandas'}), args.repeat, args.seed)
+            records.extend(backend_records)
+            mismatches.update({f'{key} at {n:,}': error for key, error in T.backend_mismatches(outputs).items()})
+
+    results = pd.DataFrame(records)
+    results['allocated_mb'] = (results['allocated_bytes'] / 2 ** 20).round(1)
+    print(results[['benchmark', 'n', 'rows_out', 'seconds', 'allocated_mb']].round(4).to_string(index=False))
+
+    if args.trace:
+        n = args.sizes[-1]
+        print(f'\nTracing {n:,} parcels...')
+        tracer = trace_stages(n, args.seed, profile=args.profile, profile_dir=args.profile_dir)
+        tracer.write_chrome_trace(args.trace)
+        print(tracer.summary().round(4).to_string())
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'environment': environment(), 'results': records}, f, indent=2)
+
+    if mismatches:
+        print('\nBACKEND MISMATCHES:')
+        for key, error in mismatches.items():
+            print(f'{key}: {error}')
+        return 1
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = find_regressions(records, json.load(f), args.tolerance)
+        if regressions:
+            print('\nREGRESSIONS:')
+            print(pd.DataFrame(regressions).round(3).to_string(index=False))
+            return 1
+        print('\nNo regressions against the baseline.')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+import argparse
+import os
+import sys
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from transforms import PARCEL_TERM_COLUMNS, GeometryStore, fill_parcel_terms
+from transforms.calculate_transit_distance import load_transit_stops
+from transforms.parcel_bundle import write_parcel_bundle
+from validation.context import MODEL_PATH, OVERLAY_PATH, load_frame
+
+PUBLIC_DATA_DIR = os.path.dirname(MODEL_PATH)
+GEOMETRY_PATH = os.path.join(PUBLIC_DATA_DIR, 'parcels.geojson')
+OUTPUT_PATH = os.path.join(PUBLIC_DATA_DIR, 'parcels.bin')
+TRANSIT_PATHS = [os.path.join(PUBLIC_DATA_DIR, f'transit-{mode}.geojson') for mode in ['bart', 'muni', 'caltrain']]
+
+
+def load_parcels(model_path, overlay_path):
+    model = load_frame(model_path).rename(columns={'BlockLot': 'mapblklot'}).set_index('mapblklot')
+    overlay = load_frame(overlay_path).set_index('mapblklot')
+    # The overlay covers every mapped parcel, the model only the calculable
+    # ones; where both carry a column the model's value is the one scored.
+    parcels = model.assign(in_model=True).combine_first(overlay)
+    parcels['in_model'] = parcels['in_model'].fillna(False).astype(bool)
+    parcels = fill_parcel_terms(parcels)
+    parcels.loc[~parcels['in_model'], PARCEL_TERM_COLUMNS] = np.nan
+    columns = list(model.columns) + PARCEL_TERM_COLUMNS + ['in_model'] + list(overlay.columns.difference(model.columns, sort=False))
+    return parcels[columns].reset_index()
+
+
+def load_geometry_store(geometry_path):
+    geometries = gpd.read_file(geometry_path, columns=['mapblklot'])
+    shapes = pd.DataFrame({'mapblklot': geometries['mapblklot'].astype(str), 'shape': shapely.to_wkb(geometries.geometry.values)})
+    return GeometryStore(shapes)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Write the parcel model and overlay as one binary columnar bundle for the web app.')
+    parser.add_argument('--model', default=MODEL_PATH)
+    parser.add_argument('--overlay', default=OVERLAY_PATH)
+    parser.add_argument('--geometry', default=GEOMETRY_PATH, help='Parcel GeoJSON used for centroids')
+    parser.add_argument('--transit', nargs=3, default=TRANSIT_PATHS, metavar=('BART', 'MUNI', 'CALTRAIN'),
+                        help='Transit stop GeoJSON, used when the overlay has no distance_to_transit')
+    parser.add_argument('--output', default=OUTPUT_PATH)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    parcels = load_parcels(args.model, args.overlay)
+    store = load_geometry_store(args.geometry)
+    transit_stops = None if 'distance_to_transit' in parcels.columns else load_transit_stops(*args.transit)
+
+    size = write_parcel_bundle(parcels, args.output, geometry_store=store, transit_stops=transit_stops)
+    csv_size = os.path.getsize(args.model) + os.path.getsize(args.overlay)
+    print(f'Wrote {len(parcels):,} parcels to {args.output}')
+    print(f'  {size / 2 ** 20:.1f} MB (CSV inputs: {csv_size / 2 ** 20:.1f} MB)')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+import argparse
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from transforms import PARCEL_TERM_COLUMNS, add_model_terms, write_csv
+from validation.context import MODEL_PATH
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Add the precomputed fixed_z and fixed_units terms to the model CSV the web app loads.')
+    parser.add_argument('--model', default=MODEL_PATH)
+    parser.add_argument('--output', help='Where to write the model CSV (default: overwrite --model)')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    output = args.output or args.model
+    model_text = add_model_terms(pd.read_csv(args.model, dtype=str, keep_default_na=False))
+    write_csv(model_text, output)
+    print(f'Wrote {", ".join(PARCEL_TERM_COLUMNS)} for {len(model_text):,} parcels to {output}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -6,13 +6,20 @@ Outputs a GeoJSON file with all unique stops served by:
 - Muni Metro light rail lines: J, K, L, M, N, T
 - F-Market streetcar
 - Route 49 stops on Van Ness Avenue
+
+Feeds can be unzipped directories or the GTFS .zip as downloaded, and other
+agencies (BART, Caltrain) can be extracted in the same run.
 """
 
-import csv
+import argparse
+import io
 import json
 import os
+import zipfile
 from collections import defaultdict
 
+import pandas as pd
+
 # Configuration
 LIGHT_RAIL_ROUTES = ['F', 'J', 'K', 'L', 'M', 'N', 'T']
 VAN_NESS_ROUTE = '49'
@@ -20,54 +27,127 @@ VAN_NESS_FILTER = 'Van Ness'
 GEARY_BRT_ROUTE = '38R'
 GEARY_FILTERS = ['Geary', "O'Farrell", 'Point Lobos']
 
+# stop_times.txt is by far the largest file in a feed, so it is read in
+# chunks of this many rows to keep memory flat regardless of feed size.
+STOP_TIMES_CHUNK_ROWS = 500_000
+
 # File paths (relative to script location)
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
-GTFS_DIR = os.path.join(SCRIPT_DIR, 'muni_gtfs-current')
-TRIPS_FILE = os.path.join(GTFS_DIR, 'trips.txt')
-STOP_TIMES_FILE = os.path.join(GTFS_DIR, 'stop_times.txt')
-STOPS_FILE = os.path.join(GTFS_DIR, 'stops.txt')
-OUTPUT_FILE = os.path.join(SCRIPT_DIR, '..', 'transit-muni.geojson')
+OUTPUT_DIR = os.path.join(SCRIPT_DIR, '..')
+
+# routes=None keeps every route in the feed; corridors applies the Van Ness
+# and Geary relabeling, which only makes sense for Muni route ids.
+AGENCIES = {
+    'muni': {
+        'feed': os.path.join(SCRIPT_DIR, 'muni_gtfs-current'),
+        'routes': LIGHT_RAIL_ROUTES + [VAN_NESS_ROUTE, GEARY_BRT_ROUTE],
+        'corridors': True,
+        'output': os.path.join(OUTPUT_DIR, 'transit-muni.geojson'),
+    },
+    'bart': {
+        'feed': os.path.join(SCRIPT_DIR, 'bart_gtfs-current.zip'),
+        'routes': None,
+        'corridors': False,
+        'output': os.path.join(OUTPUT_DIR, 'transit-bart.geojson'),
+    },
+    'caltrain': {
+        'feed': os.path.join(SCRIPT_DIR, 'caltrain_gtfs-current.zip'),
+        'routes': None,
+        'corridors': False,
+        'output': os.path.join(OUTPUT_DIR, 'transit-caltrain.geojson'),
+    },
+}
+
+
+class GTFSFeed:
+    """Read GTFS tables from an unzipped feed directory or a feed .zip."""
+
+    def __init__(self, path):
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"GTFS feed not found: {path}")
+        self.path = path
+        self.zip = zipfile.ZipFile(path) if zipfile.is_zipfile(path) else None
+
+    def _open(self, name):
+        if self.zip is None:
+            return open(os.path.join(self.path, name), 'rb')
+        # Some agencies nest the tables in a folder inside the archive.
+        members = [m for m in self.zip.namelist() if m == name or m.endswith('/' + name)]
+        if not members:
+            raise FileNotFoundError(f"{name} not found in {self.path}")
+        return self.zip.open(min(members, key=len))
+
+    def read(self, name, columns, chunksize=None):
+        """Read only the given columns of a table as strings, optionally as an iterator of chunks."""
+        handle = self._open(name)
+        # utf-8-sig drops the byte order mark some feeds start with.
+        text = io.TextIOWrapper(handle, encoding='utf-8-sig', newline='')
+        if chunksize is None:
+            with text:
+                return pd.read_csv(text, usecols=columns, dtype=str, keep_default_na=False)
+        reader = pd.read_csv(text, usecols=columns, dtype=str, keep_default_na=False, chunksize=chunksize)
+        return self._chunks(reader, text)
+
+    @staticmethod
+    def _chunks(reader, text):
+        with text, reader:
+            yield from reader
+
+    def close(self):
+        if self.zip is not None:
+            self.zip.close()
 
+    def __enter__(self):
+        return self
 
-def load_trips_for_routes(routes):
-    """Load trip_ids for specified routes, returning dict of trip_id -> route_id."""
-    trip_to_route = {}
-    with open(TRIPS_FILE, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            if row['route_id'] in routes:
-                trip_to_route[row['trip_id']] = row['route_id']
-    return trip_to_route
+    def __exit__(self, *exc):
+        self.close()
 
 
-def load_stops_for_trips(trip_to_route):
+def load_trips_for_routes(feed, routes):
+    """Load trip_ids for specified routes (all routes if None), returning dict of trip_id -> route_id."""
+    trips = feed.read('trips.txt', ['route_id', 'trip_id'])
+    if routes is not None:
+        trips = trips[trips['route_id'].isin(routes)]
+    return dict(zip(trips['trip_id'], trips['route_id']))
+
+
+def load_stops_for_trips(feed, trip_to_route, chunksize=STOP_TIMES_CHUNK_ROWS):
     """Load unique stop_ids for given trips, tracking which routes serve each stop."""
+    trip_ids = pd.Index(list(trip_to_route))
+    route_of_trip = pd.Series(trip_to_route, dtype=str)
+    served = []
+    for chunk in feed.read('stop_times.txt', ['trip_id', 'stop_id'], chunksize=chunksize):
+        chunk = chunk[chunk['trip_id'].isin(trip_ids)]
+        pairs = pd.DataFrame({
+            'stop_id': chunk['stop_id'].to_numpy(),
+            'route_id': route_of_trip.reindex(chunk['trip_id']).to_numpy(),
+        })
+        # A stop sees the same route on every trip, so only distinct pairs are kept.
+        served.append(pairs.drop_duplicates())
+
     stop_to_routes = defaultdict(set)
-    with open(STOP_TIMES_FILE, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            trip_id = row['trip_id']
-            if trip_id in trip_to_route:
-                stop_id = row['stop_id']
-                route_id = trip_to_route[trip_id]
-                stop_to_routes[stop_id].add(route_id)
+    if served:
+        for stop_id, route_id in pd.concat(served).drop_duplicates().itertuples(index=False):
+            stop_to_routes[stop_id].add(route_id)
     return stop_to_routes
 
 
-def load_stop_details(stop_ids):
+def load_stop_details(feed, stop_ids):
     """Load stop details (name, lat, lon) for given stop_ids."""
-    stops = {}
-    with open(STOPS_FILE, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            if row['stop_id'] in stop_ids:
-                stops[row['stop_id']] = {
-                    'stop_id': row['stop_id'],
-                    'stop_name': row['stop_name'].strip(),
-                    'stop_lat': float(row['stop_lat']),
-                    'stop_lon': float(row['stop_lon'])
-                }
-    return stops
+    stops = feed.read('stops.txt', ['stop_id', 'stop_name', 'stop_lat', 'stop_lon'])
+    stops = stops[stops['stop_id'].isin(stop_ids)].drop_duplicates(subset='stop_id', keep='last')
+    return {
+        stop_id: {
+            'stop_id': stop_id,
+            'stop_name': name.strip(),
+            'stop_lat': lat,
+            'stop_lon': lon,
+        }
+        for stop_id, name, lat, lon in zip(
+            stops['stop_id'], stops['stop_name'], stops['stop_lat'].astype(float), stops['stop_lon'].astype(float)
+        )
+    }
 
 
 def filter_and_label_stops(stop_details, stop_to_routes):
@@ -75,7 +155,7 @@ def filter_and_label_stops(stop_details, stop_to_routes):
     filtered_routes = {}
     for stop_id, routes in stop_to_routes.items():
         new_routes = set(routes)
-        
+
         # Van Ness route 49 - only keep stops on Van Ness
         if VAN_NESS_ROUTE in new_routes:
             if stop_id in stop_details:
@@ -85,7 +165,7 @@ def filter_and_label_stops(stop_details, stop_to_routes):
                     new_routes.add('49-VanNess')
                 else:
                     new_routes.discard(VAN_NESS_ROUTE)
-        
+
         # Geary BRT route 38R - only keep stops on Geary corridor
         if GEARY_BRT_ROUTE in new_routes:
             if stop_id in stop_details:
@@ -96,10 +176,10 @@ def filter_and_label_stops(stop_details, stop_to_routes):
                     new_routes.add('38R-Geary')
                 else:
                     new_routes.discard(GEARY_BRT_ROUTE)
-            
+
         if new_routes:
             filtered_routes[stop_id] = new_routes
-            
+
     return filtered_routes
 
 
@@ -125,64 +205,96 @@ def create_geojson(stop_details, stop_to_routes):
             }
         }
         features.append(feature)
-    
+
     return {
         "type": "FeatureCollection",
         "features": features
     }
 
 
-def main():
-    print("Extracting Muni light rail and corridor stops...")
-    
-    # Step 1: Get all trips for target routes
-    all_routes = LIGHT_RAIL_ROUTES + [VAN_NESS_ROUTE, GEARY_BRT_ROUTE]
-    print(f"  Loading trips for routes: {', '.join(all_routes)}")
-    trip_to_route = load_trips_for_routes(all_routes)
-    print(f"  Found {len(trip_to_route)} trips")
-    
-    # Step 2: Get all stops served by these trips
-    print("  Loading stop_times...")
-    stop_to_routes = load_stops_for_trips(trip_to_route)
-    print(f"  Found {len(stop_to_routes)} unique stops")
-    
-    # Step 3: Load stop details
-    print("  Loading stop_details...")
-    stop_details = load_stop_details(set(stop_to_routes.keys()))
-    print(f"  Loaded details for {len(stop_details)} stops")
-    
+def extract_agency(agency, feed_path, routes, corridors, output_path, chunksize=STOP_TIMES_CHUNK_ROWS):
+    """Extract the stops one agency's feed serves on the given routes and write them as GeoJSON."""
+    print(f"Extracting {agency} stops from {feed_path}...")
+
+    with GTFSFeed(feed_path) as feed:
+        # Step 1: Get all trips for target routes
+        print(f"  Loading trips for routes: {', '.join(routes) if routes else 'all'}")
+        trip_to_route = load_trips_for_routes(feed, routes)
+        print(f"  Found {len(trip_to_route)} trips")
+
+        # Step 2: Get all stops served by these trips
+        print("  Loading stop_times...")
+        stop_to_routes = load_stops_for_trips(feed, trip_to_route, chunksize)
+        print(f"  Found {len(stop_to_routes)} unique stops")
+
+        # Step 3: Load stop details
+        print("  Loading stop_details...")
+        stop_details = load_stop_details(feed, set(stop_to_routes.keys()))
+        print(f"  Loaded details for {len(stop_details)} stops")
+
     # Step 4: Filter and relabel stops
-    print("  Filtering and labeling corridor stops...")
-    stop_to_routes = filter_and_label_stops(stop_details, stop_to_routes)
-    
+    if corridors:
+        print("  Filtering and labeling corridor stops...")
+        stop_to_routes = filter_and_label_stops(stop_details, stop_to_routes)
+
     # Final stop count
     print(f"  Final stop count: {len(stop_to_routes)}")
 
-    
     # Step 5: Generate GeoJSON
     print("  Generating GeoJSON...")
     geojson = create_geojson(stop_details, stop_to_routes)
-    
+
     # Step 6: Write output
-    output_path = os.path.normpath(OUTPUT_FILE)
+    output_path = os.path.normpath(output_path)
     with open(output_path, 'w', encoding='utf-8') as f:
         json.dump(geojson, f, indent=2)
     print(f"  Written to: {output_path}")
-    
+
     # Summary
     route_counts = defaultdict(int)
     for routes in stop_to_routes.values():
         for route in routes:
             route_counts[route] += 1
-    
+
     print("\nStops per route:")
     for route in sorted(route_counts.keys()):
         print(f"  {route}: {route_counts[route]} stops")
-    
+
     print(f"\nTotal unique stops: {len(geojson['features'])}")
+    return geojson
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Extract transit stops from GTFS feeds into GeoJSON.')
+    parser.add_argument('agencies', nargs='*', default=['muni'], help=f'Agencies to extract (default: muni). One of: {", ".join(AGENCIES)}')
+    parser.add_argument('--feed', action='append', default=[], metavar='AGENCY=PATH', help='Feed directory or .zip for an agency')
+    parser.add_argument('--chunksize', type=int, default=STOP_TIMES_CHUNK_ROWS, help='stop_times.txt rows read at a time')
+    args = parser.parse_args()
+
+    unknown = [agency for agency in args.agencies if agency not in AGENCIES]
+    if unknown:
+        parser.error(f"unknown agencies: {', '.join(unknown)}")
+
+    args.feeds = {}
+    for value in args.feed:
+        agency, sep, path = value.partition('=')
+        if not sep or agency not in AGENCIES:
+            parser.error(f"--feed expects AGENCY=PATH with AGENCY one of {', '.join(AGENCIES)}, got '{value}'")
+        args.feeds[agency] = path
+    return args
+
+
+def main():
+    args = parse_args()
+
+    for agency in args.agencies:
+        config = AGENCIES[agency]
+        feed_path = args.feeds.get(agency, config['feed'])
+        extract_agency(agency, feed_path, config['routes'], config['corridors'], config['output'], args.chunksize)
+        print()
+
     print("Done!")
 
 
 if __name__ == '__main__':
     main()
-
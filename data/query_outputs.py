@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+import argparse
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from transforms.analytics import ParcelAnalytics, write_pipeline_outputs
+from transforms.calculate_units import macro_scenario
+from validation.context import DATA_DIR, MODEL_PATH, OVERLAY_PATH, load_frame
+
+OUTPUT_DIR = os.path.join(DATA_DIR, 'output', 'analytics')
+EXAMPLE_QUERIES = {
+    'neighborhoods': '''
+        SELECT analysis_neighborhood, count(*) AS parcels,
+               sum(fzp_expected_units_low) AS units_low, sum(fzp_expected_units_high) AS units_high,
+               avg(prob_redev_high) AS mean_prob_high
+        FROM parcels GROUP BY ALL ORDER BY units_high DESC''',
+    'zoning': '''
+        SELECT zoning_code, count(*) AS parcels, avg(prob_redev_high) AS mean_prob_high
+        FROM parcels GROUP BY ALL ORDER BY parcels DESC''',
+    'scenarios': '''
+        SELECT scenario, sum(expected_units) AS expected_units
+        FROM scenarios GROUP BY ALL ORDER BY scenario''',
+}
+
+
+def write_outputs(model_path, overlay_path, output_dir):
+    model = load_frame(model_path).rename(columns={'BlockLot': 'mapblklot'})
+    overlay = load_frame(overlay_path)
+    overlay = overlay[['mapblklot'] + [col for col in overlay.columns if col not in model.columns]]
+    scenarios = [macro_scenario('low'), macro_scenario('high')]
+    return write_pipeline_outputs(model, output_dir, overlay, scenarios)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Query the pipeline outputs with SQL, without loading them into pandas.')
+    parser.add_argument('sql', nargs='?', help=f'SQL to run, or one of: {", ".join(EXAMPLE_QUERIES)}')
+    parser.add_argument('--outputs', default=OUTPUT_DIR, help='Directory of parquet outputs')
+    parser.add_argument('--write', action='store_true', help='First write the outputs from the published model and overlay CSVs')
+    parser.add_argument('--model', default=MODEL_PATH)
+    parser.add_argument('--overlay', default=OVERLAY_PATH)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.write:
+        for name, path in write_outputs(args.model, args.overlay, args.outputs).items():
+            print(f'Wrote {name} to {path}')
+
+    with ParcelAnalytics(args.outputs) as analytics:
+        if not args.sql:
+            for name in analytics.views:
+                print(f"{name:<16} {', '.join(analytics.columns(name))}")
+            return 0
+        sql = EXAMPLE_QUERIES.get(args.sql, args.sql)
+        with pd.option_context('display.max_rows', 200, 'display.width', 200):
+            print(analytics.query(sql))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The scripts put data/ on the path the same way, so tests import transforms as they do.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,26 @@
+import numpy as np
+import pytest
+
+from transforms.calculate_units import PROB_TABLE_TOLERANCE, PROB_TABLE_Z_RANGE, calculate_20_year_prob
+
+PROB_TABLE_CHECK_POINTS = 200_001
+SCENARIOS = ['low', 'high']
+
+
+@pytest.mark.parametrize('scenario', SCENARIOS)
+def test_probability_table_within_tolerance(scenario):
+    # Off-grid points as well as the nodes, where interpolation error peaks.
+    z_min, z_max = PROB_TABLE_Z_RANGE
+    parcel_z = np.linspace(z_min, z_max, PROB_TABLE_CHECK_POINTS)
+    parcel_z = np.concatenate([parcel_z, np.random.default_rng(0).uniform(z_min, z_max, PROB_TABLE_CHECK_POINTS)])
+    fast = calculate_20_year_prob(parcel_z, scenario, fast=True)
+    exact = calculate_20_year_prob(parcel_z, scenario)
+    assert np.abs(fast - exact).max() <= PROB_TABLE_TOLERANCE
+
+
+@pytest.mark.parametrize('scenario', SCENARIOS)
+def test_probability_table_exact_outside_range(scenario):
+    z_min, z_max = PROB_TABLE_Z_RANGE
+    parcel_z = np.array([z_min - 40.0, z_min - 1e-9, z_max + 1e-9, z_max + 40.0])
+    np.testing.assert_array_equal(calculate_20_year_prob(parcel_z, scenario, fast=True),
+                                  calculate_20_year_prob(parcel_z, scenario))
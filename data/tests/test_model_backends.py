@@ -0,0 +1,45 @@
+import os
+
+import pytest
+
+import transforms as T
+from transforms.synthetic import synthetic_inputs
+
+BACKEND_PARITY_PARCELS = 2_000
+INGESTED_INPUTS = ['raw_parcels', 'model', 'land_use']
+
+
+@pytest.fixture(scope='module')
+def ingested(tmp_path_factory):
+    # Synthetic sources written out as CSV and read back with read_input, so
+    # both backends get exactly the frames ingest hands the real build.
+    directory = tmp_path_factory.mktemp('inputs')
+    state = synthetic_inputs(BACKEND_PARITY_PARCELS, typed=False)
+    for name in INGESTED_INPUTS:
+        path = os.path.join(directory, name + '.csv')
+        state[name].to_csv(path, index=False)
+        state[name] = T.read_input(path, cache_dir=str(directory))
+    return state
+
+
+def _build(state, backend, model_df=None):
+    labeler = T.parcel_overlay_labeler(state['height_bulk'], state['zoning_districts'], state['historic_districts'])
+    public = T.PublicParcelSet()
+    model_df = state['model'] if model_df is None else model_df
+    parcels = T.build_model_parcels(state['raw_parcels'], model_df, state['land_use'], labeler, public,
+                                    T.GeometryStore(state['raw_parcels']), backend=backend)
+    return parcels, public.to_frame()
+
+
+def test_backends_match_on_ingested_frames(ingested):
+    pytest.importorskip('polars')
+    outputs = {backend: _build(ingested, backend) for backend in T.MODEL_BACKENDS}
+    assert len(outputs['pandas'][0]) and len(outputs['pandas'][1])
+    assert T.backend_mismatches(outputs) == {}
+
+
+def test_polars_types_text_model_columns(ingested):
+    pytest.importorskip('polars')
+    text_model = T.format_schema(ingested['model'])
+    outputs = {'pandas': _build(ingested, 'pandas'), 'polars': _build(ingested, 'polars', text_model)}
+    assert T.backend_mismatches(outputs) == {}
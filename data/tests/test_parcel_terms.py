@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+import transforms as T
+from transforms.calculate_units import calculate_20_year_prob
+from transforms.synthetic import synthetic_inputs
+
+TERMS_PARITY_PARCELS = 2_000
+UPZONED_HEIGHT_FT = 85
+UPZONED_ENVELOPE_SCALE = 1.7
+
+
+@pytest.fixture(scope='module')
+def model_text():
+    return synthetic_inputs(TERMS_PARITY_PARCELS, typed=False)['model']
+
+
+@pytest.fixture(scope='module')
+def model():
+    return synthetic_inputs(TERMS_PARITY_PARCELS)['model']
+
+
+def _expected_units(parcel_z, units):
+    return {f'fzp_expected_units_{scenario}': calculate_20_year_prob(parcel_z, scenario) * units
+            for scenario in ['low', 'high']}
+
+
+def _assert_matches_model(parcels, fixed_terms):
+    expected = T.calculate_expected_units(parcels)
+    for col, values in _expected_units(*T.combine_parcel_terms(*fixed_terms, *T.calculate_variable_terms(parcels))).items():
+        np.testing.assert_array_equal(values, expected[col].values)
+
+
+def test_split_terms_reproduce_expected_units(model):
+    _assert_matches_model(model, T.calculate_fixed_terms(model))
+
+
+def test_fixed_terms_hold_under_upzoning(model):
+    # The web app keeps the exported fixed terms and recomputes only the
+    # variable ones when a height rule changes.
+    upzoned = model.copy()
+    upzoned['Height_Ft'] = np.maximum(upzoned['Height_Ft'], UPZONED_HEIGHT_FT)
+    for col in ['Env_1000_Area_Height', 'SDB_2016_5Plus_EnvFull']:
+        upzoned[col] = upzoned[col] * UPZONED_ENVELOPE_SCALE
+    upzoned['SDB_2016_5Plus'] = 1
+    _assert_matches_model(upzoned, T.calculate_fixed_terms(model))
+
+
+def test_exported_terms_round_trip(model_text, model):
+    exported = T.add_model_terms(model_text)
+    fixed_terms = [exported[col].astype(float).values for col in T.PARCEL_TERM_COLUMNS]
+    _assert_matches_model(model, fixed_terms)
@@ -1,3 +1,14 @@
+from .geometry_store import GeometryStore
+from .sharded_join import sharded_sjoin
+from .overlay_labels import (
+    HEIGHT_LAYER,
+    ZONING_LAYER,
+    HISTORIC_LAYER,
+    OverlayLabeler,
+    parcel_overlay_labeler,
+)
+from .parcel_keys import ParcelKeyIndex
+from .ingest import NUMERIC_INPUT_COLUMNS, format_dummy, parse_numeric, read_input
 from .clean_parcels import (
     deduplicate_by_mapblklot,
     fill_missing_addresses,
@@ -11,6 +22,7 @@ from .clean_parcels import (
     remove_shipyard_parcels,
     enrich_public_parcels,
 )
+from .coalesce import coalesce_from_lookup
 from .calculate_area import fill_missing_area
 from .fill_districts import (
     PLANNING_TO_DIST,
@@ -24,7 +36,7 @@ from .fill_zoning import (
     fill_zoning_from_spatial_join,
     fill_zp_columns,
 )
-from .fill_height import fill_height_from_spatial_join, remove_open_space_parcels
+from .fill_height import fill_height_from_spatial_join, identify_open_space_parcels, remove_open_space_parcels
 from .calculate_envelope import fill_envelope
 from .fill_sdb_historic import (
     SDB_ZONE_PATTERNS,
@@ -35,5 +47,35 @@ from .fill_sdb_historic import (
     compute_historic_from_districts,
     fill_historic_columns,
 )
-from .calculate_units import calculate_expected_units
-from .calculate_transit_distance import fill_transit_distance
+from .calculate_units import (
+    ProbabilityTable,
+    probability_table,
+    PARCEL_TERM_COLUMNS,
+    calculate_parcel_terms,
+    calculate_fixed_terms,
+    calculate_variable_terms,
+    combine_parcel_terms,
+    fill_parcel_terms,
+    calculate_expected_units,
+    macro_scenario,
+    evaluate_scenarios,
+)
+from .schema import MODEL_SCHEMA, TEXT_EXPORT_SCHEMA, apply_schema, format_schema, write_csv
+from .model_build import MODEL_BACKENDS, backend_mismatches, build_model_parcels, model_stages, spatial_attributes
+from .scoring_session import ScoringSession
+from .height_sweep import SWEEP_HEIGHTS, sweep_blanket_upzoning
+from .memory import MemoryTracker, low_copy, set_low_copy
+from .tracing import Tracer, traced
+from .parcel_bundle import build_parcel_bundle, write_parcel_bundle, read_parcel_bundle, add_model_terms
+from .analytics import OUTPUT_TABLES, ParcelAnalytics, pipeline_tables, write_pipeline_outputs
+from .public_parcels import PublicParcelSet
+from .pipeline import Stage, Pipeline, code_fingerprint
+from .calculate_transit_distance import (
+    NEAREST_STOP_TOLERANCE_FT,
+    TRANSIT_MODES,
+    TRANSIT_RADII_MILES,
+    TransitStopIndex,
+    nearest_transit_stops,
+    calculate_transit_accessibility,
+    fill_transit_distance,
+)
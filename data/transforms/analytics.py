@@ -0,0 +1,215 @@
+import glob
+import os
+
+import numpy as np
+import pandas as pd
+
+from .calculate_units import (
+    FIXED_PROB_FIELDS,
+    MACRO_SCENARIOS,
+    PROB_WEIGHTS,
+    SCENARIO_YEARS,
+    UNITS_WEIGHTS,
+    VARIABLE_PROB_FIELDS,
+    calculate_20_year_prob,
+    calculate_parcel_terms,
+    evaluate_scenarios,
+)
+from .schema import MODEL_SCHEMA, apply_schema
+from .tracing import traced
+
+OUTPUT_KEY = 'mapblklot'
+OUTPUT_TABLES = ['model_inputs', 'scored', 'overlay', 'scenarios']
+SCORED_COLUMNS = [
+    'parcel_z', 'units_if_redev', 'prob_redev_low', 'prob_redev_high', 'fzp_expected_units_low', 'fzp_expected_units_high',
+]
+TERMS_VIEW = 'model_terms'
+PARCELS_VIEW = 'parcels'
+
+
+def _output_path(directory, name):
+    return os.path.join(directory, name + '.parquet')
+
+
+def _without_geometry(df):
+    # Shapes stay in the GeometryStore and the GeoJSON outputs; these tables are for querying attributes.
+    geometry = [col for col in df.columns if df[col].dtype == 'geometry' or col in ('geometry', 'shape')]
+    return pd.DataFrame(df.drop(columns=geometry))
+
+
+def pipeline_tables(parcels_df, overlay_labels=None, scenarios=None, fast=False):
+    model_cols = [col for col in MODEL_SCHEMA if col in parcels_df.columns]
+    keys = parcels_df[OUTPUT_KEY].to_numpy()
+    tables = {'model_inputs': apply_schema(parcels_df[[OUTPUT_KEY] + model_cols]).reset_index(drop=True)}
+
+    parcel_z, units = calculate_parcel_terms(parcels_df)
+    prob_low = calculate_20_year_prob(parcel_z, 'low', fast)
+    prob_high = calculate_20_year_prob(parcel_z, 'high', fast)
+    tables['scored'] = pd.DataFrame({
+        OUTPUT_KEY: keys,
+        'parcel_z': parcel_z,
+        'units_if_redev': units,
+        'prob_redev_low': prob_low,
+        'prob_redev_high': prob_high,
+        'fzp_expected_units_low': prob_low * units,
+        'fzp_expected_units_high': prob_high * units,
+    })
+
+    if overlay_labels is not None:
+        overlay = _without_geometry(overlay_labels)
+        if OUTPUT_KEY not in overlay.columns:
+            overlay = overlay.rename_axis(OUTPUT_KEY).reset_index()
+        tables['overlay'] = overlay.reset_index(drop=True)
+
+    if scenarios:
+        # Long form, one row per parcel and scenario, so a scenario is a filter rather than a column.
+        expected = evaluate_scenarios(parcels_df, scenarios, per_parcel=True)
+        names = [str(name) for name in expected.columns]
+        tables['scenarios'] = pd.DataFrame({
+            OUTPUT_KEY: np.repeat(keys, len(names)),
+            'scenario': pd.Categorical(np.tile(names, len(keys)), categories=list(dict.fromkeys(names))),
+            'expected_units': expected.to_numpy().ravel(),
+        })
+    return tables
+
+
+def write_table(df, path):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    table = pa.Table.from_pandas(_without_geometry(df), preserve_index=False)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = path + '.tmp'
+    pq.write_table(table, tmp_path, compression='zstd')
+    os.replace(tmp_path, path)
+    return path
+
+
+@traced
+def write_pipeline_outputs(parcels_df, directory, overlay_labels=None, scenarios=None, fast=False):
+    tables = pipeline_tables(parcels_df, overlay_labels, scenarios, fast)
+    return {name: write_table(df, _output_path(directory, name)) for name, df in tables.items()}
+
+
+def _literal(value):
+    # A bare 0.0017 is a DECIMAL in DuckDB; going through the string keeps
+    # every weight the exact double the numpy path uses.
+    return f"'{float(value)!r}'::DOUBLE"
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _weighted_sum_sql(fields, columns):
+    # Summed in the same order as calculate_units, so the terms round the same way.
+    total = '0.0::DOUBLE'
+    for field in fields:
+        if field in columns:
+            total = f'({total} + {_literal(PROB_WEIGHTS[field])} * coalesce({_quote(field)}::DOUBLE, 0))'
+    return total
+
+
+def _column_sql(field, columns):
+    return f'coalesce({_quote(field)}::DOUBLE, 0)' if field in columns else '0.0::DOUBLE'
+
+
+def _prob_20_year_sql(scenario):
+    price_key = 'priceHigh' if scenario == 'high' else 'priceLow'
+    not_developed = '1.0::DOUBLE'
+    for year in SCENARIO_YEARS:
+        macro = MACRO_SCENARIOS[year]
+        macro_z = PROB_WEIGHTS['Intercept'] + PROB_WEIGHTS['Const_Costs_Real'] * macro['costs'] + PROB_WEIGHTS['Zillow_Price_Real'] * macro[price_key]
+        not_developed = f'({not_developed} * (1 - fzp_logistic({_literal(macro_z)} + parcel_z)))'
+    return f'1 - {not_developed}'
+
+
+def model_macros():
+    intercept, costs, price = (_literal(PROB_WEIGHTS[name]) for name in ['Intercept', 'Const_Costs_Real', 'Zillow_Price_Real'])
+    return [
+        'CREATE OR REPLACE MACRO fzp_logistic(z) AS 1 / (1 + exp(-z))',
+        f'CREATE OR REPLACE MACRO fzp_annual_z(parcel_z, costs, price) AS {intercept} + {costs} * costs + {price} * price + parcel_z',
+        'CREATE OR REPLACE MACRO fzp_annual_prob(parcel_z, costs, price) AS fzp_logistic(fzp_annual_z(parcel_z, costs, price))',
+        f"CREATE OR REPLACE MACRO fzp_prob_20yr(parcel_z, scenario) AS "
+        f"CASE WHEN scenario = 'high' THEN {_prob_20_year_sql('high')} ELSE {_prob_20_year_sql('low')} END",
+        'CREATE OR REPLACE MACRO fzp_expected_units(parcel_z, units, scenario) AS fzp_prob_20yr(parcel_z, scenario) * units',
+    ]
+
+
+def model_terms_sql(source, columns):
+    fixed_z = _weighted_sum_sql(FIXED_PROB_FIELDS, columns)
+    variable_z = _weighted_sum_sql(VARIABLE_PROB_FIELDS, columns)
+    fixed_units = f"({_literal(UNITS_WEIGHTS['Intercept'])} + {_literal(UNITS_WEIGHTS['Zoning_DR_EnvFull'])} * {_column_sql('Zoning_DR_EnvFull', columns)})"
+    variable_units = (
+        f"({_literal(UNITS_WEIGHTS['Env_1000_Area_Height'])} * {_column_sql('Env_1000_Area_Height', columns)} + "
+        f"{_literal(UNITS_WEIGHTS['SDB_2016_5Plus_EnvFull'])} * {_column_sql('SDB_2016_5Plus_EnvFull', columns)})"
+    )
+    return (
+        f'SELECT {_quote(OUTPUT_KEY)}, {fixed_z} + {variable_z} AS parcel_z, '
+        f'greatest(0, {variable_units} + {fixed_units}) AS units_if_redev FROM {_quote(source)}'
+    )
+
+
+# An in-process DuckDB database over the pipeline's parquet outputs. Every
+# table in the directory becomes a view of the same name, read straight from
+# the files, so queries only touch the columns and row groups they need.
+# model_terms recomputes parcel_z and units from model_inputs, parcels joins
+# the tables on mapblklot, and the fzp_* macros score any z against the macro
+# scenarios, so what-ifs run in SQL without a round trip through pandas.
+class ParcelAnalytics:
+    def __init__(self, directory=None, database=':memory:', threads=None):
+        import duckdb
+
+        self.connection = duckdb.connect(database)
+        if threads is not None:
+            self.connection.execute(f'SET threads = {int(threads)}')
+        for statement in model_macros():
+            self.connection.execute(statement)
+        self.views = []
+        if directory is not None:
+            for path in sorted(glob.glob(os.path.join(directory, '*.parquet'))):
+                self.add_view(os.path.splitext(os.path.basename(path))[0], path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.connection.close()
+
+    def columns(self, name):
+        return [row[0] for row in self.connection.execute(f'DESCRIBE {_quote(name)}').fetchall()]
+
+    def add_view(self, name, path):
+        self.connection.execute(f"CREATE OR REPLACE VIEW {_quote(name)} AS SELECT * FROM read_parquet('{path.replace(chr(39), chr(39) * 2)}')")
+        return self._view_added(name)
+
+    def register(self, name, df):
+        self.connection.register(name, _without_geometry(df))
+        return self._view_added(name)
+
+    def _view_added(self, name):
+        if name not in self.views:
+            self.views.append(name)
+        if name == 'model_inputs':
+            self.connection.execute(f'CREATE OR REPLACE VIEW {TERMS_VIEW} AS {model_terms_sql(name, self.columns(name))}')
+        self._update_parcels_view()
+        return self
+
+    def _update_parcels_view(self):
+        tables = [name for name in ['model_inputs', 'scored', 'overlay'] if name in self.views]
+        if not tables:
+            return
+        seen = set()
+        selects = []
+        for name in tables:
+            columns = [col for col in self.columns(name) if col not in seen]
+            seen.update(columns)
+            selects.extend(f'{_quote(name)}.{_quote(col)}' for col in columns)
+        joins = ' '.join(f'LEFT JOIN {_quote(name)} USING ({_quote(OUTPUT_KEY)})' for name in tables[1:])
+        self.connection.execute(f'CREATE OR REPLACE VIEW {PARCELS_VIEW} AS SELECT {", ".join(selects)} FROM {_quote(tables[0])} {joins}')
+
+    def query(self, sql, params=None):
+        return self.connection.execute(sql, params).df()
@@ -1,25 +1,23 @@
-import geopandas as gpd
-from shapely import wkt
+from .geometry_store import GeometryStore
+from .ingest import parse_numeric, format_like
+from .memory import working_copy
+from .tracing import traced
 
 
-def fill_missing_area(parcels_df):
-    result = parcels_df.copy()
+@traced
+def fill_missing_area(parcels_df, geometry_store=None):
+    result = working_copy(parcels_df)
 
     missing_area_mask = result['Shape_Area_SqFt'].isna()
 
-    missing_gdf = gpd.GeoDataFrame(
-        result[missing_area_mask],
-        geometry=result.loc[missing_area_mask, 'shape'].apply(wkt.loads),
-        crs='EPSG:4326'
-    ).to_crs('EPSG:2227')
+    store = geometry_store if geometry_store is not None else GeometryStore(result[missing_area_mask])
+    missing_area = store.lookup('area', result.loc[missing_area_mask, 'mapblklot'])
+    result.loc[missing_area_mask, 'Shape_Area_SqFt'] = format_like(result['Shape_Area_SqFt'], missing_area)
 
-    area_lookup = missing_gdf.geometry.area.to_dict()
-    result.loc[missing_area_mask, 'Shape_Area_SqFt'] = result.loc[missing_area_mask].index.map(area_lookup).astype(str)
-
-    result['Shape_Area_SqFt_numeric'] = result['Shape_Area_SqFt'].str.replace(',', '').astype(float)
+    result['Shape_Area_SqFt_numeric'] = parse_numeric(result['Shape_Area_SqFt'])
 
     missing_area_1000_mask = result['Area_1000'].isna()
-    result.loc[missing_area_1000_mask, 'Area_1000'] = (result.loc[missing_area_1000_mask, 'Shape_Area_SqFt_numeric'] / 1000).astype(str)
+    result.loc[missing_area_1000_mask, 'Area_1000'] = format_like(result['Area_1000'], result.loc[missing_area_1000_mask, 'Shape_Area_SqFt_numeric'] / 1000)
 
     result = result.drop(columns=['Shape_Area_SqFt_numeric'])
 
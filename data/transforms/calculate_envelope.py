@@ -1,10 +1,16 @@
+from .ingest import parse_numeric, format_like
+from .memory import working_copy
+from .tracing import traced
+
+
+@traced
 def fill_envelope(parcels_df):
-    result = parcels_df.copy()
+    result = working_copy(parcels_df)
 
     missing_env_mask = result['Env_1000_Area_Height'].isna()
 
-    area_numeric = result.loc[missing_env_mask, 'Area_1000'].str.replace(',', '').astype(float)
-    height_numeric = result.loc[missing_env_mask, 'Height_Ft'].str.replace(',', '').astype(float)
-    result.loc[missing_env_mask, 'Env_1000_Area_Height'] = (area_numeric * height_numeric / 10).astype(str)
+    area_numeric = parse_numeric(result.loc[missing_env_mask, 'Area_1000'])
+    height_numeric = parse_numeric(result.loc[missing_env_mask, 'Height_Ft'])
+    result.loc[missing_env_mask, 'Env_1000_Area_Height'] = format_like(result['Env_1000_Area_Height'], area_numeric * height_numeric / 10)
 
     return result
@@ -1,30 +1,67 @@
 import pandas as pd
 import geopandas as gpd
 import numpy as np
-from shapely.geometry import Point
+import shapely
+from scipy.spatial import cKDTree
+
+from .memory import working_copy
+from .tracing import traced
+
+EARTH_RADIUS_MILES = 3958.8
+FEET_PER_MILE = 5280
+
+# Distances from TransitStopIndex agree with haversine_distance_ft to within
+# this many feet. The index searches on unit-sphere chords, which are
+# monotonic in great-circle distance, so the nearest stop is exact and only
+# float rounding separates the two distance formulas.
+NEAREST_STOP_TOLERANCE_FT = 1e-6
+
+TRANSIT_MODES = ['bart', 'muni', 'caltrain']
+TRANSIT_MODE_LABELS = {'bart': 'BART', 'muni': 'Muni', 'caltrain': 'Caltrain'}
+TRANSIT_RADII_MILES = {'quarter_mile': 0.25, 'half_mile': 0.5, 'one_mile': 1.0}
 
 
 def haversine_distance_ft(lat1, lon1, lat2, lon2):
-    R = 3958.8
+    R = EARTH_RADIUS_MILES
     dLat = np.radians(lat2 - lat1)
     dLon = np.radians(lon2 - lon1)
     a = np.sin(dLat / 2) ** 2 + np.cos(np.radians(lat1)) * np.cos(np.radians(lat2)) * np.sin(dLon / 2) ** 2
     c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
-    return R * c * 5280
+    return R * c * FEET_PER_MILE
+
+
+def _to_unit_vectors(lat, lon):
+    lat_rad = np.radians(np.asarray(lat, dtype=float))
+    lon_rad = np.radians(np.asarray(lon, dtype=float))
+    cos_lat = np.cos(lat_rad)
+    return np.column_stack([cos_lat * np.cos(lon_rad), cos_lat * np.sin(lon_rad), np.sin(lat_rad)])
+
+
+def _chord_to_ft(chord):
+    return 2 * np.arcsin(np.clip(chord / 2, 0, 1)) * EARTH_RADIUS_MILES * FEET_PER_MILE
+
+
+def _ft_to_chord(distance_ft):
+    return 2 * np.sin(distance_ft / (EARTH_RADIUS_MILES * FEET_PER_MILE) / 2)
 
 
 def load_transit_stops(bart_path, muni_path, caltrain_path):
-    bart = gpd.read_file(bart_path)
-    muni = gpd.read_file(muni_path)
-    caltrain = gpd.read_file(caltrain_path)
+    paths = {'bart': bart_path, 'muni': muni_path, 'caltrain': caltrain_path}
 
-    stops = []
-    for gdf in [bart, muni, caltrain]:
-        for _, row in gdf.iterrows():
-            coords = row.geometry.coords[0]
-            stops.append({'lon': coords[0], 'lat': coords[1]})
+    frames = []
+    for mode, path in paths.items():
+        gdf = gpd.read_file(path)
+        id_col = 'stop_id' if 'stop_id' in gdf.columns else 'Name'
+        routes = gdf['routes'].values if 'routes' in gdf.columns else TRANSIT_MODE_LABELS[mode]
+        frames.append(pd.DataFrame({
+            'stop_id': gdf[id_col].astype(str).values,
+            'mode': mode,
+            'routes': routes,
+            'lon': gdf.geometry.x.values,
+            'lat': gdf.geometry.y.values,
+        }))
 
-    return pd.DataFrame(stops)
+    return pd.concat(frames, ignore_index=True)
 
 
 def get_centroid(geometry):
@@ -34,31 +71,103 @@ def get_centroid(geometry):
     return centroid.y, centroid.x
 
 
-def calculate_transit_distances(parcels_gdf, transit_stops_df):
-    distances = []
-    stop_coords = transit_stops_df[['lat', 'lon']].values
+def get_centroids(parcels_gdf):
+    centroids = shapely.centroid(np.asarray(parcels_gdf.geometry.values, dtype=object))
+    return shapely.get_y(centroids), shapely.get_x(centroids)
+
+
+class TransitStopIndex:
+    def __init__(self, transit_stops_df):
+        self.stops = transit_stops_df.reset_index(drop=True)
+        if 'stop_id' not in self.stops.columns:
+            self.stops['stop_id'] = transit_stops_df.index.to_numpy()
+        self.stop_ids = self.stops['stop_id'].to_numpy()
+        self.points = _to_unit_vectors(self.stops['lat'], self.stops['lon'])
+        self.tree = cKDTree(self.points)
+
+        self.mode_trees = {}
+        if 'mode' in self.stops.columns:
+            for mode, positions in self.stops.groupby('mode').indices.items():
+                self.mode_trees[mode] = (cKDTree(self.points[positions]), positions)
 
-    for idx, row in parcels_gdf.iterrows():
-        lat, lon = get_centroid(row.geometry)
-        if lat is None:
-            distances.append(np.inf)
-            continue
+    def _nearest_positions(self, points, mode=None):
+        if mode is None:
+            tree, positions = self.tree, None
+        else:
+            tree, positions = self.mode_trees[mode]
+        chord, idx = tree.query(points)
+        return _chord_to_ft(chord), idx if positions is None else positions[idx]
 
-        min_dist = np.inf
-        for stop_lat, stop_lon in stop_coords:
-            dist = haversine_distance_ft(lat, lon, stop_lat, stop_lon)
-            if dist < min_dist:
-                min_dist = dist
+    def nearest(self, lat, lon, mode=None):
+        lat = np.asarray(lat, dtype=float)
+        lon = np.asarray(lon, dtype=float)
+        valid = ~(np.isnan(lat) | np.isnan(lon))
 
-        distances.append(min_dist)
+        distances = np.full(len(lat), np.inf)
+        stop_ids = np.full(len(lat), None, dtype=object)
+        if valid.any() and self.tree.n > 0 and (mode is None or mode in self.mode_trees):
+            distances[valid], positions = self._nearest_positions(_to_unit_vectors(lat[valid], lon[valid]), mode)
+            stop_ids[valid] = self.stop_ids[positions]
 
+        return distances, stop_ids
+
+    def count_within(self, lat, lon, radius_ft):
+        lat = np.asarray(lat, dtype=float)
+        lon = np.asarray(lon, dtype=float)
+        valid = ~(np.isnan(lat) | np.isnan(lon))
+
+        counts = np.zeros(len(lat), dtype=int)
+        if valid.any() and self.tree.n > 0:
+            counts[valid] = self.tree.query_ball_point(
+                _to_unit_vectors(lat[valid], lon[valid]), _ft_to_chord(radius_ft), return_length=True
+            )
+        return counts
+
+
+def nearest_transit_stops(parcels_gdf, transit_stops_df):
+    lat, lon = get_centroids(parcels_gdf)
+    return TransitStopIndex(transit_stops_df).nearest(lat, lon)
+
+
+def calculate_transit_distances(parcels_gdf, transit_stops_df):
+    distances, _ = nearest_transit_stops(parcels_gdf, transit_stops_df)
     return distances
 
 
-def fill_transit_distance(parcels_gdf, bart_path, muni_path, caltrain_path):
+def calculate_transit_accessibility(parcels_gdf, transit_stops_df):
+    lat, lon = get_centroids(parcels_gdf)
+    index = TransitStopIndex(transit_stops_df)
+
+    metrics = {}
+    distances, stop_ids = index.nearest(lat, lon)
+    metrics['distance_to_transit'] = distances
+    metrics['nearest_transit_stop_id'] = stop_ids
+    metrics['nearest_transit_routes'] = pd.Series(stop_ids).map(
+        index.stops.drop_duplicates(subset='stop_id').set_index('stop_id')['routes']
+    ).values
+
+    for mode in TRANSIT_MODES:
+        metrics[f'distance_to_{mode}'], _ = index.nearest(lat, lon, mode=mode)
+
+    for label, radius_miles in TRANSIT_RADII_MILES.items():
+        metrics[f'transit_stops_within_{label}'] = index.count_within(lat, lon, radius_miles * FEET_PER_MILE)
+
+    return pd.DataFrame(metrics, index=parcels_gdf.index)
+
+
+@traced
+def fill_transit_distance(parcels_gdf, bart_path, muni_path, caltrain_path, accessibility=False):
     transit_stops = load_transit_stops(bart_path, muni_path, caltrain_path)
-    distances = calculate_transit_distances(parcels_gdf, transit_stops)
-    parcels_gdf = parcels_gdf.copy()
-    parcels_gdf['distance_to_transit'] = distances
-    parcels_gdf.loc[parcels_gdf['distance_to_transit'] == np.inf, 'distance_to_transit'] = pd.NA
+    parcels_gdf = working_copy(parcels_gdf)
+
+    if accessibility:
+        metrics = calculate_transit_accessibility(parcels_gdf, transit_stops)
+    else:
+        distances, stop_ids = nearest_transit_stops(parcels_gdf, transit_stops)
+        metrics = pd.DataFrame({'distance_to_transit': distances, 'nearest_transit_stop_id': stop_ids}, index=parcels_gdf.index)
+
+    for col in metrics.columns:
+        parcels_gdf[col] = metrics[col]
+        if col.startswith('distance_to_'):
+            parcels_gdf.loc[parcels_gdf[col] == np.inf, col] = pd.NA
     return parcels_gdf
@@ -1,6 +1,12 @@
+from functools import lru_cache
+
 import numpy as np
 import pandas as pd
 
+from .ingest import parse_numeric
+from .memory import working_copy
+from .tracing import traced
+
 PROB_WEIGHTS = {
     'Intercept': -1.6226,
     'Height_Ft': 0.0017,
@@ -66,6 +72,14 @@ MACRO_SCENARIOS = {
     2045: {'costs': 112.723, 'priceLow': 105.092, 'priceHigh': 184.355}
 }
 
+SCENARIO_YEARS = list(range(2026, 2046))
+SCENARIO_OVERRIDE_FIELDS = ['Height_Ft', 'Env_1000_Area_Height', 'SDB_2016_5Plus', 'SDB_2016_5Plus_EnvFull']
+SCENARIO_CHUNK_ELEMENTS = 2 ** 24
+
+PROB_TABLE_Z_RANGE = (-25.0, 25.0)
+PROB_TABLE_TOLERANCE = 1e-6
+PROB_TABLE_INITIAL_POINTS = 4097
+
 PARCEL_FIELDS = [
     'Height_Ft', 'Area_1000', 'Env_1000_Area_Height', 'Bldg_SqFt_1000',
     'Res_Dummy', 'Historic', 'SDB_2016_5Plus',
@@ -77,11 +91,17 @@ PARCEL_FIELDS = [
     'DIST_Marina', 'DIST_Mission'
 ]
 
+# Terms the web app changes when it applies a height rule. Everything else is
+# fixed per parcel and is exported precomputed as fixed_z and fixed_units.
+VARIABLE_PROB_FIELDS = ['Height_Ft', 'Env_1000_Area_Height', 'SDB_2016_5Plus']
+FIXED_PROB_FIELDS = [field for field in PARCEL_FIELDS if field not in VARIABLE_PROB_FIELDS]
+PARCEL_TERM_COLUMNS = ['fixed_z', 'fixed_units']
+
 
 def _to_numeric_series(series):
-    if series.dtype == object:
-        return pd.to_numeric(series.str.replace(',', ''), errors='coerce').fillna(0)
-    return pd.to_numeric(series, errors='coerce').fillna(0)
+    # Numbers a fill wrote into a text column count like the strings around
+    # them, as they do when the web app parses the model CSV.
+    return parse_numeric(series, errors='coerce').fillna(0)
 
 
 def _calc_20_year_prob_vectorized(parcel_z, scenario):
@@ -95,25 +115,171 @@ def _calc_20_year_prob_vectorized(parcel_z, scenario):
     return 1 - prob_not_developed
 
 
-def calculate_expected_units(parcels_df):
-    result = parcels_df.copy()
+class ProbabilityTable:
+    def __init__(self, scenario, z_range=PROB_TABLE_Z_RANGE, tolerance=PROB_TABLE_TOLERANCE):
+        self.scenario = scenario
+        self.z_min, self.z_max = z_range
+        self.tolerance = tolerance
+
+        n_points = PROB_TABLE_INITIAL_POINTS
+        while True:
+            grid, self.step = np.linspace(self.z_min, self.z_max, n_points, retstep=True)
+            self.table = _calc_20_year_prob_vectorized(grid, scenario)
+            midpoints = grid[:-1] + self.step / 2
+            interpolated = (self.table[:-1] + self.table[1:]) / 2
+            self.max_error = np.abs(interpolated - _calc_20_year_prob_vectorized(midpoints, scenario)).max()
+            if self.max_error <= tolerance:
+                break
+            n_points = 2 * n_points - 1
+
+    def __call__(self, parcel_z):
+        parcel_z = np.asarray(parcel_z, dtype=float)
+        position = (np.clip(parcel_z, self.z_min, self.z_max) - self.z_min) / self.step
+        lower = np.minimum(position.astype(int), len(self.table) - 2)
+        fraction = position - lower
+        prob = self.table[lower] + fraction * (self.table[lower + 1] - self.table[lower])
+
+        outside = (parcel_z < self.z_min) | (parcel_z > self.z_max)
+        if outside.any():
+            prob[outside] = _calc_20_year_prob_vectorized(parcel_z[outside], self.scenario)
+        return prob
+
+
+@lru_cache(maxsize=None)
+def probability_table(scenario):
+    return ProbabilityTable(scenario)
+
+
+def _weighted_sum(parcels_df, fields):
+    total = np.zeros(len(parcels_df))
+    for field in fields:
+        if field in parcels_df.columns:
+            total += PROB_WEIGHTS[field] * _to_numeric_series(parcels_df[field]).values
+    return total
+
+
+def calculate_fixed_terms(parcels_df):
+    fixed_z = _weighted_sum(parcels_df, FIXED_PROB_FIELDS)
+    zoning_dr = _to_numeric_series(parcels_df['Zoning_DR_EnvFull']).values
+    fixed_units = UNITS_WEIGHTS['Intercept'] + UNITS_WEIGHTS['Zoning_DR_EnvFull'] * zoning_dr
+    return fixed_z, fixed_units
+
+
+def calculate_variable_terms(parcels_df):
+    variable_z = _weighted_sum(parcels_df, VARIABLE_PROB_FIELDS)
+    env = _to_numeric_series(parcels_df['Env_1000_Area_Height']).values
+    sdb_env = _to_numeric_series(parcels_df['SDB_2016_5Plus_EnvFull']).values
+    variable_units = UNITS_WEIGHTS['Env_1000_Area_Height'] * env + UNITS_WEIGHTS['SDB_2016_5Plus_EnvFull'] * sdb_env
+    return variable_z, variable_units
+
+
+def combine_parcel_terms(fixed_z, fixed_units, variable_z, variable_units):
+    # unitCalculator.js recombines in this same order, so the browser's sums
+    # round the same way as the pipeline's.
+    return fixed_z + variable_z, np.maximum(0, variable_units + fixed_units)
+
 
-    parcel_z = np.zeros(len(result))
-    for field in PARCEL_FIELDS:
-        if field in result.columns:
-            parcel_z += PROB_WEIGHTS[field] * _to_numeric_series(result[field]).values
+def calculate_parcel_terms(parcels_df):
+    return combine_parcel_terms(*calculate_fixed_terms(parcels_df), *calculate_variable_terms(parcels_df))
 
-    env = _to_numeric_series(result['Env_1000_Area_Height']).values
-    sdb_env = _to_numeric_series(result['SDB_2016_5Plus_EnvFull']).values
-    zoning_dr = _to_numeric_series(result['Zoning_DR_EnvFull']).values
 
-    units = UNITS_WEIGHTS['Env_1000_Area_Height'] * env + UNITS_WEIGHTS['SDB_2016_5Plus_EnvFull'] * sdb_env + UNITS_WEIGHTS['Zoning_DR_EnvFull'] * zoning_dr
-    units = np.maximum(0, units)
+@traced
+def fill_parcel_terms(parcels_df):
+    result = working_copy(parcels_df)
+    result['fixed_z'], result['fixed_units'] = calculate_fixed_terms(result)
+    return result
+
+
+def calculate_20_year_prob(parcel_z, scenario, fast=False):
+    if fast:
+        return probability_table(scenario)(parcel_z)
+    return _calc_20_year_prob_vectorized(parcel_z, scenario)
+
+
+@traced
+def calculate_expected_units(parcels_df, fast=False):
+    result = working_copy(parcels_df)
+    parcel_z, units = calculate_parcel_terms(result)
 
-    prob_low = _calc_20_year_prob_vectorized(parcel_z, 'low')
-    prob_high = _calc_20_year_prob_vectorized(parcel_z, 'high')
+    prob_low = calculate_20_year_prob(parcel_z, 'low', fast)
+    prob_high = calculate_20_year_prob(parcel_z, 'high', fast)
 
     result['fzp_expected_units_low'] = prob_low * units
     result['fzp_expected_units_high'] = prob_high * units
 
     return result
+
+
+def macro_scenario(scenario):
+    price_key = 'priceHigh' if scenario == 'high' else 'priceLow'
+    return {
+        'name': scenario,
+        'costs': [MACRO_SCENARIOS[year]['costs'] for year in SCENARIO_YEARS],
+        'prices': [MACRO_SCENARIOS[year][price_key] for year in SCENARIO_YEARS],
+    }
+
+
+def _field_values(parcels_df, field):
+    if field in parcels_df.columns:
+        return _to_numeric_series(parcels_df[field]).values
+    return np.zeros(len(parcels_df))
+
+
+def _override_values(parcels_df, value):
+    if isinstance(value, pd.Series):
+        value = _to_numeric_series(value.reindex(parcels_df.index)).values
+    return np.broadcast_to(np.asarray(value, dtype=float), (len(parcels_df),))
+
+
+@traced
+def evaluate_scenarios(parcels_df, scenarios, group_by=None, per_parcel=False):
+    n_parcels = len(parcels_df)
+    n_scenarios = len(scenarios)
+    names = [scenario.get('name', i) for i, scenario in enumerate(scenarios)]
+
+    costs = np.array([scenario['costs'] for scenario in scenarios], dtype=float)
+    prices = np.array([scenario['prices'] for scenario in scenarios], dtype=float)
+    if costs.ndim != 2 or costs.shape != prices.shape:
+        raise ValueError('Every scenario needs cost and price paths of the same length')
+    macro_z = PROB_WEIGHTS['Intercept'] + PROB_WEIGHTS['Const_Costs_Real'] * costs + PROB_WEIGHTS['Zillow_Price_Real'] * prices
+
+    fixed_z, fixed_units = calculate_fixed_terms(parcels_df)
+    base_fields = pd.DataFrame({field: _field_values(parcels_df, field) for field in SCENARIO_OVERRIDE_FIELDS}, index=parcels_df.index)
+    base_variable = calculate_variable_terms(base_fields)
+
+    parcel_z_k = np.empty((n_parcels, n_scenarios))
+    units_k = np.empty((n_parcels, n_scenarios))
+    for k, scenario in enumerate(scenarios):
+        overrides = scenario.get('overrides', {})
+        variable = base_variable
+        if overrides:
+            fields = base_fields.copy()
+            for field, value in overrides.items():
+                if field not in SCENARIO_OVERRIDE_FIELDS:
+                    raise ValueError(f"Cannot override '{field}', expected one of {SCENARIO_OVERRIDE_FIELDS}")
+                fields[field] = _override_values(parcels_df, value)
+            variable = calculate_variable_terms(fields)
+        # Recombined like calculate_parcel_terms, so a scenario rounds exactly
+        # as scoring the overridden parcels would.
+        parcel_z_k[:, k], units_k[:, k] = combine_parcel_terms(fixed_z, fixed_units, *variable)
+
+    expected = np.empty((n_parcels, n_scenarios))
+    chunk = max(1, SCENARIO_CHUNK_ELEMENTS // max(1, macro_z.size))
+    for start in range(0, n_parcels, chunk):
+        stop = start + chunk
+        z = parcel_z_k[start:stop, :, None] + macro_z[None, :, :]
+        prob = 1 - np.prod(1 - 1 / (1 + np.exp(-z)), axis=2)
+        expected[start:stop] = prob * units_k[start:stop]
+
+    expected = pd.DataFrame(expected, index=parcels_df.index, columns=names)
+    if per_parcel:
+        return expected
+    if group_by is not None:
+        return expected.groupby(parcels_df[group_by]).sum()
+
+    summary = pd.DataFrame({
+        'expected_units': expected.sum(),
+        'units_if_redeveloped': units_k.sum(axis=0),
+    })
+    summary.index.name = 'scenario'
+    return summary
@@ -1,59 +1,65 @@
+import numpy as np
 import pandas as pd
 
+from .code_tables import map_unique
+from .coalesce import coalesce_from_lookup
+from .parcel_keys import ParcelKeyIndex
+from .tracing import traced
 
-def deduplicate_by_mapblklot(parcels_df):
-    blklots_agg = parcels_df.groupby('mapblklot')['blklot'].apply(lambda x: ','.join(sorted(x))).reset_index()
-    blklots_agg.columns = ['mapblklot', 'blklots']
 
-    result = parcels_df.drop_duplicates(subset='mapblklot', keep='first')
-    result = result.drop(columns=['blklot', 'block_num', 'lot_num'])
-    result = result.merge(blklots_agg, on='mapblklot')
+@traced
+def deduplicate_by_mapblklot(parcels_df, key_index=None):
+    # key_index, when given, must have been built from parcels_df itself.
+    if key_index is None:
+        key_index = ParcelKeyIndex(parcels_df)
 
-    cols = result.columns.tolist()
-    cols.remove('blklots')
-    cols.insert(1, 'blklots')
-    return result[cols]
+    rows = np.sort(key_index.first_row[key_index.first_row >= 0])
+    result = parcels_df.iloc[rows].drop(columns=['blklot', 'block_num', 'lot_num']).reset_index(drop=True)
+    result.insert(1, 'blklots', key_index.joined_blklots(key_index.row_codes[rows]))
+    return result
 
 
-def fill_missing_addresses(parcels_df, land_use_df):
-    result = parcels_df.copy()
-    missing_address_mask = result['from_address_num'].isna() | (result['from_address_num'] == '')
+ADDRESS_COLS = {'from_address_num': 'from_st', 'street_name': 'street', 'street_type': 'st_type'}
 
-    address_lookup = land_use_df.set_index('mapblklot')[['from_st', 'street', 'st_type']].to_dict('index')
 
-    for idx in result[missing_address_mask].index:
-        mapblklot = result.loc[idx, 'mapblklot']
-        if mapblklot in address_lookup:
-            addr = address_lookup[mapblklot]
-            result.loc[idx, 'from_address_num'] = addr['from_st']
-            result.loc[idx, 'street_name'] = addr['street']
-            result.loc[idx, 'street_type'] = addr['st_type']
+@traced
+def fill_missing_addresses(parcels_df, land_use_df):
+    missing_address_mask = parcels_df['from_address_num'].isna() | (parcels_df['from_address_num'] == '')
 
+    result, _ = coalesce_from_lookup(parcels_df, land_use_df, 'mapblklot', ADDRESS_COLS, rows=missing_address_mask)
     return result
 
 
-def merge_model_data(parcels_df, model_df, raw_parcels_df):
-    blklot_to_mapblklot = raw_parcels_df.set_index('blklot')['mapblklot'].to_dict()
-    parcels_blklots = set(raw_parcels_df['blklot'])
+@traced
+def merge_model_data(parcels_df, model_df, raw_parcels_df, key_index=None):
+    if key_index is None:
+        key_index = ParcelKeyIndex(raw_parcels_df)
 
-    model_df_filtered = model_df[model_df['BlockLot'].isin(parcels_blklots)].copy()
-    model_df_filtered['mapblklot'] = model_df_filtered['BlockLot'].map(blklot_to_mapblklot)
+    # Model rows are keyed by blklot; the first row reaching each mapblklot wins.
+    model_codes = key_index.parent_of(key_index.blklot_codes(model_df['BlockLot']))
+    model_rows = key_index.first_rows(model_codes)
 
-    model_cols = [c for c in model_df_filtered.columns if c not in ['BlockLot']]
-    model_by_mapblklot = model_df_filtered.drop_duplicates(subset='mapblklot', keep='first')[model_cols]
+    parcel_codes = key_index.mapblklot_codes(parcels_df['mapblklot'])
+    rows = np.where(parcel_codes >= 0, model_rows[parcel_codes], -1)
 
-    result = parcels_df.merge(model_by_mapblklot, on='mapblklot', how='left')
+    model_cols = [c for c in model_df.columns if c not in ['BlockLot']]
+    model_part = model_df[model_cols].reset_index(drop=True).reindex(rows).reset_index(drop=True)
+    result = parcels_df.reset_index(drop=True).join(model_part, lsuffix='_x', rsuffix='_y')
 
-    has_model_data = result['mapblklot'].isin(model_by_mapblklot['mapblklot'])
+    has_model_data = rows >= 0
     is_active = result['active'] == 'true'
     keep_mask = has_model_data | is_active
 
     return result[keep_mask]
 
 
-def remove_public_parcels(parcels_df, public_parcels_df):
-    public_mapblklots = set(public_parcels_df['mapblklot'])
-    return parcels_df[~parcels_df['mapblklot'].isin(public_mapblklots)]
+@traced
+def remove_public_parcels(parcels_df, public_parcels_df, key_index=None):
+    if key_index is None:
+        return parcels_df[~parcels_df['mapblklot'].isin(public_parcels_df['mapblklot'])]
+
+    public = key_index.mask(key_index.mapblklot_codes(public_parcels_df['mapblklot']))
+    return parcels_df[~key_index.isin(parcels_df['mapblklot'], public)]
 
 
 NON_HOUSING_EXACT_ZONES = ['M-1', 'M-2', 'P']
@@ -61,19 +67,20 @@ NON_HOUSING_PREFIX_PATTERNS = ['PDR-1-B', 'PDR-1-D', 'PDR-1-G', 'PDR-2', 'TI-OS'
 LARGE_PARCEL_AREA_THRESHOLD = 100
 
 
-def identify_non_housing_parcels(parcels_df):
-    def zone_matches_pattern(zone):
-        if pd.isna(zone):
-            return False
-        zone_primary = zone.split(';')[0].strip()
-        if zone_primary in NON_HOUSING_EXACT_ZONES:
-            return True
-        for pattern in NON_HOUSING_PREFIX_PATTERNS:
-            if zone_primary.startswith(pattern):
-                return True
+def _zone_matches_non_housing(zone):
+    if pd.isna(zone):
         return False
+    zone_primary = zone.split(';')[0].strip()
+    if zone_primary in NON_HOUSING_EXACT_ZONES:
+        return True
+    for pattern in NON_HOUSING_PREFIX_PATTERNS:
+        if zone_primary.startswith(pattern):
+            return True
+    return False
 
-    is_non_housing_zone = parcels_df['zoning_code'].apply(zone_matches_pattern)
+
+def identify_non_housing_parcels(parcels_df):
+    is_non_housing_zone = map_unique(parcels_df['zoning_code'], _zone_matches_non_housing).astype(bool)
 
     area_numeric = pd.to_numeric(parcels_df['Area_1000'], errors='coerce').fillna(0)
     is_large_rh1d = (parcels_df['zoning_code'] == 'RH-1(D)') & (area_numeric > LARGE_PARCEL_AREA_THRESHOLD)
@@ -81,34 +88,26 @@ def identify_non_housing_parcels(parcels_df):
     return is_non_housing_zone | is_large_rh1d
 
 
-def remove_non_housing_parcels(parcels_df, public_parcels_path):
-    import geopandas as gpd
-    from shapely import wkt
+@traced
+def remove_non_housing_parcels(parcels_df, public_parcels, geometry_store=None):
+    from .geometry_store import to_geodataframe
+    from .public_parcels import as_public_parcel_set
 
     non_housing_mask = identify_non_housing_parcels(parcels_df)
 
     if non_housing_mask.sum() == 0:
         return parcels_df
 
-    non_housing_parcels = parcels_df[non_housing_mask].copy()
-    non_housing_parcels['geometry'] = non_housing_parcels['shape'].apply(wkt.loads)
-    non_housing_gdf = gpd.GeoDataFrame(non_housing_parcels, geometry='geometry', crs='EPSG:4326')
-
-    existing_public = gpd.read_file(public_parcels_path)
-    existing_mapblklots = set(existing_public['mapblklot'])
+    non_housing_gdf = to_geodataframe(parcels_df[non_housing_mask], 'geometry', geometry_store)
 
-    new_public = non_housing_gdf[~non_housing_gdf['mapblklot'].isin(existing_mapblklots)]
-
-    if len(new_public) > 0:
-        cols_to_keep = [c for c in existing_public.columns if c in new_public.columns]
-        new_public_subset = new_public[cols_to_keep]
-
-        combined = pd.concat([existing_public, new_public_subset], ignore_index=True)
-        combined.to_file(public_parcels_path, driver='GeoJSON')
+    public_set, owned = as_public_parcel_set(public_parcels)
+    if public_set.add(non_housing_gdf) > 0 and owned:
+        public_set.write()
 
     return parcels_df[~non_housing_mask]
 
 
+@traced
 def remove_shipyard_parcels(parcels_df):
     missing_zoning = parcels_df['zoning_code'].isna() | (parcels_df['zoning_code'] == '')
     missing_height = parcels_df['Height_Ft'].isna() | (parcels_df['Height_Ft'] == '')
@@ -125,23 +124,28 @@ OVERLAY_COLS = [
 ]
 
 
-def enrich_public_parcels(public_parcels_path, raw_parcels_df):
-    import geopandas as gpd
-
-    public_gdf = gpd.read_file(public_parcels_path)
-    public_mapblklots = set(public_gdf['mapblklot'].astype(str))
+@traced
+def enrich_public_parcels(public_parcels, raw_parcels_df, key_index=None):
+    from .public_parcels import as_public_parcel_set
 
-    overlay_data = raw_parcels_df[raw_parcels_df['mapblklot'].astype(str).isin(public_mapblklots)].copy()
-    overlay_data = overlay_data.drop_duplicates(subset='mapblklot', keep='first')
+    if key_index is None:
+        key_index = ParcelKeyIndex(raw_parcels_df.assign(mapblklot=raw_parcels_df['mapblklot'].astype(str)))
 
-    available_cols = [c for c in OVERLAY_COLS if c in overlay_data.columns]
-    overlay_lookup = overlay_data.set_index('mapblklot')[available_cols[1:]].to_dict('index')
+    public_set, owned = as_public_parcel_set(public_parcels)
+    public_gdf = public_set.to_frame()
+    public_mapblklots = public_gdf['mapblklot']
+    available_cols = [c for c in OVERLAY_COLS if c in raw_parcels_df.columns]
 
-    for idx, row in public_gdf.iterrows():
-        mapblklot = str(row['mapblklot'])
-        if mapblklot in overlay_lookup:
-            for col, val in overlay_lookup[mapblklot].items():
-                public_gdf.loc[idx, col] = val
+    # Look the overlay columns up by mapblklot code rather than by string.
+    public_gdf, _ = coalesce_from_lookup(
+        public_gdf.assign(mapblklot=key_index.mapblklot_codes(public_mapblklots.astype(str))),
+        raw_parcels_df[key_index.row_codes >= 0].assign(mapblklot=key_index.row_codes[key_index.row_codes >= 0]),
+        'mapblklot',
+        {col: col for col in available_cols[1:]},
+    )
+    public_gdf['mapblklot'] = public_mapblklots
 
-    public_gdf.to_file(public_parcels_path, driver='GeoJSON')
+    public_set.replace(public_gdf)
+    if owned:
+        public_set.write()
     return public_gdf
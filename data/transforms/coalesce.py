@@ -0,0 +1,23 @@
+from .memory import working_copy
+
+
+def coalesce_from_lookup(target_df, source_df, key, columns, rows=None, keep='first'):
+    result = working_copy(target_df)
+    lookup = source_df.drop_duplicates(subset=key, keep=keep).set_index(key)
+    keys = result[key].to_numpy()
+
+    filled = {}
+    for target_col, source_col in columns.items():
+        values = lookup[source_col].reindex(keys)
+        values.index = result.index
+
+        if target_col not in result.columns:
+            result[target_col] = None
+        fill_mask = (result[target_col].isna() | (result[target_col] == '')) & values.notna()
+        if rows is not None:
+            fill_mask &= rows
+
+        result.loc[fill_mask, target_col] = values[fill_mask]
+        filled[target_col] = int(fill_mask.sum())
+
+    return result, filled
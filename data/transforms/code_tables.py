@@ -0,0 +1,25 @@
+import numpy as np
+import pandas as pd
+
+
+def build_code_table(series, classify):
+    codes, uniques = pd.factorize(series)
+    labels = [classify(value) for value in uniques] + [classify(None)]
+    return codes, np.asarray(labels, dtype=object)
+
+
+def map_unique(series, classify):
+    codes, labels = build_code_table(series, classify)
+    return pd.Series(labels[codes], index=series.index)
+
+
+def one_hot_unique(series, classify, columns):
+    codes, labels = build_code_table(series, classify)
+    positions = {col: i for i, col in enumerate(columns)}
+
+    table = np.zeros((len(labels), len(columns)), dtype=np.uint8)
+    for row, label in enumerate(labels):
+        if label in positions:
+            table[row, positions[label]] = 1
+
+    return pd.DataFrame(table[codes], index=series.index, columns=columns)
@@ -1,3 +1,8 @@
+from .code_tables import one_hot_unique
+from .ingest import format_dummy
+from .memory import working_copy
+from .tracing import traced
+
 PLANNING_TO_DIST = {
     'South Bayshore': 'DIST_SBayshore',
     'Bernal Heights': 'DIST_BernalHts',
@@ -16,21 +21,19 @@ PLANNING_TO_DIST = {
 }
 
 
+@traced
 def remove_presidio_parcels(parcels_df):
     return parcels_df[parcels_df['planning_district'] != 'Presidio']
 
 
+@traced
 def fill_missing_districts(parcels_df):
-    result = parcels_df.copy()
+    result = working_copy(parcels_df)
 
     dist_cols = [c for c in result.columns if c.startswith('DIST_')]
     missing_dist_mask = result[dist_cols[0]].isna()
 
-    for col in dist_cols:
-        result.loc[missing_dist_mask, col] = '0'
-
-    for district, col in PLANNING_TO_DIST.items():
-        mask = missing_dist_mask & (result['planning_district'] == district)
-        result.loc[mask, col] = '1'
+    one_hot = one_hot_unique(result.loc[missing_dist_mask, 'planning_district'], PLANNING_TO_DIST.get, dist_cols)
+    result.loc[missing_dist_mask, dist_cols] = format_dummy(result[dist_cols[0]], one_hot)
 
     return result
@@ -1,59 +1,60 @@
 import pandas as pd
-import geopandas as gpd
-from shapely import wkt
 
+from .geometry_store import to_geodataframe
+from .ingest import parse_numeric
+from .memory import working_copy
+from .overlay_labels import HEIGHT_LAYER
+from .public_parcels import as_public_parcel_set
+from .sharded_join import sharded_sjoin
+from .tracing import traced
 
-def fill_height_from_spatial_join(parcels_df, height_bulk_gdf):
-    result = parcels_df.copy()
+
+@traced
+def fill_height_from_spatial_join(parcels_df, height_bulk_gdf, geometry_store=None, workers=1, labeler=None):
+    result = working_copy(parcels_df)
 
     missing_height_mask = result['Height_Ft'].isna()
 
     if missing_height_mask.sum() == 0:
         return result
 
-    missing_parcels = result[missing_height_mask].copy()
-    missing_parcels['geometry'] = missing_parcels['shape'].apply(wkt.loads)
-    missing_gdf = gpd.GeoDataFrame(missing_parcels, geometry='geometry', crs='EPSG:4326')
-
-    missing_gdf_projected = missing_gdf.to_crs('EPSG:2227')
-    missing_gdf['centroid'] = missing_gdf_projected.geometry.centroid.to_crs('EPSG:4326')
-
-    centroid_gdf = missing_gdf.set_geometry('centroid')
-    joined = gpd.sjoin(centroid_gdf, height_bulk_gdf[['geometry', 'gen_hght']], how='left', predicate='within')
+    if labeler is not None:
+        heights = labeler.lookup(HEIGHT_LAYER, result.loc[missing_height_mask, 'mapblklot'], geometry_store)
+    else:
+        centroid_gdf = to_geodataframe(result[missing_height_mask], 'centroid', geometry_store)
+        joined = sharded_sjoin(centroid_gdf, height_bulk_gdf[['geometry', 'gen_hght']], how='left', predicate='within', workers=workers)
 
-    height_lookup = joined.set_index(joined.index)['gen_hght'].to_dict()
-    result.loc[missing_height_mask, 'Height_Ft'] = result.loc[missing_height_mask].index.map(height_lookup)
+        height_lookup = joined.set_index(joined.index)['gen_hght'].to_dict()
+        heights = pd.Series(result.loc[missing_height_mask].index.map(height_lookup), index=result.loc[missing_height_mask].index)
+    if pd.api.types.is_numeric_dtype(result['Height_Ft']):
+        heights = parse_numeric(heights, errors='coerce')
+    result.loc[missing_height_mask, 'Height_Ft'] = heights
 
     return result
 
 
-def remove_open_space_parcels(parcels_df, public_parcels_path):
-    result = parcels_df.copy()
+OPEN_SPACE_HEIGHT_FT = 1000
 
-    height_numeric = result['Height_Ft'].str.replace(',', '').astype(float)
-    open_space_mask = height_numeric >= 1000
 
-    if open_space_mask.sum() == 0:
-        return result, None
+def identify_open_space_parcels(parcels_df):
+    return parse_numeric(parcels_df['Height_Ft']) >= OPEN_SPACE_HEIGHT_FT
 
-    open_space_parcels = result[open_space_mask].copy()
-    open_space_parcels['geometry'] = open_space_parcels['shape'].apply(wkt.loads)
-    open_space_gdf = gpd.GeoDataFrame(open_space_parcels, geometry='geometry', crs='EPSG:4326')
 
-    existing_public = gpd.read_file(public_parcels_path)
-    existing_mapblklots = set(existing_public['mapblklot'])
+@traced
+def remove_open_space_parcels(parcels_df, public_parcels, geometry_store=None):
+    result = working_copy(parcels_df)
 
-    new_public = open_space_gdf[~open_space_gdf['mapblklot'].isin(existing_mapblklots)]
+    open_space_mask = identify_open_space_parcels(result)
 
-    if len(new_public) > 0:
-        cols_to_keep = [c for c in existing_public.columns if c in new_public.columns]
-        new_public_subset = new_public[cols_to_keep]
+    if open_space_mask.sum() == 0:
+        return result, None
 
-        combined = pd.concat([existing_public, new_public_subset], ignore_index=True)
-        combined.to_file(public_parcels_path, driver='GeoJSON')
-        updated_public = combined
-    else:
-        updated_public = existing_public
+    open_space_gdf = to_geodataframe(result[open_space_mask], 'geometry', geometry_store)
+
+    public_set, owned = as_public_parcel_set(public_parcels)
+    if public_set.add(open_space_gdf) > 0 and owned:
+        public_set.write()
+    updated_public = public_set.to_frame()
 
     result = result[~open_space_mask]
 
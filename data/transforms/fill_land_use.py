@@ -1,25 +1,28 @@
-def fill_res_dummy(parcels_df, land_use_df):
-    result = parcels_df.copy()
+from .coalesce import coalesce_from_lookup
+from .ingest import format_dummy, parse_numeric
+from .tracing import traced
 
-    missing_res_dummy_mask = result['Res_Dummy'].isna()
-    land_use_lookup = land_use_df.set_index('mapblklot')['resunits'].to_dict()
 
-    result.loc[missing_res_dummy_mask, 'Res_Units'] = result.loc[missing_res_dummy_mask, 'mapblklot'].map(land_use_lookup)
+@traced
+def fill_res_dummy(parcels_df, land_use_df):
+    missing_res_dummy_mask = parcels_df['Res_Dummy'].isna()
+    result, _ = coalesce_from_lookup(
+        parcels_df, land_use_df, 'mapblklot', {'Res_Units': 'resunits'}, rows=missing_res_dummy_mask, keep='last'
+    )
 
-    res_units_numeric = result.loc[missing_res_dummy_mask, 'Res_Units'].str.replace(',', '').astype(float)
-    result.loc[missing_res_dummy_mask, 'Res_Dummy'] = (res_units_numeric > 0).astype(int).astype(str)
+    res_units_numeric = parse_numeric(result.loc[missing_res_dummy_mask, 'Res_Units'])
+    result.loc[missing_res_dummy_mask, 'Res_Dummy'] = format_dummy(result['Res_Dummy'], res_units_numeric > 0)
 
     return result
 
 
+@traced
 def fill_building_sqft(parcels_df, land_use_df):
-    result = parcels_df.copy()
-
-    missing_sqft_mask = result['Tot_Existing_SqFt'].isna()
-    res_lookup = land_use_df.set_index('mapblklot')['res'].to_dict()
-
-    result.loc[missing_sqft_mask, 'Tot_Existing_SqFt'] = result.loc[missing_sqft_mask, 'mapblklot'].map(res_lookup)
-    result.loc[missing_sqft_mask, 'Tot_Existing_SqFt'] = result.loc[missing_sqft_mask, 'Tot_Existing_SqFt'].str.replace(',', '').astype(float)
+    missing_sqft_mask = parcels_df['Tot_Existing_SqFt'].isna()
+    result, _ = coalesce_from_lookup(
+        parcels_df, land_use_df, 'mapblklot', {'Tot_Existing_SqFt': 'res'}, rows=missing_sqft_mask, keep='last'
+    )
+    result.loc[missing_sqft_mask, 'Tot_Existing_SqFt'] = parse_numeric(result.loc[missing_sqft_mask, 'Tot_Existing_SqFt'])
     result.loc[missing_sqft_mask, 'Bldg_SqFt_1000'] = result.loc[missing_sqft_mask, 'Tot_Existing_SqFt'] / 1000
 
     return result
@@ -1,9 +1,16 @@
 import pandas as pd
-import geopandas as gpd
+
+from .geometry_store import to_geodataframe
+from .ingest import format_dummy, format_like
+from .memory import working_copy
+from .overlay_labels import HISTORIC_LAYER
+from .sharded_join import sharded_sjoin
+from .tracing import traced
 
 SDB_COLS = ['SDB_2016_5Plus', 'SDB_2016_5Plus_EnvFull', 'Zoning_DR_EnvFull']
 SDB_ENVELOPE_THRESHOLD = 9.0
 SDB_HEIGHT_CAP = 130
+SDB_ZONE_PATTERNS = ['RTO', 'NCT', 'WMUG']
 
 
 def compute_sdb_qualification(parcels_df):
@@ -14,54 +21,58 @@ def compute_sdb_qualification(parcels_df):
         (envelope > SDB_ENVELOPE_THRESHOLD) &
         (height <= SDB_HEIGHT_CAP)
     )
-    return qualifies.astype(int).astype(str)
+    return qualifies.astype('uint8')
 
 
+@traced
 def fill_sdb_columns(parcels_df):
-    result = parcels_df.copy()
+    result = working_copy(parcels_df)
 
     missing_sdb_mask = result['SDB_2016_5Plus'].isna() | (result['SDB_2016_5Plus'] == '')
 
     if missing_sdb_mask.any():
         computed_sdb = compute_sdb_qualification(result)
-        result.loc[missing_sdb_mask, 'SDB_2016_5Plus'] = computed_sdb[missing_sdb_mask]
+        result.loc[missing_sdb_mask, 'SDB_2016_5Plus'] = format_dummy(result['SDB_2016_5Plus'], computed_sdb)[missing_sdb_mask]
 
         envelope = pd.to_numeric(result['Env_1000_Area_Height'], errors='coerce').fillna(0)
-        sdb_env_full = (computed_sdb == '1').astype(float) * envelope
-        result.loc[missing_sdb_mask, 'SDB_2016_5Plus_EnvFull'] = sdb_env_full[missing_sdb_mask].astype(str)
+        sdb_env_full = computed_sdb.astype(float) * envelope
+        result.loc[missing_sdb_mask, 'SDB_2016_5Plus_EnvFull'] = format_like(result['SDB_2016_5Plus_EnvFull'], sdb_env_full)[missing_sdb_mask]
 
     for col in SDB_COLS:
         still_missing = result[col].isna() | (result[col] == '')
-        result.loc[still_missing, col] = '0'
+        result.loc[still_missing, col] = 0 if pd.api.types.is_numeric_dtype(result[col]) else '0'
 
     return result
 
 
-def compute_historic_from_districts(parcels_df, historic_districts_gdf):
-    parcels_gdf = gpd.GeoDataFrame(
-        parcels_df,
-        geometry=gpd.GeoSeries.from_wkt(parcels_df['shape']),
-        crs='EPSG:4326'
-    )
-    parcels_gdf_projected = parcels_gdf.to_crs('EPSG:2227')
-    parcels_gdf['centroid'] = parcels_gdf_projected.geometry.centroid.to_crs('EPSG:4326')
-    parcels_centroids_gdf = parcels_gdf.set_geometry('centroid')
+@traced
+def compute_historic_from_districts(parcels_df, historic_districts_gdf, geometry_store=None, workers=1, labeler=None):
+    if labeler is not None:
+        in_historic_district = labeler.lookup(HISTORIC_LAYER, parcels_df['mapblklot'], geometry_store).notna()
+    else:
+        parcels_centroids_gdf = to_geodataframe(parcels_df, 'centroid', geometry_store)
 
-    joined = gpd.sjoin(parcels_centroids_gdf, historic_districts_gdf, how='left', predicate='within')
-    parcels_in_historic_district = joined[joined['name'].notna()]['mapblklot'].unique()
+        joined = sharded_sjoin(parcels_centroids_gdf, historic_districts_gdf, how='left', predicate='within', workers=workers)
+        parcels_in_historic_district = joined[joined['name'].notna()]['mapblklot'].unique()
+        in_historic_district = parcels_df['mapblklot'].isin(parcels_in_historic_district)
 
-    result = parcels_df.copy()
-    result['in_historic_district'] = result['mapblklot'].isin(parcels_in_historic_district).astype(int).astype(str)
+    result = working_copy(parcels_df)
+    # Follow the dummies' form when the frame has them, else fall back to '0'/'1' text.
+    template = next((result[col] for col in ['Historic', 'in_historic_district'] if col in result.columns), None)
+    result['in_historic_district'] = format_dummy(template, in_historic_district)
 
     return result
 
 
+@traced
 def fill_historic_columns(parcels_df):
-    result = parcels_df.copy()
+    result = working_copy(parcels_df)
 
     missing_historic_mask = (result['historic'].isna() | (result['historic'] == '')) & \
                             (result['Historic'].isna() | (result['Historic'] == ''))
-    result.loc[missing_historic_mask, 'historic'] = result.loc[missing_historic_mask, 'in_historic_district']
-    result.loc[missing_historic_mask, 'Historic'] = result.loc[missing_historic_mask, 'in_historic_district']
+    in_historic_district = result.loc[missing_historic_mask, 'in_historic_district']
+    # The parcels' own historic column stays text while the model's Historic is typed at ingest.
+    result.loc[missing_historic_mask, 'historic'] = format_dummy(result['historic'], in_historic_district)
+    result.loc[missing_historic_mask, 'Historic'] = format_dummy(result['Historic'], in_historic_district)
 
     return result
@@ -1,6 +1,12 @@
 import pandas as pd
-import geopandas as gpd
-from shapely import wkt
+
+from .code_tables import one_hot_unique
+from .geometry_store import to_geodataframe
+from .ingest import format_dummy
+from .memory import working_copy
+from .overlay_labels import ZONING_LAYER
+from .sharded_join import sharded_sjoin
+from .tracing import traced
 
 ZP_MAPPING = {
     'zp_RH2': [
@@ -49,20 +55,19 @@ for zp_col, codes in ZP_MAPPING.items():
 ZP_COLS = ['zp_OfficeComm', 'zp_DRMulti_RTO', 'zp_FBDMulti_RTO', 'zp_PDRInd', 'zp_Public', 'zp_Redev', 'zp_RH2', 'zp_RH3_RM1']
 
 
-def fill_zoning_from_spatial_join(parcels_df, zoning_district_gdf):
-    result = parcels_df.copy()
+@traced
+def fill_zoning_from_spatial_join(parcels_df, zoning_district_gdf, geometry_store=None, workers=1, labeler=None):
+    result = working_copy(parcels_df)
 
     missing_zoning_mask = result['FZP Planning Code'].isna()
 
-    missing_parcels = result[missing_zoning_mask].copy()
-    missing_parcels['geometry'] = missing_parcels['shape'].apply(wkt.loads)
-    missing_gdf = gpd.GeoDataFrame(missing_parcels, geometry='geometry', crs='EPSG:4326')
-
-    missing_gdf_projected = missing_gdf.to_crs('EPSG:2227')
-    missing_gdf['centroid'] = missing_gdf_projected.geometry.centroid.to_crs('EPSG:4326')
+    if labeler is not None:
+        result.loc[missing_zoning_mask, 'FZP Planning Code'] = labeler.lookup(
+            ZONING_LAYER, result.loc[missing_zoning_mask, 'mapblklot'], geometry_store)
+        return result
 
-    centroid_gdf = missing_gdf.set_geometry('centroid')
-    joined = gpd.sjoin(centroid_gdf, zoning_district_gdf[['geometry', 'zoning']], how='left', predicate='within')
+    centroid_gdf = to_geodataframe(result[missing_zoning_mask], 'centroid', geometry_store)
+    joined = sharded_sjoin(centroid_gdf, zoning_district_gdf[['geometry', 'zoning']], how='left', predicate='within', workers=workers)
 
     zoning_lookup = joined.set_index(joined.index)['zoning'].to_dict()
     result.loc[missing_zoning_mask, 'FZP Planning Code'] = result.loc[missing_zoning_mask].index.map(zoning_lookup)
@@ -77,18 +82,13 @@ def _get_zp_col(planning_code):
     return CODE_TO_ZP.get(code, None)
 
 
+@traced
 def fill_zp_columns(parcels_df):
-    result = parcels_df.copy()
+    result = working_copy(parcels_df)
 
     missing_zp_mask = result['zp_RH2'].isna()
 
-    for col in ZP_COLS:
-        result.loc[missing_zp_mask, col] = '0'
-
-    for idx in result[missing_zp_mask].index:
-        planning_code = result.loc[idx, 'FZP Planning Code']
-        zp_col = _get_zp_col(planning_code)
-        if zp_col:
-            result.loc[idx, zp_col] = '1'
+    one_hot = one_hot_unique(result.loc[missing_zp_mask, 'FZP Planning Code'], _get_zp_col, ZP_COLS)
+    result.loc[missing_zp_mask, ZP_COLS] = format_dummy(result['zp_RH2'], one_hot)
 
     return result
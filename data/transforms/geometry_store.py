@@ -0,0 +1,59 @@
+import hashlib
+from functools import cached_property
+
+import numpy as np
+import geopandas as gpd
+import shapely
+
+SOURCE_CRS = 'EPSG:4326'
+PROJECTED_CRS = 'EPSG:2227'
+
+
+class GeometryStore:
+    def __init__(self, parcels_df, key='mapblklot', shape_col='shape'):
+        unique = parcels_df.drop_duplicates(subset=key, keep='first')
+        shapes = unique[shape_col].to_numpy(dtype=object)
+        shapes = np.where(unique[shape_col].notna().to_numpy(), shapes, None)
+        first = next((shape for shape in shapes if shape is not None), None)
+        geometries = shapely.from_wkb(shapes) if isinstance(first, bytes) else shapely.from_wkt(shapes)
+
+        self.key = key
+        self.geometry = gpd.GeoSeries(geometries, index=unique[key].to_numpy(), crs=SOURCE_CRS)
+
+    def __len__(self):
+        return len(self.geometry)
+
+    @cached_property
+    def fingerprint(self):
+        h = hashlib.sha256()
+        h.update(repr((self.key, self.geometry.crs.to_string())).encode())
+        h.update('\0'.join(map(str, self.geometry.index)).encode())
+        for shape in shapely.to_wkb(self.geometry.to_numpy()):
+            h.update(b'\0' if shape is None else shape)
+        return h.hexdigest()
+
+    @cached_property
+    def projected(self):
+        return self.geometry.to_crs(PROJECTED_CRS)
+
+    @cached_property
+    def area(self):
+        return self.projected.area
+
+    @cached_property
+    def centroid(self):
+        return self.projected.centroid.to_crs(SOURCE_CRS)
+
+    @cached_property
+    def representative_point(self):
+        return self.projected.representative_point().to_crs(SOURCE_CRS)
+
+    def lookup(self, attr, keys):
+        values = getattr(self, attr).reindex(keys.to_numpy())
+        values.index = keys.index
+        return values
+
+
+def to_geodataframe(parcels_df, geometry='geometry', geometry_store=None):
+    store = geometry_store if geometry_store is not None else GeometryStore(parcels_df)
+    return gpd.GeoDataFrame(parcels_df, geometry=store.lookup(geometry, parcels_df[store.key]))
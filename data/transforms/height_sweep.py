@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+
+from .calculate_units import PROB_WEIGHTS, UNITS_WEIGHTS, calculate_20_year_prob, calculate_fixed_terms, combine_parcel_terms
+from .fill_sdb_historic import SDB_ZONE_PATTERNS, SDB_ENVELOPE_THRESHOLD, SDB_HEIGHT_CAP
+from .ingest import parse_numeric
+from .tracing import traced
+
+SWEEP_HEIGHTS = list(range(40, 305, 5))
+SWEEP_DEFAULT_HEIGHT = 40
+SWEEP_CHUNK_ELEMENTS = 2 ** 22
+
+
+def _numeric(parcels_df, col):
+    if col in parcels_df.columns:
+        return parse_numeric(parcels_df[col], errors='coerce').values
+    return np.full(len(parcels_df), np.nan)
+
+
+@traced
+def sweep_blanket_upzoning(parcels_df, heights=SWEEP_HEIGHTS, group_by='analysis_neighborhood', height_col='Height_Ft', fast=False):
+    heights = np.asarray(heights, dtype=float)
+
+    fixed_z, fixed_units = calculate_fixed_terms(parcels_df)
+
+    current_height = np.nan_to_num(_numeric(parcels_df, height_col), nan=SWEEP_DEFAULT_HEIGHT)
+    area = np.nan_to_num(_numeric(parcels_df, 'Area_1000'))
+    sdb_zone = parcels_df['zoning_code'].str.contains('|'.join(SDB_ZONE_PATTERNS), case=False, regex=True, na=False).values
+
+    groups, labels = pd.factorize(parcels_df[group_by])
+    groups = np.where(groups < 0, len(labels), groups)
+    totals = {scenario: np.zeros((len(labels) + 1, len(heights))) for scenario in ['low', 'high']}
+
+    chunk = max(1, SWEEP_CHUNK_ELEMENTS // max(1, len(heights)))
+    for start in range(0, len(parcels_df), chunk):
+        rows = slice(start, start + chunk)
+        height = np.maximum(current_height[rows, None], heights[None, :])
+        env = area[rows, None] * height / 10
+        sdb = sdb_zone[rows, None] & (env > SDB_ENVELOPE_THRESHOLD) & (height <= SDB_HEIGHT_CAP)
+
+        # Same terms and summation order as calculate_parcel_terms, so each
+        # height scores exactly as the parcels raised to it would.
+        variable_z = PROB_WEIGHTS['Height_Ft'] * height + PROB_WEIGHTS['Env_1000_Area_Height'] * env + PROB_WEIGHTS['SDB_2016_5Plus'] * sdb
+        variable_units = UNITS_WEIGHTS['Env_1000_Area_Height'] * env + UNITS_WEIGHTS['SDB_2016_5Plus_EnvFull'] * np.where(sdb, env, 0)
+        z, units = combine_parcel_terms(fixed_z[rows, None], fixed_units[rows, None], variable_z, variable_units)
+
+        for scenario, scenario_totals in totals.items():
+            expected = calculate_20_year_prob(z.ravel(), scenario, fast).reshape(z.shape) * units
+            np.add.at(scenario_totals, groups[rows], expected)
+
+    index = pd.MultiIndex.from_product([heights, list(labels) + [None]], names=['min_height', group_by])
+    curves = pd.DataFrame({
+        f'fzp_expected_units_{scenario}': scenario_totals.T.ravel()
+        for scenario, scenario_totals in totals.items()
+    }, index=index)
+
+    has_parcels = np.bincount(groups, minlength=len(labels) + 1) > 0
+    return curves[np.tile(has_parcels, len(heights))]
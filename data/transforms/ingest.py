@@ -0,0 +1,118 @@
+import hashlib
+import json
+import os
+
+import pandas as pd
+import shapely
+
+from .memory import working_copy
+
+NUMERIC_INPUT_COLUMNS = [
+    'Shape_Area_SqFt', 'Area_1000', 'Height_Ft', 'Env_1000_Area_Height',
+    'Tot_Existing_SqFt', 'Bldg_SqFt_1000', 'Res_Units', 'resunits', 'res',
+]
+GEOMETRY_INPUT_COLUMN = 'shape'
+CACHE_DIR_NAME = '.cache'
+CACHE_METADATA_KEY = b'fantasyzoning.source'
+
+
+def parse_numeric(series, errors='raise'):
+    if pd.api.types.is_numeric_dtype(series):
+        return series.astype(float)
+    stripped = series.astype(str).str.replace(',', '', regex=False).where(series.notna())
+    if errors == 'raise':
+        return stripped.astype(float)
+    # to_numeric's string parser is not correctly rounded, so it only picks
+    # out the values that parse and astype gives them their exact doubles.
+    valid = pd.to_numeric(stripped, errors=errors).notna()
+    return stripped.where(valid).astype(float)
+
+
+def format_like(series, values):
+    if pd.api.types.is_numeric_dtype(series):
+        return parse_numeric(values, errors='coerce')
+    return values.astype(str)
+
+
+def format_dummy(series, values):
+    # Dummies keep the form their column already has: compact integers once
+    # the schema is applied, '0'/'1' strings in frames still read as text or
+    # when there is no column to follow.
+    if series is not None and pd.api.types.is_numeric_dtype(series):
+        return values.astype(series.dtype)
+    return values.astype(int).astype(str)
+
+
+def source_signature(csv_path):
+    stat = os.stat(csv_path)
+    return {'path': os.path.basename(csv_path), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def _cache_path(csv_path, cache_dir):
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(os.path.abspath(csv_path)), CACHE_DIR_NAME)
+    name = os.path.splitext(os.path.basename(csv_path))[0]
+    return os.path.join(cache_dir, name + '.parquet')
+
+
+def _cached_signature(cache_path):
+    import pyarrow.parquet as pq
+
+    metadata = pq.read_schema(cache_path).metadata or {}
+    if CACHE_METADATA_KEY not in metadata:
+        return None
+    return json.loads(metadata[CACHE_METADATA_KEY])
+
+
+def _write_cache(df, cache_path, signature):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    metadata = dict(table.schema.metadata or {})
+    metadata[CACHE_METADATA_KEY] = json.dumps(signature).encode()
+    table = table.replace_schema_metadata(metadata)
+
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    tmp_path = cache_path + '.tmp'
+    pq.write_table(table, tmp_path, compression='zstd')
+    os.replace(tmp_path, cache_path)
+
+
+def _schema_signature():
+    from .schema import MODEL_SCHEMA
+
+    return hashlib.sha256(json.dumps(MODEL_SCHEMA, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def convert_frame(df):
+    from .schema import apply_schema
+
+    df = working_copy(df)
+    for col in NUMERIC_INPUT_COLUMNS:
+        if col in df.columns:
+            df[col] = parse_numeric(df[col], errors='coerce')
+    df = apply_schema(df)
+
+    if GEOMETRY_INPUT_COLUMN in df.columns:
+        shapes = df[GEOMETRY_INPUT_COLUMN]
+        df[GEOMETRY_INPUT_COLUMN] = shapely.to_wkb(shapely.from_wkt(shapes.where(shapes.notna(), None).to_numpy(dtype=object)))
+
+    return df
+
+
+def convert_input(csv_path):
+    return convert_frame(pd.read_csv(csv_path, dtype=str))
+
+
+def read_input(csv_path, cache_dir=None):
+    cache_path = _cache_path(csv_path, cache_dir)
+    # Caches written under another schema hold other dtypes, so they miss too.
+    signature = {**source_signature(csv_path), 'schema': _schema_signature()}
+
+    if os.path.exists(cache_path) and _cached_signature(cache_path) == signature:
+        return pd.read_parquet(cache_path)
+
+    df = convert_input(csv_path)
+    _write_cache(df, cache_path, signature)
+    return df
@@ -0,0 +1,296 @@
+import pandas as pd
+import polars as pl
+
+from .calculate_units import FIXED_PROB_FIELDS, MACRO_SCENARIOS, PROB_WEIGHTS, SCENARIO_YEARS, UNITS_WEIGHTS, VARIABLE_PROB_FIELDS
+from .clean_parcels import ADDRESS_COLS, LARGE_PARCEL_AREA_THRESHOLD, NON_HOUSING_EXACT_ZONES, NON_HOUSING_PREFIX_PATTERNS
+from .fill_districts import PLANNING_TO_DIST
+from .fill_height import OPEN_SPACE_HEIGHT_FT
+from .fill_sdb_historic import SDB_COLS, SDB_ENVELOPE_THRESHOLD, SDB_HEIGHT_CAP
+from .fill_zoning import CODE_TO_ZP, ZP_COLS
+from .overlay_labels import HEIGHT_LAYER, HISTORIC_LAYER, ZONING_LAYER
+
+# Helper columns carry the pandas row labels and the geometry-derived values
+# through the plan; none of them survive into the result.
+INDEX_COL = '__index'
+HAS_MODEL_COL = '__has_model'
+REMOVED_COL = '__removed'
+REMOVAL_REASONS = ['open_space', 'non_housing']
+SPATIAL_COLS = {'area': '__area', ZONING_LAYER: '__zoning', HEIGHT_LAYER: '__height', HISTORIC_LAYER: '__historic'}
+
+
+def _isna(frame, name):
+    column = pl.col(name)
+    if frame.collect_schema()[name].is_float():
+        return column.is_null() | column.is_nan()
+    return column.is_null()
+
+
+def _blank(frame, name):
+    # isna() | (== ''), which only differs from isna() on text columns.
+    if frame.collect_schema()[name] == pl.String:
+        return pl.col(name).is_null() | (pl.col(name) == '')
+    return _isna(frame, name)
+
+
+def _numeric(name):
+    # _to_numeric_series: missing values count as zero.
+    return pl.col(name).cast(pl.Float64).fill_nan(0.0).fill_null(0.0)
+
+
+def _dummy(frame, name, condition):
+    return condition.fill_null(False).cast(frame.collect_schema()[name])
+
+
+def _divide(values, divisor):
+    # Polars divides by a scalar through its reciprocal, which can round
+    # differently from pandas' true division. Dividing by a column is exact,
+    # so the divisor is spread over the rows first.
+    return (values / (pl.int_range(pl.len()).cast(pl.Float64) * 0.0 + divisor)).fill_nan(None)
+
+
+def _format_dummy(frame, name, values):
+    # format_dummy: a numeric column's dtype, '0'/'1' text otherwise.
+    dtype = frame.collect_schema()[name]
+    if dtype.is_numeric():
+        return values.cast(dtype)
+    return values.cast(pl.Int64).cast(pl.String)
+
+
+def _fill(frame, name, mask, values):
+    return pl.when(mask).then(values).otherwise(pl.col(name)).alias(name)
+
+
+def _coalesce(frame, source, key, columns, rows=None, keep='first'):
+    sources = {target: f'__{target}_source' for target in columns}
+    lookup = source.select(key, *[pl.col(columns[target]).alias(alias) for target, alias in sources.items()])
+    frame = frame.join(lookup.unique(key, keep=keep, maintain_order=True), on=key, how='left', maintain_order='left')
+
+    updates = []
+    for target, alias in sources.items():
+        mask = _blank(frame, target) & ~_isna(frame, alias)
+        if rows is not None:
+            mask = mask & rows
+        updates.append(_fill(frame, target, mask, pl.col(alias)))
+    return frame.with_columns(updates).drop(list(sources.values()))
+
+
+def _deduplicate(raw):
+    raw = raw.filter(pl.col('mapblklot').is_not_null())
+    blklots = raw.sort('blklot').group_by('mapblklot').agg(pl.col('blklot').str.join(',').alias('blklots'))
+    first = raw.unique('mapblklot', keep='first', maintain_order=True).drop('blklot', 'block_num', 'lot_num')
+    frame = first.join(blklots, on='mapblklot', how='left', maintain_order='left')
+
+    cols = [c for c in frame.collect_schema().names() if c != 'blklots']
+    cols.insert(1, 'blklots')
+    return frame.select(cols)
+
+
+def _merge_model(frame, model, raw):
+    parents = raw.select('blklot', 'mapblklot').unique('blklot', keep='last', maintain_order=True)
+    model = model.join(parents, left_on='BlockLot', right_on='blklot', how='inner', maintain_order='left')
+    model = model.drop('BlockLot').filter(pl.col('mapblklot').is_not_null())
+    model = model.unique('mapblklot', keep='first', maintain_order=True).with_columns(pl.lit(True).alias(HAS_MODEL_COL))
+
+    # pandas.merge suffixes the columns both sides share.
+    shared = (set(frame.collect_schema().names()) & set(model.collect_schema().names())) - {'mapblklot'}
+    frame = frame.rename({c: f'{c}_x' for c in shared})
+    model = model.rename({c: f'{c}_y' for c in shared})
+
+    frame = frame.join(model, on='mapblklot', how='left', maintain_order='left').with_row_index(INDEX_COL)
+    keep = pl.col(HAS_MODEL_COL).fill_null(False) | (pl.col('active') == 'true').fill_null(False)
+    return frame.filter(keep).drop(HAS_MODEL_COL)
+
+
+def _fill_area(frame):
+    frame = frame.with_columns(_fill(frame, 'Shape_Area_SqFt', _isna(frame, 'Shape_Area_SqFt'), pl.col(SPATIAL_COLS['area'])))
+    return frame.with_columns(_fill(frame, 'Area_1000', _isna(frame, 'Area_1000'), _divide(pl.col('Shape_Area_SqFt'), 1000)))
+
+
+def _fill_districts(frame):
+    dist_cols = [c for c in frame.collect_schema().names() if c.startswith('DIST_')]
+    missing = _isna(frame, dist_cols[0])
+    districts = {col: [name for name, dist in PLANNING_TO_DIST.items() if dist == col] for col in dist_cols}
+    return frame.with_columns([
+        _fill(frame, col, missing, _dummy(frame, col, pl.col('planning_district').is_in(districts[col])))
+        for col in dist_cols
+    ])
+
+
+def _fill_land_use(frame, land_use):
+    missing_res_dummy = _isna(frame, 'Res_Dummy')
+    frame = _coalesce(frame, land_use, 'mapblklot', {'Res_Units': 'resunits'}, rows=missing_res_dummy, keep='last')
+    frame = frame.with_columns(_fill(frame, 'Res_Dummy', missing_res_dummy, _dummy(frame, 'Res_Dummy', pl.col('Res_Units') > 0)))
+
+    frame = frame.with_columns(_isna(frame, 'Tot_Existing_SqFt').alias('__missing_sqft'))
+    frame = _coalesce(frame, land_use, 'mapblklot', {'Tot_Existing_SqFt': 'res'}, rows=pl.col('__missing_sqft'), keep='last')
+    frame = frame.with_columns(_fill(frame, 'Bldg_SqFt_1000', pl.col('__missing_sqft'), _divide(pl.col('Tot_Existing_SqFt'), 1000)))
+    return frame.drop('__missing_sqft')
+
+
+def _fill_zoning(frame):
+    frame = frame.with_columns(_fill(frame, 'FZP Planning Code', _isna(frame, 'FZP Planning Code'), pl.col(SPATIAL_COLS[ZONING_LAYER])))
+
+    missing = _isna(frame, 'zp_RH2')
+    primary = pl.col('FZP Planning Code').str.split(';').list.first().str.strip_chars()
+    zp = primary.replace_strict(CODE_TO_ZP, default=None, return_dtype=pl.String)
+    return frame.with_columns([_fill(frame, col, missing, _dummy(frame, col, zp == col)) for col in ZP_COLS])
+
+
+def _fill_height(frame):
+    heights = pl.col(SPATIAL_COLS[HEIGHT_LAYER])
+    if frame.collect_schema()['Height_Ft'].is_numeric():
+        heights = heights.str.replace_all(',', '', literal=True).cast(pl.Float64, strict=False)
+    return frame.with_columns(_fill(frame, 'Height_Ft', _isna(frame, 'Height_Ft'), heights))
+
+
+def _non_housing(frame):
+    zoning = pl.col('zoning_code')
+    primary = zoning.str.split(';').list.first().str.strip_chars()
+    non_housing_zone = pl.any_horizontal(
+        primary.is_in(NON_HOUSING_EXACT_ZONES),
+        *[primary.str.starts_with(pattern) for pattern in NON_HOUSING_PREFIX_PATTERNS],
+    ).fill_null(False)
+    large_rh1d = (zoning == 'RH-1(D)').fill_null(False) & (_numeric('Area_1000') > LARGE_PARCEL_AREA_THRESHOLD)
+    return non_housing_zone | large_rh1d
+
+
+def _fill_sdb(frame):
+    missing = _blank(frame, 'SDB_2016_5Plus')
+    envelope = _numeric('Env_1000_Area_Height')
+    height = _numeric('Height_Ft')
+    qualifies = (envelope > SDB_ENVELOPE_THRESHOLD) & (height <= SDB_HEIGHT_CAP)
+    frame = frame.with_columns(
+        _fill(frame, 'SDB_2016_5Plus', missing, _dummy(frame, 'SDB_2016_5Plus', qualifies)),
+        _fill(frame, 'SDB_2016_5Plus_EnvFull', missing, qualifies.cast(pl.Float64) * envelope),
+    )
+    return frame.with_columns([_fill(frame, col, _blank(frame, col), pl.lit(0).cast(frame.collect_schema()[col])) for col in SDB_COLS])
+
+
+def _fill_historic(frame):
+    frame = frame.with_columns(_dummy(frame, 'Historic', pl.col(SPATIAL_COLS[HISTORIC_LAYER]).is_not_null()).alias('in_historic_district'))
+    missing = _blank(frame, 'historic') & _blank(frame, 'Historic')
+    return frame.with_columns(
+        _fill(frame, 'historic', missing, _format_dummy(frame, 'historic', pl.col('in_historic_district'))),
+        _fill(frame, 'Historic', missing, _format_dummy(frame, 'Historic', pl.col('in_historic_district'))),
+    )
+
+
+def _weighted_sum(frame, fields):
+    # Same operands in the same order as calculate_units._weighted_sum.
+    names = frame.collect_schema().names()
+    total = pl.lit(0.0)
+    for field in fields:
+        if field in names:
+            total = total + PROB_WEIGHTS[field] * _numeric(field)
+    return total
+
+
+def _probability(parcel_z, scenario):
+    # calculate_20_year_prob year by year, with the macro terms summed in the
+    # same order. Polars' exp can differ from numpy's in the last bit, so the
+    # result matches the pandas path to rounding rather than bit for bit.
+    price_key = 'priceHigh' if scenario == 'high' else 'priceLow'
+    not_developed = pl.lit(1.0)
+    for year in SCENARIO_YEARS:
+        macro = MACRO_SCENARIOS[year]
+        macro_z = PROB_WEIGHTS['Intercept'] + PROB_WEIGHTS['Const_Costs_Real'] * macro['costs'] + PROB_WEIGHTS['Zillow_Price_Real'] * macro[price_key]
+        annual_prob = 1 / (1 + (-(macro_z + parcel_z)).exp())
+        not_developed = not_developed * (1 - annual_prob)
+    return 1 - not_developed
+
+
+def _expected_units(frame):
+    fixed_z = _weighted_sum(frame, FIXED_PROB_FIELDS)
+    fixed_units = UNITS_WEIGHTS['Intercept'] + UNITS_WEIGHTS['Zoning_DR_EnvFull'] * _numeric('Zoning_DR_EnvFull')
+    variable_z = _weighted_sum(frame, VARIABLE_PROB_FIELDS)
+    variable_units = (UNITS_WEIGHTS['Env_1000_Area_Height'] * _numeric('Env_1000_Area_Height') +
+                      UNITS_WEIGHTS['SDB_2016_5Plus_EnvFull'] * _numeric('SDB_2016_5Plus_EnvFull'))
+
+    frame = frame.with_columns((fixed_z + variable_z).alias('__parcel_z'), (variable_units + fixed_units).clip(lower_bound=0.0).alias('__units'))
+    return frame.with_columns([
+        (_probability(pl.col('__parcel_z'), scenario) * pl.col('__units'))
+        .alias(f'fzp_expected_units_{scenario}')
+        for scenario in ['low', 'high']
+    ]).drop('__parcel_z', '__units')
+
+
+def _lazy(df):
+    frame = pl.from_pandas(df)
+    # Columns that are entirely missing take the type of whatever fills them,
+    # as object columns do in pandas.
+    empty = [name for name in df.columns if pd.api.types.is_object_dtype(df[name]) and df[name].isna().all()]
+    frame = frame.with_columns([pl.col(name).cast(pl.Null) for name in empty])
+    return frame.with_columns(pl.col(pl.Categorical).cast(pl.String)).lazy()
+
+
+def staged_plan(raw_parcels_df, model_df, land_use_df, spatial_df):
+    raw = _lazy(raw_parcels_df)
+    model = _lazy(model_df)
+    land_use = _lazy(land_use_df)
+    spatial = _lazy(spatial_df)
+
+    frame = _deduplicate(raw)
+    frame = _coalesce(frame, land_use, 'mapblklot', ADDRESS_COLS, rows=_blank(frame, 'from_address_num'))
+    frame = _merge_model(frame, model, raw)
+    frame = frame.filter(pl.col('planning_district').ne_missing('Presidio'))
+    frame = frame.join(spatial, on='mapblklot', how='left', maintain_order='left')
+
+    frame = _fill_area(frame)
+    frame = _fill_districts(frame)
+    frame = _fill_land_use(frame, land_use)
+    frame = _fill_zoning(frame)
+    frame = _fill_height(frame)
+
+    open_space = (pl.col('Height_Ft').cast(pl.Float64) >= OPEN_SPACE_HEIGHT_FT).fill_null(False)
+    removed = pl.when(open_space).then(pl.lit('open_space')).when(_non_housing(frame)).then(pl.lit('non_housing'))
+    return frame.with_columns(removed.alias(REMOVED_COL))
+
+
+def scoring_plan(frame):
+    shipyard = (_blank(frame, 'zoning_code') & _blank(frame, 'Height_Ft') &
+                (pl.col('analysis_neighborhood') == 'Bayview Hunters Point').fill_null(False))
+    frame = frame.filter(~shipyard)
+    frame = frame.with_columns(_fill(frame, 'Env_1000_Area_Height', _isna(frame, 'Env_1000_Area_Height'),
+                                     _divide(pl.col('Area_1000') * pl.col('Height_Ft'), 10)))
+    frame = _fill_sdb(frame)
+    frame = _fill_historic(frame)
+    return _expected_units(frame).drop(list(SPATIAL_COLS.values()))
+
+
+def _to_pandas(frame, dtypes):
+    result = frame.drop(INDEX_COL).to_pandas()
+    result.index = pd.Index(frame[INDEX_COL].to_numpy().astype('int64'))
+    for name in result.columns:
+        dtype = dtypes.get(name)
+        if dtype is None:
+            continue
+        if pd.api.types.is_object_dtype(dtype):
+            result[name] = pd.Series(frame[name].to_list(), index=result.index, dtype=object)
+        elif result[name].dtype != dtype:
+            result[name] = result[name].astype(dtype)
+    return result
+
+
+def _output_dtypes(raw_parcels_df, model_df):
+    model_dtypes = model_df.dtypes.drop('BlockLot')
+    dtypes = {}
+    for name, dtype in raw_parcels_df.dtypes.items():
+        dtypes[f'{name}_x' if name in model_dtypes and name != 'mapblklot' else name] = dtype
+    for name, dtype in model_dtypes.items():
+        dtypes[f'{name}_y' if name in raw_parcels_df.columns and name != 'mapblklot' else name] = dtype
+    dtypes['blklots'] = raw_parcels_df['blklot'].dtype
+    dtypes['in_historic_district'] = dtypes['Historic']
+    return dtypes
+
+
+def collect_model_plans(raw_parcels_df, model_df, land_use_df, spatial_df):
+    # The removed parcels go to the public parcel set as they were when the
+    # pandas stages dropped them, so the plan is collected once at that point
+    # and only the kept rows go on to scoring.
+    staged = staged_plan(raw_parcels_df, model_df, land_use_df, spatial_df).collect()
+    frames = {'parcels': scoring_plan(staged.filter(pl.col(REMOVED_COL).is_null()).drop(REMOVED_COL).lazy()).collect()}
+    for reason in REMOVAL_REASONS:
+        frames[reason] = staged.filter(pl.col(REMOVED_COL) == reason).drop(REMOVED_COL, *SPATIAL_COLS.values())
+
+    dtypes = _output_dtypes(raw_parcels_df, model_df)
+    return {name: _to_pandas(frame, dtypes) for name, frame in frames.items()}
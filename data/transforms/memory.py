@@ -0,0 +1,160 @@
+import contextlib
+import sys
+import threading
+import tracemalloc
+
+import pandas as pd
+
+PANDAS_ALWAYS_COPY_ON_WRITE = int(pd.__version__.split('.')[0]) >= 3
+
+_low_copy = False
+
+
+def copy_on_write_enabled():
+    if PANDAS_ALWAYS_COPY_ON_WRITE:
+        return True
+    return pd.options.mode.copy_on_write is True
+
+
+def set_low_copy(enabled):
+    global _low_copy
+    if enabled and not PANDAS_ALWAYS_COPY_ON_WRITE:
+        pd.set_option('mode.copy_on_write', True)
+    _low_copy = enabled
+
+
+@contextlib.contextmanager
+def low_copy(enabled=True):
+    previous = _low_copy
+    previous_cow = None if PANDAS_ALWAYS_COPY_ON_WRITE else pd.options.mode.copy_on_write
+    set_low_copy(enabled)
+    try:
+        yield
+    finally:
+        set_low_copy(previous)
+        if previous_cow is not None:
+            pd.set_option('mode.copy_on_write', previous_cow)
+
+
+def working_copy(df):
+    if _low_copy and copy_on_write_enabled():
+        return df.copy(deep=False)
+    return df.copy()
+
+
+PROC_STATUS_PATH = '/proc/self/status'
+PROC_CLEAR_REFS_PATH = '/proc/self/clear_refs'
+RSS_SAMPLE_INTERVAL_S = 0.01
+
+
+def _proc_status_bytes(field):
+    try:
+        with open(PROC_STATUS_PATH) as f:
+            for line in f:
+                if line.startswith(field + ':'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def rss_bytes():
+    rss = _proc_status_bytes('VmRSS')
+    if rss is not None:
+        return rss
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.Process().memory_info().rss
+
+
+def peak_rss_bytes():
+    # The high-water mark since the process started, or since the last
+    # reset_peak_rss where the kernel supports one.
+    peak = _proc_status_bytes('VmHWM')
+    if peak is not None:
+        return peak
+    import resource
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def reset_peak_rss():
+    try:
+        with open(PROC_CLEAR_REFS_PATH, 'w') as f:
+            f.write('5')
+    except OSError:
+        return False
+    return True
+
+
+class _RssSampler:
+    # Fallback for kernels without a resettable high-water mark: poll the
+    # current RSS from a background thread and keep the largest reading.
+    def __init__(self, interval=RSS_SAMPLE_INTERVAL_S):
+        self.interval = interval
+        self.peak = rss_bytes()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, rss_bytes())
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, rss_bytes())
+
+
+MEMORY_COLUMNS = ['stage', 'allocated_bytes', 'retained_bytes', 'rss_before_bytes', 'peak_rss_bytes', 'peak_rss_delta_bytes']
+
+
+# peak_rss_bytes is the resident set's high-water mark during the stage
+# alone, so it also sees native buffers tracemalloc misses. On Linux the
+# kernel's mark is reset at the start of each stage; elsewhere the RSS is
+# sampled while the stage runs, and is None when it cannot be read at all.
+class MemoryTracker:
+    def __init__(self):
+        self.records = []
+
+    @contextlib.contextmanager
+    def track(self, name):
+        started = not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        rss_before = rss_bytes()
+        sampler = None if rss_before is None or reset_peak_rss() else _RssSampler()
+        try:
+            if sampler is None:
+                yield
+            else:
+                with sampler:
+                    yield
+        finally:
+            current, peak = tracemalloc.get_traced_memory()
+            if started:
+                tracemalloc.stop()
+            if rss_before is None:
+                peak_rss = None
+            else:
+                peak_rss = peak_rss_bytes() if sampler is None else sampler.peak
+            self.records.append({
+                'stage': name,
+                'allocated_bytes': peak - before,
+                'retained_bytes': current - before,
+                'rss_before_bytes': rss_before,
+                'peak_rss_bytes': peak_rss,
+                'peak_rss_delta_bytes': None if peak_rss is None else peak_rss - rss_before,
+            })
+
+    def to_frame(self):
+        return pd.DataFrame(self.records, columns=MEMORY_COLUMNS)
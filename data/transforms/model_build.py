@@ -0,0 +1,164 @@
+import pandas as pd
+
+from .calculate_units import PARCEL_FIELDS, calculate_expected_units
+from .calculate_envelope import fill_envelope
+from .clean_parcels import (
+    ADDRESS_COLS,
+    deduplicate_by_mapblklot,
+    fill_missing_addresses,
+    identify_non_housing_parcels,
+    merge_model_data,
+    remove_shipyard_parcels,
+)
+from .calculate_area import fill_missing_area
+from .fill_districts import fill_missing_districts, remove_presidio_parcels
+from .fill_height import fill_height_from_spatial_join, identify_open_space_parcels
+from .fill_land_use import fill_building_sqft, fill_res_dummy
+from .fill_sdb_historic import SDB_COLS, compute_historic_from_districts, fill_historic_columns, fill_sdb_columns
+from .fill_zoning import ZP_COLS, fill_zoning_from_spatial_join, fill_zp_columns
+from .geometry_store import GeometryStore, to_geodataframe
+from .parcel_keys import ParcelKeyIndex
+from .pipeline import Pipeline, Stage
+from .public_parcels import as_public_parcel_set
+from .schema import apply_schema
+from .tracing import traced
+
+MODEL_BACKENDS = ['pandas', 'polars']
+# Polars' exp can round the last bit differently from numpy's, so the expected
+# units only have to agree to rounding; every other column matches exactly.
+BACKEND_ROUNDED_COLUMNS = ['fzp_expected_units_low', 'fzp_expected_units_high']
+BACKEND_RTOL = 1e-12
+# Rows stages whose dropped parcels go to the public parcel set, in the order they ran.
+PUBLIC_PARCEL_STAGES = ['remove_open_space_parcels', 'remove_non_housing_parcels']
+UNITS_INPUTS = list(dict.fromkeys(PARCEL_FIELDS + ['SDB_2016_5Plus_EnvFull', 'Zoning_DR_EnvFull']))
+
+
+def drop_open_space_parcels(parcels_df):
+    return parcels_df[~identify_open_space_parcels(parcels_df)]
+
+
+def drop_non_housing_parcels(parcels_df):
+    return parcels_df[~identify_non_housing_parcels(parcels_df)]
+
+
+def model_stages(model_df, land_use_df, raw_parcels_df, labeler, geometry_store, key_index):
+    # The model build as a stage graph. Each column stage names the columns it
+    # reads and writes, so a cached run only reruns the stages downstream of a
+    # change: moving SDB_ENVELOPE_THRESHOLD reruns the SDB fill and the units,
+    # not the spatial lookups.
+    dist_cols = [col for col in model_df.columns if col.startswith('DIST_')]
+    spatial = {'geometry_store': geometry_store, 'labeler': labeler}
+    return [
+        Stage('deduplicate_by_mapblklot', deduplicate_by_mapblklot, params={'key_index': key_index}, mode='frame'),
+        Stage('fill_missing_addresses', fill_missing_addresses,
+              inputs=['mapblklot'] + list(ADDRESS_COLS), outputs=list(ADDRESS_COLS), params={'land_use_df': land_use_df}),
+        Stage('merge_model_data', merge_model_data,
+              params={'model_df': model_df, 'raw_parcels_df': raw_parcels_df, 'key_index': key_index}, mode='frame'),
+        Stage('remove_presidio_parcels', remove_presidio_parcels, inputs=['planning_district'], mode='rows'),
+        Stage('fill_missing_area', fill_missing_area,
+              inputs=['mapblklot', 'Shape_Area_SqFt', 'Area_1000'], outputs=['Shape_Area_SqFt', 'Area_1000'],
+              params={'geometry_store': geometry_store}),
+        Stage('fill_missing_districts', fill_missing_districts, inputs=['planning_district'] + dist_cols, outputs=dist_cols),
+        Stage('fill_res_dummy', fill_res_dummy,
+              inputs=['mapblklot', 'Res_Dummy', 'Res_Units'], outputs=['Res_Dummy', 'Res_Units'], params={'land_use_df': land_use_df}),
+        Stage('fill_building_sqft', fill_building_sqft,
+              inputs=['mapblklot', 'Tot_Existing_SqFt', 'Bldg_SqFt_1000'], outputs=['Tot_Existing_SqFt', 'Bldg_SqFt_1000'],
+              params={'land_use_df': land_use_df}),
+        Stage('fill_zoning_from_spatial_join', fill_zoning_from_spatial_join,
+              inputs=['mapblklot', 'FZP Planning Code'], outputs=['FZP Planning Code'],
+              params={'zoning_district_gdf': None, **spatial}),
+        Stage('fill_zp_columns', fill_zp_columns, inputs=['FZP Planning Code'] + ZP_COLS, outputs=ZP_COLS),
+        Stage('fill_height_from_spatial_join', fill_height_from_spatial_join,
+              inputs=['mapblklot', 'Height_Ft'], outputs=['Height_Ft'], params={'height_bulk_gdf': None, **spatial}),
+        Stage('remove_open_space_parcels', drop_open_space_parcels, inputs=['Height_Ft'], mode='rows'),
+        Stage('remove_non_housing_parcels', drop_non_housing_parcels, inputs=['zoning_code', 'Area_1000'], mode='rows'),
+        Stage('remove_shipyard_parcels', remove_shipyard_parcels,
+              inputs=['zoning_code', 'Height_Ft', 'analysis_neighborhood'], mode='rows'),
+        Stage('fill_envelope', fill_envelope,
+              inputs=['Env_1000_Area_Height', 'Area_1000', 'Height_Ft'], outputs=['Env_1000_Area_Height']),
+        Stage('fill_sdb_columns', fill_sdb_columns, inputs=SDB_COLS + ['Env_1000_Area_Height', 'Height_Ft'], outputs=SDB_COLS),
+        Stage('compute_historic_from_districts', compute_historic_from_districts,
+              inputs=['mapblklot', 'Historic'], outputs=['in_historic_district'],
+              params={'historic_districts_gdf': None, **spatial}),
+        Stage('fill_historic_columns', fill_historic_columns,
+              inputs=['historic', 'Historic', 'in_historic_district'], outputs=['historic', 'Historic']),
+        Stage('calculate_expected_units', calculate_expected_units,
+              inputs=UNITS_INPUTS, outputs=['fzp_expected_units_low', 'fzp_expected_units_high']),
+    ]
+
+
+def _build_pandas(raw_parcels_df, model_df, land_use_df, labeler, geometry_store, public_set, cache_dir=None):
+    key_index = ParcelKeyIndex(raw_parcels_df)
+    pipeline = Pipeline(model_stages(model_df, land_use_df, raw_parcels_df, labeler, geometry_store, key_index), cache_dir=cache_dir)
+    parcels = pipeline.run(raw_parcels_df)
+    for name in PUBLIC_PARCEL_STAGES:
+        dropped = pipeline.dropped[name]
+        if len(dropped):
+            public_set.add(to_geodataframe(dropped, 'geometry', geometry_store))
+    return parcels
+
+
+def spatial_attributes(geometry_store, labeler):
+    # Everything the model stages need from the parcel shapes, one row per mapblklot.
+    from .lazy_model import SPATIAL_COLS
+
+    labels = labeler.labels(geometry_store)
+    spatial = pd.DataFrame({geometry_store.key: geometry_store.geometry.index, SPATIAL_COLS['area']: geometry_store.area.to_numpy()})
+    for layer, col in SPATIAL_COLS.items():
+        if layer in labels.columns:
+            values = labels[layer]
+            spatial[col] = values.astype(str).where(values.notna(), None).to_numpy(dtype=object)
+        elif col not in spatial.columns:
+            spatial[col] = None
+    return spatial
+
+
+def _build_polars(raw_parcels_df, model_df, land_use_df, labeler, geometry_store, public_set, cache_dir=None):
+    from .lazy_model import REMOVAL_REASONS, collect_model_plans
+
+    # The plans read typed model columns. read_input already applies the
+    # schema, which leaves this a no-op; frames built another way get typed here.
+    raw_parcels_df, model_df, land_use_df = (apply_schema(df) for df in (raw_parcels_df, model_df, land_use_df))
+    frames = collect_model_plans(raw_parcels_df, model_df, land_use_df, spatial_attributes(geometry_store, labeler))
+    for removed in REMOVAL_REASONS:
+        if len(frames[removed]):
+            public_set.add(to_geodataframe(frames[removed], 'geometry', geometry_store))
+    return frames['parcels']
+
+
+@traced
+def build_model_parcels(raw_parcels_df, model_df, land_use_df, labeler, public_parcels=None, geometry_store=None, backend='pandas',
+                        cache_dir=None):
+    if backend not in MODEL_BACKENDS:
+        raise ValueError(f"Unknown backend '{backend}', expected one of {MODEL_BACKENDS}")
+
+    store = geometry_store if geometry_store is not None else GeometryStore(raw_parcels_df)
+    public_set, owned = as_public_parcel_set(public_parcels)
+    build = _build_polars if backend == 'polars' else _build_pandas
+    parcels = build(raw_parcels_df, model_df, land_use_df, labeler, store, public_set, cache_dir)
+
+    if owned and public_set.path is not None:
+        public_set.write()
+    return parcels
+
+
+def assert_backend_frame_equal(actual, expected):
+    pd.testing.assert_index_equal(actual.columns, expected.columns)
+    rounded = [col for col in BACKEND_ROUNDED_COLUMNS if col in expected.columns]
+    pd.testing.assert_frame_equal(actual.drop(columns=rounded), expected.drop(columns=rounded), check_exact=True)
+    pd.testing.assert_frame_equal(actual[rounded], expected[rounded], check_exact=False, rtol=BACKEND_RTOL, atol=0)
+
+
+def backend_mismatches(outputs, reference='pandas'):
+    # Every backend must reproduce the reference: values, dtypes, row labels
+    # and the parcels it hands to the public parcel set.
+    mismatches = {}
+    for backend, frames in outputs.items():
+        if backend == reference:
+            continue
+        for name, expected, actual in zip(['parcels', 'public parcels'], outputs[reference], frames):
+            try:
+                assert_backend_frame_equal(actual, expected)
+            except AssertionError as e:
+                mismatches[f'{backend} {name}'] = str(e)
+    return mismatches
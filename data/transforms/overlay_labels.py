@@ -0,0 +1,150 @@
+import hashlib
+import threading
+import weakref
+
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+import shapely
+
+from .geometry_store import PROJECTED_CRS, SOURCE_CRS
+
+LABEL_POINTS = ['centroid', 'representative_point']
+# Snapping distance for points that fall in a gap between a layer's
+# polygons. 0 leaves them unlabeled, as the spatial joins always have.
+OVERLAY_GAP_FT = 0.0
+
+HEIGHT_LAYER = 'height'
+ZONING_LAYER = 'zoning'
+HISTORIC_LAYER = 'historic'
+
+
+class OverlayLayer:
+    def __init__(self, name, layer_gdf, label_col):
+        # Polygons without a label can never win a point, so leave them out of the tree.
+        layer_gdf = layer_gdf[layer_gdf[label_col].notna() & layer_gdf.geometry.notna()]
+        if layer_gdf.crs is not None and layer_gdf.crs != SOURCE_CRS:
+            layer_gdf = layer_gdf.to_crs(SOURCE_CRS)
+
+        self.name = name
+        self.label_col = label_col
+        self.geometry = layer_gdf.geometry.to_numpy()
+        self.labels = layer_gdf[label_col].to_numpy()
+        self.tree = shapely.STRtree(self.geometry)
+        self._projected_tree = None
+        self._fingerprint = None
+
+    @property
+    def fingerprint(self):
+        if self._fingerprint is None:
+            h = hashlib.sha256()
+            h.update(repr((self.name, self.label_col)).encode())
+            for shape, label in zip(shapely.to_wkb(self.geometry), self.labels):
+                h.update(shape)
+                h.update(repr(label).encode())
+            self._fingerprint = h.hexdigest()
+        return self._fingerprint
+
+    @property
+    def projected_tree(self):
+        if self._projected_tree is None:
+            projected = gpd.GeoSeries(self.geometry, crs=SOURCE_CRS).to_crs(PROJECTED_CRS)
+            self._projected_tree = shapely.STRtree(projected.to_numpy())
+        return self._projected_tree
+
+
+def _last_match(points, polygons, n_points):
+    # When a point matches several polygons the last one in layer order wins,
+    # which is what the old sjoin-then-to_dict lookups did.
+    best = np.full(n_points, -1)
+    np.maximum.at(best, points, polygons)
+    return best
+
+
+# Labels every registered layer from one set of points per GeometryStore.
+# A point strictly inside one or more polygons takes the label of the last of
+# them in layer order. With boundary=True a point on a polygon's edge,
+# including the edge two districts share, counts as inside (ties again going
+# to the last polygon); otherwise it stays unlabeled like a 'within' join.
+# Points in gaps stay unlabeled unless gap_ft is positive, in which case they
+# take the nearest polygon within that many feet.
+class OverlayLabeler:
+    def __init__(self, points='centroid', boundary=True, gap_ft=OVERLAY_GAP_FT):
+        if points not in LABEL_POINTS:
+            raise ValueError(f"Unknown label points '{points}', expected one of {LABEL_POINTS}")
+        self.points = points
+        self.boundary = boundary
+        self.gap_ft = gap_ft
+        self.layers = {}
+        self._labels = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    @property
+    def fingerprint(self):
+        h = hashlib.sha256()
+        h.update(repr((self.points, self.boundary, self.gap_ft)).encode())
+        for layer in self.layers.values():
+            h.update(layer.fingerprint.encode())
+        return h.hexdigest()
+
+    def add_layer(self, name, layer_gdf, label_col):
+        self.layers[name] = OverlayLayer(name, layer_gdf, label_col)
+        with self._lock:
+            self._labels.clear()
+        return self
+
+    def _label_layer(self, layer, points, valid):
+        positions = np.full(len(points), -1)
+        if not len(layer.geometry):
+            return positions
+
+        point_idx, polygon_idx = layer.tree.query(points[valid], predicate='within')
+        positions[valid] = _last_match(point_idx, polygon_idx, valid.sum())
+
+        unmatched = valid & (positions < 0)
+        if self.boundary and unmatched.any():
+            point_idx, polygon_idx = layer.tree.query(points[unmatched], predicate='intersects')
+            positions[unmatched] = _last_match(point_idx, polygon_idx, unmatched.sum())
+
+        unmatched = valid & (positions < 0)
+        if self.gap_ft > 0 and unmatched.any():
+            projected = gpd.GeoSeries(points[unmatched], crs=SOURCE_CRS).to_crs(PROJECTED_CRS).to_numpy()
+            point_idx, polygon_idx = layer.projected_tree.query_nearest(projected, max_distance=self.gap_ft)
+            positions[unmatched] = _last_match(point_idx, polygon_idx, unmatched.sum())
+
+        return positions
+
+    def label_points(self, points, index=None):
+        points = np.asarray(points, dtype=object)
+        valid = ~shapely.is_missing(points) & ~shapely.is_empty(points)
+        labels = {}
+        for name, layer in self.layers.items():
+            positions = self._label_layer(layer, points, valid)
+            labels[name] = np.full(len(points), None, dtype=object)
+            labels[name][positions >= 0] = layer.labels[positions[positions >= 0]]
+        return pd.DataFrame(labels, index=index, columns=list(self.layers))
+
+    def labels(self, geometry_store):
+        if geometry_store is None:
+            raise ValueError('OverlayLabeler needs the GeometryStore holding the parcel shapes')
+        with self._lock:
+            if geometry_store not in self._labels:
+                points = getattr(geometry_store, self.points)
+                self._labels[geometry_store] = self.label_points(points.to_numpy(), index=points.index)
+            return self._labels[geometry_store]
+
+    def lookup(self, name, keys, geometry_store):
+        values = self.labels(geometry_store)[name].reindex(keys.to_numpy())
+        values.index = keys.index
+        return values
+
+
+def parcel_overlay_labeler(height_bulk_gdf=None, zoning_district_gdf=None, historic_districts_gdf=None, **kwargs):
+    labeler = OverlayLabeler(**kwargs)
+    if height_bulk_gdf is not None:
+        labeler.add_layer(HEIGHT_LAYER, height_bulk_gdf, 'gen_hght')
+    if zoning_district_gdf is not None:
+        labeler.add_layer(ZONING_LAYER, zoning_district_gdf, 'zoning')
+    if historic_districts_gdf is not None:
+        labeler.add_layer(HISTORIC_LAYER, historic_districts_gdf, 'name')
+    return labeler
@@ -0,0 +1,156 @@
+import json
+import struct
+
+import numpy as np
+import pandas as pd
+
+from .calculate_transit_distance import TransitStopIndex
+from .calculate_units import FIXED_PROB_FIELDS, PARCEL_TERM_COLUMNS, calculate_fixed_terms
+from .tracing import traced
+
+BUNDLE_MAGIC = b'PBND'
+BUNDLE_VERSION = 1
+# Every array starts on this boundary so the browser can view it in place
+# with a typed array, which requires offsets aligned to the element size.
+BUNDLE_ALIGNMENT = 8
+CENTROID_COLUMNS = ['centroid_lat', 'centroid_lon']
+# Measures are float32, but float32 longitudes are only good to about a
+# metre, so centroids stay float64 and browser distances match the pipeline's.
+# So do the inputs and outputs of client-side scoring, which must reproduce
+# calculate_expected_units to rounding.
+SCORING_COLUMNS = PARCEL_TERM_COLUMNS + [
+    'Area_1000', 'Env_1000_Area_Height', 'SDB_2016_5Plus_EnvFull', 'fzp_expected_units_low', 'fzp_expected_units_high',
+]
+FLOAT64_COLUMNS = CENTROID_COLUMNS + SCORING_COLUMNS
+MODEL_TERM_INPUTS = FIXED_PROB_FIELDS + ['Zoning_DR_EnvFull']
+INTEGER_DTYPES = ['uint8', 'int16', 'int32']
+CODE_DTYPES = ['uint8', 'uint16', 'uint32']
+
+
+def _padding(length):
+    return -length % BUNDLE_ALIGNMENT
+
+
+def _smallest_dtype(values, dtypes):
+    for dtype in dtypes:
+        info = np.iinfo(dtype)
+        if not len(values) or (values.min() >= info.min and values.max() <= info.max):
+            return np.dtype(dtype)
+    return None
+
+
+def _encode_column(series):
+    if pd.api.types.is_bool_dtype(series) and series.notna().all():
+        return {'type': 'uint8'}, series.to_numpy(dtype='uint8')
+
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        values = series.to_numpy(dtype='float64', na_value=np.nan)
+        if series.name in FLOAT64_COLUMNS:
+            return {'type': 'float64'}, values
+        missing = np.isnan(values)
+        present = values[~missing]
+        if np.isfinite(present).all() and (present % 1 == 0).all():
+            if not missing.any():
+                dtype = _smallest_dtype(present, INTEGER_DTYPES)
+                if dtype is not None:
+                    return {'type': dtype.name}, values.astype(dtype)
+            else:
+                # Integer columns with gaps, such as dummies outside the model,
+                # mark missing rows with one past the largest value.
+                sentinel = present.max() + 1 if len(present) else 0
+                dtype = _smallest_dtype(np.append(present, sentinel), INTEGER_DTYPES)
+                if dtype is not None:
+                    return {'type': dtype.name, 'missing': int(sentinel)}, np.where(missing, sentinel, values).astype(dtype)
+        return {'type': 'float32'}, values.astype('float32')
+
+    codes, uniques = pd.factorize(series, sort=True)
+    dictionary = [str(value) for value in uniques]
+    if (codes < 0).any():
+        # Missing values point at a trailing null entry rather than a sentinel.
+        codes = np.where(codes < 0, len(dictionary), codes)
+        dictionary.append(None)
+    dtype = _smallest_dtype(np.array([len(dictionary) - 1]), CODE_DTYPES)
+    return {'type': 'dictionary', 'codes': dtype.name, 'dictionary': dictionary}, codes.astype(dtype)
+
+
+@traced
+def build_parcel_bundle(parcels, columns=None, geometry_store=None, transit_stops=None):
+    parcels = parcels[columns] if columns is not None else parcels.drop(columns=['shape', 'geometry'], errors='ignore')
+    parcels = parcels.reset_index(drop=True)
+
+    if geometry_store is not None and not set(CENTROID_COLUMNS).issubset(parcels.columns):
+        centroid = geometry_store.lookup('centroid', parcels[geometry_store.key])
+        parcels = parcels.assign(centroid_lat=centroid.y.to_numpy(), centroid_lon=centroid.x.to_numpy())
+
+    if transit_stops is not None and 'distance_to_transit' not in parcels.columns:
+        if not set(CENTROID_COLUMNS).issubset(parcels.columns):
+            raise ValueError('distance_to_transit needs centroids, pass geometry_store or centroid columns')
+        distances, _ = TransitStopIndex(transit_stops).nearest(parcels['centroid_lat'], parcels['centroid_lon'])
+        parcels = parcels.assign(distance_to_transit=distances)
+
+    return parcels
+
+
+def encode_parcel_bundle(parcels):
+    specs = []
+    arrays = []
+    offset = 0
+    for name in parcels.columns:
+        spec, values = _encode_column(parcels[name])
+        data = values.astype(values.dtype.newbyteorder('<'), copy=False).tobytes()
+        specs.append({'name': name, **spec, 'offset': offset, 'bytes': len(data)})
+        arrays.append(data + b'\0' * _padding(len(data)))
+        offset += len(data) + _padding(len(data))
+
+    header = json.dumps({'version': BUNDLE_VERSION, 'rows': len(parcels), 'columns': specs},
+                        separators=(',', ':')).encode('utf-8')
+    # The data section starts after magic, header length and the padded header.
+    header += b' ' * _padding(len(BUNDLE_MAGIC) + 4 + len(header))
+    return b''.join([BUNDLE_MAGIC, struct.pack('<I', len(header)), header, *arrays])
+
+
+def write_parcel_bundle(parcels, path, columns=None, geometry_store=None, transit_stops=None):
+    bundle = encode_parcel_bundle(build_parcel_bundle(parcels, columns, geometry_store, transit_stops))
+    with open(path, 'wb') as f:
+        f.write(bundle)
+    return len(bundle)
+
+
+def read_parcel_bundle(path):
+    with open(path, 'rb') as f:
+        buffer = f.read()
+    if buffer[:len(BUNDLE_MAGIC)] != BUNDLE_MAGIC:
+        raise ValueError(f'{path} is not a parcel bundle')
+
+    header_length, = struct.unpack_from('<I', buffer, len(BUNDLE_MAGIC))
+    data_start = len(BUNDLE_MAGIC) + 4 + header_length
+    header = json.loads(buffer[len(BUNDLE_MAGIC) + 4:data_start])
+    if header['version'] != BUNDLE_VERSION:
+        raise ValueError(f"Unsupported parcel bundle version {header['version']}, expected {BUNDLE_VERSION}")
+
+    columns = {}
+    for spec in header['columns']:
+        dtype = np.dtype(spec['codes'] if spec['type'] == 'dictionary' else spec['type']).newbyteorder('<')
+        values = np.frombuffer(buffer, dtype=dtype, count=header['rows'], offset=data_start + spec['offset'])
+        if spec['type'] == 'dictionary':
+            values = np.array(spec['dictionary'], dtype=object)[values]
+        elif 'missing' in spec:
+            values = np.where(values == spec['missing'], np.nan, values)
+        columns[spec['name']] = values
+    return pd.DataFrame(columns)
+
+
+def parse_like_browser(model_text, columns):
+    # MapView reads model CSV numbers with parseFloat(value) || 0. astype(float)
+    # rounds correctly as parseFloat does, which pd.to_numeric does not always.
+    return model_text.reindex(columns=columns, fill_value='').replace('', np.nan).astype(float).fillna(0)
+
+
+def add_model_terms(model_text):
+    # Adds fixed_z and fixed_units to the text of the model CSV the web app
+    # loads, computed from the same doubles the browser will parse.
+    result = model_text.drop(columns=PARCEL_TERM_COLUMNS, errors='ignore')
+    for col, values in zip(PARCEL_TERM_COLUMNS, calculate_fixed_terms(parse_like_browser(model_text, MODEL_TERM_INPUTS))):
+        # Shortest round-trip text, which parseFloat reads back to the same double.
+        result[col] = values.astype(str)
+    return result
@@ -0,0 +1,94 @@
+import hashlib
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+
+
+def _last_positions(codes, size):
+    # Row of the last occurrence of each code, -1 where a code never appears,
+    # matching what set_index(...).to_dict() kept for repeated keys.
+    last = np.full(size, -1)
+    present = np.flatnonzero(codes >= 0)
+    np.maximum.at(last, codes[present], present)
+    return last
+
+
+def _first_positions(codes, size):
+    first = np.full(size, len(codes))
+    present = np.flatnonzero(codes >= 0)
+    np.minimum.at(first, codes[present], present)
+    return np.where(first < len(codes), first, -1)
+
+
+# Dense integer codes for every mapblklot and blklot in the raw parcels, built
+# once per run. Both key sets are sorted, so code order is string order, and
+# the blklots of each mapblklot sit in a CSR layout: the codes of mapblklot m's
+# blklots are children[indptr[m]:indptr[m + 1]], sorted and with repeats kept.
+# row_codes and first_row tie the index back to the frame it was built from.
+# Keys outside the raw parcels encode as -1.
+class ParcelKeyIndex:
+    def __init__(self, raw_parcels_df, mapblklot_col='mapblklot', blklot_col='blklot'):
+        map_codes, mapblklots = pd.factorize(raw_parcels_df[mapblklot_col], sort=True)
+        blklot_codes, blklots = pd.factorize(raw_parcels_df[blklot_col], sort=True)
+        self.mapblklots = pd.Index(mapblklots)
+        self.blklots = pd.Index(blklots)
+        self.row_codes = map_codes
+        self.first_row = _first_positions(map_codes, len(mapblklots))
+
+        last = _last_positions(blklot_codes, len(blklots))
+        self.parent = map_codes[last]
+
+        grouped = map_codes >= 0
+        order = np.lexsort((blklot_codes[grouped], map_codes[grouped]))
+        counts = np.bincount(map_codes[grouped], minlength=len(mapblklots))
+        self.indptr = np.concatenate([[0], np.cumsum(counts)])
+        self.children = blklot_codes[grouped][order]
+
+    def __len__(self):
+        return len(self.mapblklots)
+
+    @cached_property
+    def fingerprint(self):
+        h = hashlib.sha256()
+        for keys in (self.mapblklots, self.blklots):
+            h.update('\0'.join(map(str, keys)).encode())
+        h.update(self.row_codes.tobytes())
+        return h.hexdigest()
+
+    def mapblklot_codes(self, keys):
+        return self.mapblklots.get_indexer(pd.Index(keys))
+
+    def blklot_codes(self, keys):
+        return self.blklots.get_indexer(pd.Index(keys))
+
+    def mask(self, codes):
+        # Membership table over mapblklot codes, so repeated isin tests against
+        # the same set become array lookups.
+        member = np.zeros(len(self.mapblklots), dtype=bool)
+        codes = np.asarray(codes)
+        member[codes[codes >= 0]] = True
+        return member
+
+    def isin(self, keys, member):
+        codes = self.mapblklot_codes(keys)
+        return np.where(codes >= 0, member[codes], False)
+
+    def parent_of(self, blklot_codes):
+        blklot_codes = np.asarray(blklot_codes)
+        return np.where(blklot_codes >= 0, self.parent[blklot_codes], -1)
+
+    def joined_blklots(self, map_codes, sep=','):
+        # Most mapblklots hold a single blklot, which needs no join at all.
+        map_codes = np.asarray(map_codes)
+        counts = np.diff(self.indptr)[map_codes]
+        values = self.blklots.to_numpy(dtype=object)
+        joined = values[self.children[self.indptr[map_codes]]].copy()
+        for i in np.flatnonzero(counts > 1):
+            code = map_codes[i]
+            joined[i] = sep.join(values[self.children[self.indptr[code]:self.indptr[code + 1]]])
+        return joined
+
+    def first_rows(self, codes):
+        # Position of the first of the given codes for each mapblklot, -1 if it never appears.
+        return _first_positions(np.asarray(codes), len(self.mapblklots))
@@ -0,0 +1,210 @@
+import functools
+import hashlib
+import os
+import types
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+import pandas as pd
+
+from .ingest import source_signature
+from .memory import low_copy
+
+PACKAGE_NAME = __name__.rsplit('.', 1)[0]
+STAGE_MODES = ['columns', 'rows', 'frame']
+FINGERPRINT_VALUE_TYPES = (int, float, str, bool, list, tuple, dict, set, frozenset, type(None))
+
+
+def _hash_code(code, func_globals, h, seen):
+    h.update(code.co_code)
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            _hash_code(const, func_globals, h, seen)
+        else:
+            h.update(repr(const).encode())
+
+    for name in code.co_names:
+        h.update(name.encode())
+        _hash_value(func_globals.get(name), h, seen)
+
+
+def _hash_value(value, h, seen):
+    if isinstance(value, FINGERPRINT_VALUE_TYPES):
+        h.update(repr(value).encode())
+    elif isinstance(value, functools.partial):
+        _hash_value(value.func, h, seen)
+        h.update(repr((value.args, sorted(value.keywords.items()))).encode())
+    elif isinstance(value, (types.FunctionType, type)) and value not in seen:
+        if not value.__module__.startswith(PACKAGE_NAME) and value.__module__ != '__main__':
+            return
+        seen.add(value)
+        if isinstance(value, type):
+            for attr in vars(value).values():
+                _hash_value(getattr(attr, 'func', attr), h, seen)
+        else:
+            _hash_code(value.__code__, value.__globals__, h, seen)
+            for cell in value.__closure__ or ():
+                _hash_value(cell.cell_contents, h, seen)
+
+
+def code_fingerprint(func):
+    h = hashlib.sha256()
+    _hash_value(func, h, set())
+    return h.hexdigest()
+
+
+def frame_digest(frame):
+    h = hashlib.sha256()
+    h.update(repr(list(frame.columns)).encode())
+    h.update(pd.util.hash_pandas_object(frame, index=True).values.tobytes())
+    return h.hexdigest()
+
+
+def param_digest(value):
+    # Frames hash by content and shared objects such as a GeometryStore by
+    # their fingerprint, so a stage's cache key never depends on object identity.
+    if isinstance(value, pd.DataFrame):
+        return frame_digest(value)
+    fingerprint = getattr(value, 'fingerprint', None)
+    if isinstance(fingerprint, str):
+        return fingerprint
+    return repr(value)
+
+
+class Stage:
+    def __init__(self, name, func, inputs=(), outputs=(), files=None, params=None, mode='columns'):
+        if mode not in STAGE_MODES:
+            raise ValueError(f"Unknown stage mode '{mode}', expected one of {STAGE_MODES}")
+        self.name = name
+        self.func = func
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.files = dict(files or {})
+        self.params = dict(params or {})
+        self.mode = mode
+
+    def depends_on(self, other):
+        if self.mode != 'columns' or other.mode != 'columns':
+            return True
+        return bool(
+            set(self.inputs) & set(other.outputs) or
+            set(self.outputs) & set(other.inputs) or
+            set(self.outputs) & set(other.outputs)
+        )
+
+    def present_inputs(self, frame):
+        # Optional inputs a frame does not carry are left out rather than failing the stage.
+        return [col for col in self.inputs if col in frame.columns]
+
+    def stage_input(self, frame):
+        if self.mode == 'columns' and self.inputs:
+            return frame[self.present_inputs(frame)]
+        return frame
+
+    def cache_key(self, stage_input):
+        hashed_input = stage_input[self.present_inputs(stage_input)] if self.inputs and self.mode != 'frame' else stage_input
+        h = hashlib.sha256()
+        h.update(self.name.encode())
+        h.update(self.mode.encode())
+        h.update(code_fingerprint(self.func).encode())
+        h.update(repr(sorted((k, param_digest(v)) for k, v in self.params.items())).encode())
+        h.update(repr(sorted((k, source_signature(path)) for k, path in self.files.items())).encode())
+        h.update(frame_digest(hashed_input).encode())
+        return h.hexdigest()
+
+    def run(self, stage_input):
+        output = self.func(stage_input, **self.files, **self.params)
+        if self.mode == 'columns':
+            return output[self.outputs]
+        if self.mode == 'rows':
+            return output.index
+        return output
+
+
+class Pipeline:
+    def __init__(self, stages, cache_dir=None, max_workers=None, low_copy=False, memory_tracker=None):
+        names = [stage.name for stage in stages]
+        if len(set(names)) != len(names):
+            raise ValueError('Stage names must be unique')
+
+        self.stages = list(stages)
+        self.cache_dir = cache_dir
+        self.max_workers = max_workers
+        self.low_copy = low_copy
+        self.memory_tracker = memory_tracker
+        self.report = {}
+        self.dropped = {}
+        self.dependencies = {
+            i: {j for j in range(i) if stage.depends_on(self.stages[j])}
+            for i, stage in enumerate(self.stages)
+        }
+
+    def _cache_path(self, stage, key):
+        return os.path.join(self.cache_dir, f'{stage.name}-{key[:16]}.pkl')
+
+    def _execute(self, stage, stage_input):
+        if self.memory_tracker is None:
+            return self._execute_cached(stage, stage_input)
+        with self.memory_tracker.track(stage.name):
+            return self._execute_cached(stage, stage_input)
+
+    def _execute_cached(self, stage, stage_input):
+        if self.cache_dir is None:
+            return stage.run(stage_input), 'ran'
+
+        cache_path = self._cache_path(stage, stage.cache_key(stage_input))
+        if os.path.exists(cache_path):
+            return pd.read_pickle(cache_path), 'cached'
+
+        output = stage.run(stage_input)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = cache_path + '.tmp'
+        pd.to_pickle(output, tmp_path)
+        os.replace(tmp_path, cache_path)
+        return output, 'ran'
+
+    def _apply(self, frame, stage, output):
+        if stage.mode == 'columns':
+            frame = frame.copy(deep=False)
+            for col in stage.outputs:
+                frame[col] = output[col]
+            return frame
+        if stage.mode == 'rows':
+            self.dropped[stage.name] = frame[~frame.index.isin(output)]
+            return frame.loc[output]
+        return output
+
+    def run(self, frame):
+        with low_copy(self.low_copy):
+            return self._run(frame)
+
+    def _run(self, frame):
+        self.report = {}
+        self.dropped = {}
+        pending = list(range(len(self.stages)))
+        running = {}
+        finished = {}
+        applied = 0
+
+        # Memory accounting is process-wide, so tracked runs go one stage at a time.
+        max_workers = 1 if self.memory_tracker is not None else self.max_workers
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            while pending or running:
+                for i in list(pending):
+                    if all(j < applied for j in self.dependencies[i]):
+                        stage = self.stages[i]
+                        running[pool.submit(self._execute, stage, stage.stage_input(frame))] = i
+                        pending.remove(i)
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    finished[running.pop(future)] = future.result()
+
+                # Outputs are applied in stage order, so new columns land in
+                # the same place however the concurrent stages finish.
+                while applied in finished:
+                    output, status = finished.pop(applied)
+                    frame = self._apply(frame, self.stages[applied], output)
+                    self.report[self.stages[applied].name] = status
+                    applied += 1
+
+        return frame
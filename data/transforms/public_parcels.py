@@ -0,0 +1,70 @@
+import os
+
+import pandas as pd
+import geopandas as gpd
+
+from .schema import TEXT_EXPORT_SCHEMA, format_schema
+
+PUBLIC_PARCEL_EXTRA_FORMATS = ['parquet', 'fgb']
+
+
+class PublicParcelSet:
+    def __init__(self, path=None, crs='EPSG:4326'):
+        self.path = path
+        if path is not None and os.path.exists(path):
+            existing = gpd.read_file(path)
+        else:
+            existing = gpd.GeoDataFrame(geometry=[], crs=crs)
+
+        self.columns = list(existing.columns) if len(existing.columns) > 1 else None
+        self.mapblklots = set(existing['mapblklot'].astype(str)) if 'mapblklot' in existing.columns else set()
+        self._frames = [existing]
+
+    def __len__(self):
+        return len(self.mapblklots)
+
+    def add(self, parcels_gdf):
+        keys = parcels_gdf['mapblklot'].astype(str)
+        new_mask = ~keys.isin(self.mapblklots) & ~keys.duplicated()
+        new_public = parcels_gdf[new_mask]
+        if len(new_public) == 0:
+            return 0
+
+        if self.columns is None:
+            self.columns = list(new_public.columns)
+        new_public = new_public[[c for c in self.columns if c in new_public.columns]]
+
+        self._frames.append(new_public)
+        self.mapblklots.update(keys[new_mask])
+        return len(new_public)
+
+    def to_frame(self):
+        if len(self._frames) > 1:
+            frames = [frame for frame in self._frames if len(frame) > 0] or self._frames[:1]
+            self._frames = [gpd.GeoDataFrame(pd.concat(frames, ignore_index=True), crs=self._frames[0].crs)]
+        return self._frames[0]
+
+    def replace(self, public_gdf):
+        self._frames = [public_gdf]
+        self.mapblklots = set(public_gdf['mapblklot'].astype(str))
+
+    def write(self, path=None, extra_formats=()):
+        path = path if path is not None else self.path
+        public_gdf = format_schema(self.to_frame(), TEXT_EXPORT_SCHEMA)
+        public_gdf.to_file(path, driver='GeoJSON')
+
+        base = os.path.splitext(path)[0]
+        for fmt in extra_formats:
+            if fmt == 'parquet':
+                public_gdf.to_parquet(base + '.parquet')
+            elif fmt == 'fgb':
+                public_gdf.to_file(base + '.fgb', driver='FlatGeobuf')
+            else:
+                raise ValueError(f"Unknown public parcel format '{fmt}', expected one of {PUBLIC_PARCEL_EXTRA_FORMATS}")
+        return path
+
+
+def as_public_parcel_set(public_parcels):
+    if isinstance(public_parcels, PublicParcelSet):
+        return public_parcels, False
+    return PublicParcelSet(public_parcels), True
@@ -0,0 +1,76 @@
+import os
+
+import pandas as pd
+
+from .calculate_units import PARCEL_FIELDS
+from .ingest import NUMERIC_INPUT_COLUMNS, parse_numeric
+from .memory import working_copy
+
+# Compact dtypes for the model columns. Dummies are nullable uint8, so parcels
+# outside the model keep an explicit null mask instead of falling back to
+# float64 NaN. Measures feeding the regression stay float64 so expected units
+# match what parsing the text gave; counts only used for Res_Dummy fit float32.
+# Labels the transforms only read become categoricals.
+DUMMY_DTYPE = 'UInt8'
+LABEL_DTYPE = 'category'
+
+MEASURE_COLUMNS = {
+    'Shape_Area_SqFt': 'float64',
+    'Area_1000': 'float64',
+    'Height_Ft': 'float64',
+    'Env_1000_Area_Height': 'float64',
+    'Tot_Existing_SqFt': 'float64',
+    'Bldg_SqFt_1000': 'float64',
+    'SDB_2016_5Plus_EnvFull': 'float64',
+    'Zoning_DR_EnvFull': 'float64',
+    'Res_Units': 'float32',
+    'resunits': 'float32',
+    'res': 'float64',
+}
+DUMMY_COLUMNS = [field for field in PARCEL_FIELDS if field not in MEASURE_COLUMNS]
+LABEL_COLUMNS = ['analysis_neighborhood', 'zoning_code', 'zoning_district', 'supervisor_district', 'supname', 'planning_district']
+
+MODEL_SCHEMA = {
+    **{col: DUMMY_DTYPE for col in DUMMY_COLUMNS},
+    **MEASURE_COLUMNS,
+    **{col: LABEL_DTYPE for col in LABEL_COLUMNS},
+}
+# The inputs ingest has always parsed to numbers stay numbers in the GeoJSON.
+TEXT_EXPORT_SCHEMA = {col: dtype for col, dtype in MODEL_SCHEMA.items() if col not in NUMERIC_INPUT_COLUMNS}
+
+
+def apply_schema(df, schema=MODEL_SCHEMA):
+    df = working_copy(df)
+    for col, dtype in schema.items():
+        if col not in df.columns or df[col].dtype == dtype:
+            continue
+        if dtype == LABEL_DTYPE:
+            df[col] = df[col].astype(LABEL_DTYPE)
+        else:
+            df[col] = parse_numeric(df[col], errors='coerce').astype(dtype)
+    return df
+
+
+def format_schema(df, schema=MODEL_SCHEMA):
+    # Text form of a typed frame for export, with dummies written as '0'/'1'
+    # like the source CSVs and missing values left empty. Columns that are
+    # still text pass through as they are.
+    df = working_copy(df)
+    for col, dtype in schema.items():
+        if col not in df.columns or pd.api.types.is_string_dtype(df[col]):
+            continue
+        values = df[col]
+        if dtype == DUMMY_DTYPE:
+            values = parse_numeric(values, errors='coerce')
+            text = values.astype('Int64').astype(str)
+        else:
+            text = values.astype(str)
+        df[col] = text.where(values.notna())
+    return df
+
+
+def write_csv(df, path, schema=MODEL_SCHEMA):
+    tmp_path = path + '.tmp'
+    format_schema(df, schema).to_csv(tmp_path, index=False)
+    os.replace(tmp_path, path)
+    return path
@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+
+from .calculate_units import PARCEL_FIELDS, calculate_parcel_terms, calculate_20_year_prob
+from .ingest import parse_numeric
+
+SESSION_GROUP_COLS = ['analysis_neighborhood', 'supervisor_district', 'zoning_code']
+SESSION_MODEL_FIELDS = PARCEL_FIELDS + ['SDB_2016_5Plus_EnvFull', 'Zoning_DR_EnvFull']
+SESSION_TOTAL_COLS = ['parcels', 'units_if_redeveloped', 'fzp_expected_units_low', 'fzp_expected_units_high']
+
+
+class ScoringSession:
+    def __init__(self, parcels_df, group_cols=SESSION_GROUP_COLS, fast=False):
+        self.index = parcels_df.index
+        self.fast = fast
+        self.fields = pd.DataFrame(
+            {field: parse_numeric(parcels_df[field], errors='coerce').fillna(0).values if field in parcels_df.columns else 0.0
+             for field in SESSION_MODEL_FIELDS},
+            index=self.index,
+        )
+
+        self.parcel_z, self.units = calculate_parcel_terms(self.fields)
+        self.expected_low = calculate_20_year_prob(self.parcel_z, 'low', fast) * self.units
+        self.expected_high = calculate_20_year_prob(self.parcel_z, 'high', fast) * self.units
+
+        self.group_codes = {}
+        self.group_labels = {}
+        for col in group_cols:
+            codes, labels = pd.factorize(parcels_df[col])
+            self.group_codes[col] = np.where(codes < 0, len(labels), codes)
+            self.group_labels[col] = labels
+        self.refresh()
+
+    def _contributions(self, positions=None):
+        if positions is None:
+            positions = slice(None)
+        units = self.units[positions]
+        return np.column_stack([
+            np.ones(len(units)),
+            units,
+            self.expected_low[positions],
+            self.expected_high[positions],
+        ])
+
+    def refresh(self):
+        contributions = self._contributions()
+        self.totals = {}
+        for col, codes in self.group_codes.items():
+            totals = np.zeros((len(self.group_labels[col]) + 1, len(SESSION_TOTAL_COLS)))
+            np.add.at(totals, codes, contributions)
+            self.totals[col] = totals
+
+    def apply_patch(self, patch_df):
+        unknown = [col for col in patch_df.columns if col not in SESSION_MODEL_FIELDS]
+        if unknown:
+            raise ValueError(f'Cannot patch {unknown}, expected columns from {SESSION_MODEL_FIELDS}')
+
+        # A parcel patched twice takes its last row, as if the edits had been applied in turn.
+        patch_df = patch_df[~patch_df.index.duplicated(keep='last')]
+        positions = self.index.get_indexer(patch_df.index)
+        if (positions < 0).any():
+            raise KeyError(f'Unknown parcels in patch: {list(patch_df.index[positions < 0])}')
+
+        before = self._contributions(positions)
+
+        for col in patch_df.columns:
+            values = parse_numeric(patch_df[col], errors='coerce').fillna(0).values
+            self.fields.iloc[positions, self.fields.columns.get_loc(col)] = values
+
+        parcel_z, units = calculate_parcel_terms(self.fields.iloc[positions])
+        self.parcel_z[positions] = parcel_z
+        self.units[positions] = units
+        self.expected_low[positions] = calculate_20_year_prob(parcel_z, 'low', self.fast) * units
+        self.expected_high[positions] = calculate_20_year_prob(parcel_z, 'high', self.fast) * units
+
+        delta = self._contributions(positions) - before
+        for col, codes in self.group_codes.items():
+            np.add.at(self.totals[col], codes[positions], delta)
+
+        return len(positions)
+
+    def totals_frame(self, group_col):
+        labels = list(self.group_labels[group_col]) + [None]
+        totals = pd.DataFrame(self.totals[group_col], index=labels, columns=SESSION_TOTAL_COLS)
+        totals.index.name = group_col
+        totals['parcels'] = totals['parcels'].round().astype(int)
+        return totals[totals['parcels'] > 0]
+
+    def scores(self):
+        return pd.DataFrame({
+            'parcel_z': self.parcel_z,
+            'units_if_redeveloped': self.units,
+            'fzp_expected_units_low': self.expected_low,
+            'fzp_expected_units_high': self.expected_high,
+        }, index=self.index)
@@ -0,0 +1,71 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+
+from .tracing import traced
+
+# Shards are cells of a grid over the left frame's bounds by default. The
+# parcel frames reaching the overlay joins have no block_num left, since
+# deduplicate_by_mapblklot drops it, so a column key has to be asked for.
+SHARD_COLUMN = None
+SHARD_GRID_SIZE = 64
+SHARDS_PER_WORKER = 4
+SHARD_MIN_ROWS = 2000
+SHARD_POSITION_COL = '__shard_position'
+
+_overlay_gdf = None
+
+
+def _init_worker(overlay_gdf):
+    global _overlay_gdf
+    _overlay_gdf = overlay_gdf
+
+
+def _join_shard(shard_gdf, how, predicate):
+    return gpd.sjoin(shard_gdf, _overlay_gdf, how=how, predicate=predicate)
+
+
+def spatial_shard_order(gdf, shard_col=SHARD_COLUMN, grid_size=SHARD_GRID_SIZE):
+    if shard_col is not None and shard_col in gdf.columns:
+        keys = pd.factorize(gdf[shard_col], sort=True)[0]
+    else:
+        bounds = gdf.geometry.bounds.to_numpy()
+        x = np.nan_to_num((bounds[:, 0] + bounds[:, 2]) / 2)
+        y = np.nan_to_num((bounds[:, 1] + bounds[:, 3]) / 2)
+
+        def cells(values):
+            span = values.max() - values.min() if len(values) else 0
+            if span == 0:
+                return np.zeros(len(values), dtype=int)
+            return np.minimum(((values - values.min()) / span * grid_size).astype(int), grid_size - 1)
+
+        keys = cells(y) * grid_size + cells(x)
+    return np.argsort(keys, kind='stable')
+
+
+@traced
+def sharded_sjoin(left_gdf, right_gdf, how='left', predicate='intersects', workers=None, shard_col=SHARD_COLUMN):
+    if how not in ('left', 'inner'):
+        raise ValueError(f"Sharded joins keep the left frame's rows, expected how='left' or 'inner', got '{how}'")
+    if SHARD_POSITION_COL in left_gdf.columns:
+        raise ValueError(f"'{SHARD_POSITION_COL}' is reserved for sharded joins")
+
+    workers = workers if workers is not None else os.cpu_count() or 1
+    n_shards = min(workers * SHARDS_PER_WORKER, len(left_gdf) // SHARD_MIN_ROWS)
+    if workers <= 1 or n_shards <= 1:
+        return gpd.sjoin(left_gdf, right_gdf, how=how, predicate=predicate)
+
+    positioned = left_gdf.assign(**{SHARD_POSITION_COL: np.arange(len(left_gdf))})
+    shards = [positioned.iloc[rows] for rows in np.array_split(spatial_shard_order(left_gdf, shard_col), n_shards)]
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(right_gdf,)) as pool:
+        joined = list(pool.map(_join_shard, shards, [how] * len(shards), [predicate] * len(shards)))
+
+    # Every left row lives in exactly one shard and keeps its match order there,
+    # so a stable sort on the original position reproduces the single-process join.
+    joined = pd.concat(joined)
+    order = np.argsort(joined[SHARD_POSITION_COL].to_numpy(), kind='stable')
+    return joined.iloc[order].drop(columns=SHARD_POSITION_COL)
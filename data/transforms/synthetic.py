@@ -0,0 +1,217 @@
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+import shapely
+
+from .calculate_units import PARCEL_FIELDS
+from .clean_parcels import NON_HOUSING_EXACT_ZONES, NON_HOUSING_PREFIX_PATTERNS
+from .fill_districts import PLANNING_TO_DIST
+from .fill_zoning import ZP_MAPPING
+from .ingest import convert_frame
+
+SF_BOUNDS = (-122.514, 37.708, -122.357, 37.811)
+SYNTHETIC_LOTS_PER_BLOCK = 24
+SYNTHETIC_CONDO_SHARE = 0.05
+SYNTHETIC_FZP_SHARE = 0.6
+SYNTHETIC_LAYER_TILES = 48
+SYNTHETIC_HISTORIC_DISTRICTS = 12
+SYNTHETIC_HEIGHTS = ['40', '45', '55', '65', '85', '105', '130', '160', '240', '1,200']
+SYNTHETIC_HEIGHT_WEIGHTS = [0.45, 0.1, 0.08, 0.12, 0.1, 0.04, 0.04, 0.02, 0.03, 0.02]
+SYNTHETIC_NEIGHBORHOODS = [
+    'Bayview Hunters Point', 'Bernal Heights', 'Castro/Upper Market', 'Excelsior', 'Financial District/South Beach',
+    'Inner Richmond', 'Inner Sunset', 'Marina', 'Mission', 'Noe Valley', 'Outer Richmond', 'Pacific Heights',
+    'South of Market', 'Sunset/Parkside', 'West of Twin Peaks',
+]
+SYNTHETIC_STREETS = ['MISSION', 'VALENCIA', 'JUDAH', 'IRVING', 'GEARY', 'CLEMENT', 'TARAVAL', 'NORIEGA', 'FOLSOM', 'HAYES']
+SYNTHETIC_STREET_TYPES = ['ST', 'AVE', 'BLVD', 'WAY']
+SYNTHETIC_TRANSIT_STOPS = {'muni': 3200, 'bart': 8, 'caltrain': 4}
+
+
+def _format_thousands(values, decimals=0):
+    values = np.round(np.asarray(values, dtype=float), decimals)
+    return np.array([f'{v:,.{decimals}f}' for v in values], dtype=object)
+
+
+def _zoning_codes():
+    housing = [code for codes in ZP_MAPPING.values() for code in codes]
+    return ['RH-1', 'RH-1(D)'] + housing + NON_HOUSING_EXACT_ZONES + NON_HOUSING_PREFIX_PATTERNS
+
+
+def synthetic_parcels(n, seed=0):
+    rng = np.random.default_rng(seed)
+    min_x, min_y, max_x, max_y = SF_BOUNDS
+
+    n_blocks = -(-n // SYNTHETIC_LOTS_PER_BLOCK)
+    cols = int(np.ceil(np.sqrt(n_blocks * (max_x - min_x) / (max_y - min_y))))
+    block_w = (max_x - min_x) / cols
+    block_h = (max_y - min_y) / -(-n_blocks // cols)
+
+    parcel = np.arange(n)
+    block = parcel // SYNTHETIC_LOTS_PER_BLOCK
+    lot = parcel % SYNTHETIC_LOTS_PER_BLOCK
+    lot_w = block_w * 0.9 / SYNTHETIC_LOTS_PER_BLOCK
+    x0 = min_x + (block % cols) * block_w + lot * lot_w
+    y0 = min_y + (block // cols) * block_h
+    shapes = shapely.to_wkt(shapely.box(x0, y0, x0 + lot_w * 0.95, y0 + block_h * 0.9), rounding_precision=7)
+
+    block_num = np.char.zfill(block.astype(str), 4)
+    lot_num = np.char.zfill((lot + 1).astype(str), 3)
+    mapblklot = np.char.add(block_num, lot_num)
+
+    zoning = np.array(_zoning_codes(), dtype=object)
+    zoning_code = zoning[rng.integers(0, len(zoning), n)]
+    neighborhoods = np.array(SYNTHETIC_NEIGHBORHOODS, dtype=object)
+    planning = np.array(list(PLANNING_TO_DIST) + ['Presidio'], dtype=object)
+
+    parcels = pd.DataFrame({
+        'mapblklot': mapblklot.astype(object),
+        'blklot': mapblklot.astype(object),
+        'block_num': block_num.astype(object),
+        'lot_num': lot_num.astype(object),
+        'active': np.where(rng.random(n) < 0.97, 'true', 'false'),
+        'shape': shapes,
+        'from_address_num': np.where(rng.random(n) < 0.9, rng.integers(1, 4000, n).astype(str), None),
+        'street_name': np.array(SYNTHETIC_STREETS, dtype=object)[rng.integers(0, len(SYNTHETIC_STREETS), n)],
+        'street_type': np.array(SYNTHETIC_STREET_TYPES, dtype=object)[rng.integers(0, len(SYNTHETIC_STREET_TYPES), n)],
+        'analysis_neighborhood': neighborhoods[(block % cols * len(neighborhoods)) // cols],
+        'zoning_code': np.where(rng.random(n) < 0.99, zoning_code, None),
+        'zoning_district': zoning_code,
+        'supervisor_district': (rng.integers(1, 12, n)).astype(str),
+        'supname': 'Supervisor',
+        'planning_district': planning[(block // cols * len(planning)) // max(1, -(-n_blocks // cols))],
+        'historic': None,
+    })
+
+    condos = parcels[rng.random(n) < SYNTHETIC_CONDO_SHARE]
+    units = condos.assign(
+        blklot=condos['block_num'] + np.char.zfill(rng.integers(100, 999, len(condos)).astype(str), 3).astype(object),
+        lot_num=np.char.zfill(rng.integers(100, 999, len(condos)).astype(str), 3).astype(object),
+    )
+    return pd.concat([parcels, units], ignore_index=True)
+
+
+def synthetic_model_data(raw_parcels_df, seed=0):
+    rng = np.random.default_rng(seed + 1)
+    parcels = raw_parcels_df.drop_duplicates(subset='mapblklot')
+    parcels = parcels[rng.random(len(parcels)) < SYNTHETIC_FZP_SHARE]
+    n = len(parcels)
+
+    area_sqft = rng.gamma(2.0, 1500.0, n) + 500
+    height = np.array(SYNTHETIC_HEIGHTS, dtype=object)[rng.choice(len(SYNTHETIC_HEIGHTS), n, p=SYNTHETIC_HEIGHT_WEIGHTS)]
+    height_ft = np.array([float(h.replace(',', '')) for h in height])
+    env = area_sqft / 1000 * height_ft / 10
+    sdb = (env > 9.0) & (height_ft <= 130) & (rng.random(n) < 0.5)
+    bldg_sqft = area_sqft * rng.uniform(0.3, 2.5, n)
+    res_units = rng.poisson(2.0, n) * (rng.random(n) < 0.8)
+
+    model = pd.DataFrame({
+        'BlockLot': parcels['blklot'].to_numpy(),
+        'Shape_Area_SqFt': _format_thousands(area_sqft),
+        'Area_1000': np.round(area_sqft / 1000, 4).astype(str),
+        'Height_Ft': height,
+        'Env_1000_Area_Height': np.round(env, 4).astype(str),
+        'Tot_Existing_SqFt': _format_thousands(bldg_sqft),
+        'Bldg_SqFt_1000': np.round(bldg_sqft / 1000, 4).astype(str),
+        'Res_Units': res_units.astype(str),
+        'Res_Dummy': (res_units > 0).astype(int).astype(str),
+        'Historic': (rng.random(n) < 0.15).astype(int).astype(str),
+        'SDB_2016_5Plus': sdb.astype(int).astype(str),
+        'SDB_2016_5Plus_EnvFull': np.round(np.where(sdb, env, 0), 4).astype(str),
+        'FZP Planning Code': parcels['zoning_code'].to_numpy(),
+    })
+    model['Zoning_DR_EnvFull'] = '0'
+
+    codes = model['FZP Planning Code'].map({code: col for col, codes in ZP_MAPPING.items() for code in codes})
+    for col in [f for f in PARCEL_FIELDS if f.startswith('zp_')]:
+        model[col] = (codes == col).astype(int).astype(str)
+    districts = parcels['planning_district'].map(PLANNING_TO_DIST).to_numpy()
+    for col in [f for f in PARCEL_FIELDS if f.startswith('DIST_')]:
+        model[col] = (districts == col).astype(int).astype(str)
+
+    return model.sample(frac=1, random_state=seed).reset_index(drop=True)
+
+
+def synthetic_land_use(raw_parcels_df, seed=0):
+    rng = np.random.default_rng(seed + 2)
+    parcels = raw_parcels_df.drop_duplicates(subset='mapblklot')
+    parcels = parcels[rng.random(len(parcels)) < 0.9]
+    n = len(parcels)
+
+    land_use = pd.DataFrame({
+        'mapblklot': parcels['mapblklot'].to_numpy(),
+        'from_st': rng.integers(1, 4000, n).astype(str),
+        'street': parcels['street_name'].to_numpy(),
+        'st_type': parcels['street_type'].to_numpy(),
+        'resunits': rng.poisson(2.0, n).astype(str),
+        'res': _format_thousands(rng.gamma(2.0, 1200.0, n)),
+    })
+    return pd.concat([land_use, land_use.sample(frac=0.02, random_state=seed)], ignore_index=True)
+
+
+def _tiles(tiles, bounds=SF_BOUNDS, margin=0.01):
+    min_x, min_y, max_x, max_y = bounds
+    xs = np.linspace(min_x - margin, max_x + margin, tiles + 1)
+    ys = np.linspace(min_y - margin, max_y + margin, tiles + 1)
+    x0, y0 = np.meshgrid(xs[:-1], ys[:-1])
+    x1, y1 = np.meshgrid(xs[1:], ys[1:])
+    return shapely.box(x0.ravel(), y0.ravel(), x1.ravel(), y1.ravel())
+
+
+def synthetic_layers(seed=0, tiles=SYNTHETIC_LAYER_TILES):
+    rng = np.random.default_rng(seed + 3)
+    boxes = _tiles(tiles)
+    # Offset the zoning tiles so parcels straddle district boundaries in both layers.
+    shifted = _tiles(tiles - 1, margin=0.013)
+
+    height_bulk = gpd.GeoDataFrame({
+        'gen_hght': np.array(SYNTHETIC_HEIGHTS, dtype=object)[rng.choice(len(SYNTHETIC_HEIGHTS), len(boxes), p=SYNTHETIC_HEIGHT_WEIGHTS)],
+    }, geometry=boxes, crs='EPSG:4326')
+
+    zoning = np.array(_zoning_codes(), dtype=object)
+    zoning_districts = gpd.GeoDataFrame({
+        'zoning': zoning[rng.integers(0, len(zoning), len(shifted))],
+    }, geometry=shifted, crs='EPSG:4326')
+
+    min_x, min_y, max_x, max_y = SF_BOUNDS
+    cx = rng.uniform(min_x, max_x, SYNTHETIC_HISTORIC_DISTRICTS)
+    cy = rng.uniform(min_y, max_y, SYNTHETIC_HISTORIC_DISTRICTS)
+    historic_districts = gpd.GeoDataFrame({
+        'name': [f'Historic District {i + 1}' for i in range(SYNTHETIC_HISTORIC_DISTRICTS)],
+    }, geometry=shapely.buffer(shapely.points(cx, cy), 0.006), crs='EPSG:4326')
+
+    return height_bulk, zoning_districts, historic_districts
+
+
+def synthetic_transit_stops(seed=0, counts=SYNTHETIC_TRANSIT_STOPS):
+    rng = np.random.default_rng(seed + 4)
+    min_x, min_y, max_x, max_y = SF_BOUNDS
+
+    frames = []
+    for mode, count in counts.items():
+        frames.append(pd.DataFrame({
+            'stop_id': [f'{mode}-{i}' for i in range(count)],
+            'mode': mode,
+            'routes': [f'{mode.upper()} {i % 40}' for i in range(count)],
+            'lon': rng.uniform(min_x, max_x, count),
+            'lat': rng.uniform(min_y, max_y, count),
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+def synthetic_inputs(n, seed=0, typed=True):
+    raw_parcels = synthetic_parcels(n, seed)
+    model = synthetic_model_data(raw_parcels, seed)
+    land_use = synthetic_land_use(raw_parcels, seed)
+    if typed:
+        raw_parcels, model, land_use = (convert_frame(df) for df in (raw_parcels, model, land_use))
+
+    height_bulk, zoning_districts, historic_districts = synthetic_layers(seed)
+    return {
+        'raw_parcels': raw_parcels,
+        'model': model,
+        'land_use': land_use,
+        'height_bulk': height_bulk,
+        'zoning_districts': zoning_districts,
+        'historic_districts': historic_districts,
+        'transit_stops': synthetic_transit_stops(seed),
+    }
@@ -0,0 +1,231 @@
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+import pandas as pd
+
+from .memory import peak_rss_bytes, reset_peak_rss
+
+PROFILERS = ['cprofile', 'pyinstrument']
+TRACE_COLUMNS = [
+    'stage', 'depth', 'thread', 'start_s', 'wall_s', 'self_s', 'cpu_s', 'rows_in', 'rows_out',
+    'columns_added', 'cells_filled', 'memory_delta_bytes', 'peak_rss_bytes',
+]
+
+_tracer = None
+
+
+def traced(func):
+    name = func.__name__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        tracer = _tracer
+        if tracer is None:
+            return func(*args, **kwargs)
+        return tracer.call(name, func, args, kwargs)
+
+    return wrapper
+
+
+def _first_frame(values):
+    for value in values:
+        if isinstance(value, pd.DataFrame):
+            return value
+    return None
+
+
+def _cells_filled(before, after):
+    common = [col for col in after.columns if col in before.columns]
+    if not common or not after.index.is_unique or not after.index.isin(before.index).all():
+        return None
+    was_missing = before[common].reindex(after.index).isna().to_numpy()
+    return int((was_missing & after[common].notna().to_numpy()).sum())
+
+
+def _write_text(path, text):
+    with open(path, 'w') as f:
+        f.write(text)
+
+
+class Tracer:
+    def __init__(self, memory=False, count_filled=True, profile=(), profiler='cprofile', profile_dir=None):
+        if profiler not in PROFILERS:
+            raise ValueError(f"Unknown profiler '{profiler}', expected one of {PROFILERS}")
+        self.memory = memory
+        self.count_filled = count_filled
+        self.profile = set(profile)
+        self.profiler = profiler
+        self.profile_dir = profile_dir
+        self.records = []
+        self.profiles = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+        self._previous = None
+        self._started_tracemalloc = False
+
+    def __enter__(self):
+        global _tracer
+        self._previous = _tracer
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        _tracer = self
+        return self
+
+    def __exit__(self, *exc):
+        global _tracer
+        _tracer = self._previous
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def _run(self, name, func, args, kwargs):
+        if name not in self.profile:
+            return func(*args, **kwargs)
+
+        if self.profiler == 'pyinstrument':
+            from pyinstrument import Profiler
+
+            profiler = Profiler()
+            profiler.start()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profiler.stop()
+                self._save_profile(name, profiler, lambda path: _write_text(path, profiler.output_html()), '.html')
+
+        import cProfile
+
+        profiler = cProfile.Profile()
+        try:
+            return profiler.runcall(func, *args, **kwargs)
+        finally:
+            self._save_profile(name, profiler, profiler.dump_stats, '.prof')
+
+    def _save_profile(self, name, profiler, dump, extension):
+        with self._lock:
+            calls = self.profiles.setdefault(name, [])
+            calls.append(profiler)
+            call = len(calls)
+        if self.profile_dir is not None:
+            os.makedirs(self.profile_dir, exist_ok=True)
+            dump(os.path.join(self.profile_dir, f'{name}-{call}{extension}'))
+
+    # The stage's own resident-set peak: the kernel's high-water mark is reset
+    # when a span opens and read when it closes. A nested span's reset would
+    # wipe the mark its parent has reached so far, so that reading is handed
+    # up the stack before the reset, along with the nested span's own peak.
+    def _open_peak(self, peaks):
+        if peaks:
+            peaks[-1] = max(peaks[-1], peak_rss_bytes())
+        if not reset_peak_rss():
+            return False
+        self._local.peaks = peaks + [0]
+        return True
+
+    def _close_peak(self, peaks):
+        peak = max(peak_rss_bytes(), self._local.peaks[-1])
+        self._local.peaks = peaks
+        if peaks:
+            peaks[-1] = max(peaks[-1], peak)
+        return peak
+
+    def call(self, name, func, args, kwargs):
+        depth = getattr(self._local, 'depth', 0)
+        frame_in = _first_frame(args)
+        memory_before = tracemalloc.get_traced_memory()[0] if self.memory else None
+
+        # Each open span collects the wall time of the traced calls nested in
+        # it, so its self time leaves theirs out.
+        children = getattr(self._local, 'children', [])
+        self._local.children = children + [0.0]
+        peaks = getattr(self._local, 'peaks', [])
+        peak_open = self.memory and self._open_peak(peaks)
+        self._local.depth = depth + 1
+        start = time.perf_counter()
+        cpu_start = time.thread_time()
+        try:
+            result = self._run(name, func, args, kwargs)
+        finally:
+            cpu = time.thread_time() - cpu_start
+            wall = time.perf_counter() - start
+            nested = self._local.children[-1]
+            self._local.depth = depth
+            self._local.children = children
+            if children:
+                children[-1] += wall
+            peak_rss = self._close_peak(peaks) if peak_open else None
+
+        frame_out = _first_frame(result if isinstance(result, tuple) else (result,))
+        record = {
+            'stage': name,
+            'depth': depth,
+            'thread': threading.get_ident(),
+            'start_s': start - self._origin,
+            'wall_s': wall,
+            'self_s': wall - nested,
+            'cpu_s': cpu,
+            'rows_in': None if frame_in is None else len(frame_in),
+            'rows_out': None if frame_out is None else len(frame_out),
+            'columns_added': None,
+            'cells_filled': None,
+            'memory_delta_bytes': None if memory_before is None else tracemalloc.get_traced_memory()[0] - memory_before,
+            'peak_rss_bytes': peak_rss,
+        }
+        if frame_in is not None and frame_out is not None:
+            record['columns_added'] = len(frame_out.columns.difference(frame_in.columns))
+            if self.count_filled:
+                record['cells_filled'] = _cells_filled(frame_in, frame_out)
+
+        with self._lock:
+            self.records.append(record)
+        return result
+
+    def to_frame(self):
+        return pd.DataFrame(self.records, columns=TRACE_COLUMNS)
+
+    def summary(self):
+        # wall_s includes nested traced calls; pct_wall is each stage's share
+        # of the top-level time by self time, so the rows add up to 100.
+        trace = self.to_frame()
+        summary = trace.groupby('stage', sort=False).agg(
+            calls=('stage', 'size'),
+            wall_s=('wall_s', 'sum'),
+            self_s=('self_s', 'sum'),
+            cpu_s=('cpu_s', 'sum'),
+            rows_in=('rows_in', 'sum'),
+            rows_out=('rows_out', 'sum'),
+            cells_filled=('cells_filled', 'sum'),
+            memory_delta_bytes=('memory_delta_bytes', 'sum'),
+            peak_rss_bytes=('peak_rss_bytes', 'max'),
+        )
+        top_level = trace[trace['depth'] == 0]['wall_s'].sum()
+        summary['pct_wall'] = summary['self_s'] / top_level * 100 if top_level else 0.0
+        return summary.sort_values('self_s', ascending=False)
+
+    def chrome_trace(self):
+        pid = os.getpid()
+        events = []
+        for record in self.records:
+            args = {k: v for k, v in record.items() if k not in ('stage', 'thread', 'start_s', 'wall_s') and v is not None}
+            events.append({
+                'name': record['stage'],
+                'cat': 'transform',
+                'ph': 'X',
+                'ts': record['start_s'] * 1e6,
+                'dur': record['wall_s'] * 1e6,
+                'pid': pid,
+                'tid': record['thread'],
+                'args': args,
+            })
+        return {'traceEvents': sorted(events, key=lambda event: event['ts']), 'displayTimeUnit': 'ms'}
+
+    def write_chrome_trace(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.chrome_trace(), f)
+        return path
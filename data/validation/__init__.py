@@ -0,0 +1,13 @@
+from .registry import (
+    CHECKS,
+    CHEAP_TAG,
+    CheckResult,
+    check,
+    select_checks,
+    run_checks,
+    print_results,
+    results_frame,
+    write_report,
+)
+from .context import ValidationContext, load_frame
+from . import checks
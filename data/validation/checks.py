@@ -0,0 +1,482 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from transforms import (
+    PARCEL_TERM_COLUMNS, SDB_ZONE_PATTERNS, SDB_ENVELOPE_THRESHOLD, SDB_HEIGHT_CAP,
+    calculate_expected_units, calculate_fixed_terms, calculate_variable_terms, combine_parcel_terms, fill_parcel_terms,
+    read_parcel_bundle,
+)
+from transforms.parcel_bundle import MODEL_TERM_INPUTS, parse_like_browser
+from transforms.calculate_units import calculate_20_year_prob
+
+from .context import BUNDLE_PATH, UPZONING_HEIGHTS
+
+from .registry import check, CHEAP_TAG
+
+# The City Economist's high-growth FZP total (projects/done/regression.md). Its
+# parcels carry their own building areas, so the land-use fills do not move it.
+EXPECTED_FZP_UNITS_HIGH = 17845
+EXPECTED_UNITS_TOLERANCE = 0.1
+UNCALCULABLE_PCT_WARNING = 0.1
+
+
+def _print_summary(result, summary):
+    for k, v in summary.items():
+        if isinstance(v, float):
+            result.print(f'{k}: {v:,.2f}')
+        elif isinstance(v, int):
+            result.print(f'{k}: {v:,}')
+        else:
+            result.print(f'{k}')
+
+
+def _upzoning_by_neighborhood(context):
+    upzoning = context.upzoning['fzp_expected_units_high'].unstack('min_height')
+    return upzoning.drop(index=[None], errors='ignore')
+
+
+@check('completeness', 'DATA COMPLETENESS BY NEIGHBORHOOD', tags=[CHEAP_TAG])
+def completeness(context, result):
+    merged = context.merged
+    by_neighborhood = merged.groupby('analysis_neighborhood').agg(
+        total_parcels=('BlockLot', 'count'),
+        calculable=('is_calculable', 'sum'),
+    ).reset_index()
+    by_neighborhood['uncalculable'] = by_neighborhood['total_parcels'] - by_neighborhood['calculable']
+    by_neighborhood['pct_uncalculable'] = (by_neighborhood['uncalculable'] / by_neighborhood['total_parcels'] * 100).round(2)
+    by_neighborhood = by_neighborhood.sort_values('uncalculable', ascending=False)
+
+    result.print('\nUNCALCULABLE PARCELS BY NEIGHBORHOOD (missing required data)')
+    result.table(by_neighborhood[by_neighborhood['uncalculable'] > 0], index=False)
+
+    uncalculable = int((~merged['is_calculable']).sum())
+    uncalc_pct = result.metric('pct_uncalculable', uncalculable / len(merged) * 100)
+    result.print(f'\nTotal uncalculable: {result.metric("uncalculable", uncalculable)}')
+    if uncalc_pct > UNCALCULABLE_PCT_WARNING:
+        result.set_status('warn')
+
+    uncalculable_parcels = merged[~merged['is_calculable']]
+    if len(uncalculable_parcels) > 0:
+        result.print('\nSAMPLE UNCALCULABLE PARCELS:')
+        cols = ['BlockLot', 'analysis_neighborhood', 'zoning_code', 'missing_fields']
+        result.table(uncalculable_parcels[cols].head(20), index=False)
+
+
+@check('units_by_neighborhood', 'UNIT CONTRIBUTION BY NEIGHBORHOOD (FZP Baseline)', tags=[CHEAP_TAG])
+def units_by_neighborhood(context, result):
+    by_neighborhood = context.merged.groupby('analysis_neighborhood').agg(
+        total_parcels=('BlockLot', 'count'),
+        fzp_units_low=('fzp_expected_units_low', 'sum'),
+        fzp_units_high=('fzp_expected_units_high', 'sum'),
+        avg_height=('Height_Ft_x', 'mean'),
+        avg_area=('Area_1000', 'mean'),
+        avg_envelope=('Env_1000_Area_Height', 'mean')
+    ).reset_index()
+    by_neighborhood['units_per_parcel_low'] = (by_neighborhood['fzp_units_low'] / by_neighborhood['total_parcels']).round(4)
+    by_neighborhood['units_per_parcel_high'] = (by_neighborhood['fzp_units_high'] / by_neighborhood['total_parcels']).round(4)
+
+    display_cols = ['analysis_neighborhood', 'total_parcels', 'fzp_units_low', 'fzp_units_high',
+                    'units_per_parcel_low', 'units_per_parcel_high', 'avg_height']
+    result.table(by_neighborhood.sort_values('fzp_units_high', ascending=False)[display_cols].round(2), index=False)
+
+    result.print('\n\nTOTALS:')
+    result.print(f'  Low scenario:  {result.metric("units_low", by_neighborhood["fzp_units_low"].sum()):,.0f} units')
+    result.print(f'  High scenario: {result.metric("units_high", by_neighborhood["fzp_units_high"].sum()):,.0f} units')
+
+
+@check('blanket_upzoning', 'BLANKET UPZONING SIMULATION')
+def blanket_upzoning(context, result):
+    merged = context.merged
+    upzoning = _upzoning_by_neighborhood(context)
+    comparison = merged.groupby('analysis_neighborhood').agg(
+        parcels=('BlockLot', 'count'),
+        fzp_high=('fzp_expected_units_high', 'sum'),
+    )
+    comparison['upzone_85_high'] = upzoning[85.0]
+    comparison['upzone_130_high'] = upzoning[130.0]
+    comparison = comparison.reset_index()
+
+    comparison['85ft_gain'] = comparison['upzone_85_high'] - comparison['fzp_high']
+    comparison['130ft_gain'] = comparison['upzone_130_high'] - comparison['fzp_high']
+
+    result.print('\nBLANKET UPZONING: UNIT GAIN BY NEIGHBORHOOD (High Scenario)')
+    result.table(comparison.sort_values('130ft_gain', ascending=False).round(0), index=False)
+
+    result.print('\n\nTOTAL GAINS:')
+    result.print(f'  85ft blanket (high): {result.metric("gain_85ft_high", comparison["85ft_gain"].sum()):,.0f} additional units')
+    result.print(f'  130ft blanket (high): {result.metric("gain_130ft_high", comparison["130ft_gain"].sum()):,.0f} additional units')
+
+
+@check('high_prob', 'HIGH P(REDEVELOPMENT) PARCELS', tags=[CHEAP_TAG])
+def high_prob(context, result):
+    merged = context.merged
+    high_prob = merged[merged['prob_redev_high'] > 0.5].sort_values('prob_redev_high', ascending=False)
+
+    result.print(f'\nPARCELS WITH P(REDEVELOPMENT) > 50% ({result.metric("parcels_over_50pct", len(high_prob))} parcels)')
+    cols = ['BlockLot', 'analysis_neighborhood', 'zoning_code', 'Height_Ft_x', 'Area_1000',
+            'Env_1000_Area_Height', 'prob_redev_high', 'fzp_expected_units_high']
+    result.table(high_prob[cols].head(30).round(3), index=False)
+
+    distribution = merged['prob_redev_high'].describe()
+    result.metric('prob_redev_high', distribution.to_dict())
+    result.print('\nP(redev) distribution:')
+    result.print(distribution)
+
+
+@check('prob_by_zoning', 'HIGH P(REDEVELOPMENT) BY ZONING CODE', tags=[CHEAP_TAG])
+def prob_by_zoning(context, result):
+    by_zoning = context.merged.groupby('zoning_code').agg(
+        count=('BlockLot', 'count'),
+        avg_prob=('prob_redev_high', 'mean'),
+        max_prob=('prob_redev_high', 'max'),
+        total_units=('fzp_expected_units_high', 'sum')
+    ).reset_index()
+    by_zoning = by_zoning[by_zoning['count'] >= 10]
+    result.table(by_zoning.sort_values('avg_prob', ascending=False).head(20).round(3), index=False)
+
+
+@check('top_expected_units', 'TOP 50 PARCELS BY EXPECTED UNITS', tags=[CHEAP_TAG])
+def top_expected_units(context, result):
+    high_units = context.merged.nlargest(50, 'fzp_expected_units_high')
+    cols = ['BlockLot', 'analysis_neighborhood', 'zoning_code', 'Height_Ft_x', 'Area_1000',
+            'Env_1000_Area_Height', 'SDB_2016_5Plus', 'prob_redev_high', 'fzp_expected_units_high']
+    result.table(high_units[cols].round(2), index=False)
+
+
+@check('top_capacity', 'TOP 50 PARCELS BY UNIT CAPACITY (if redeveloped)', tags=[CHEAP_TAG])
+def top_capacity(context, result):
+    high_capacity = context.merged.nlargest(50, 'units_if_redev')
+    cols = ['BlockLot', 'analysis_neighborhood', 'zoning_code', 'Height_Ft_x', 'Area_1000',
+            'Env_1000_Area_Height', 'units_if_redev', 'prob_redev_high', 'fzp_expected_units_high']
+    result.table(high_capacity[cols].round(2), index=False)
+
+
+def _summarize_group(df, name):
+    return {
+        'group': name,
+        'parcels': len(df),
+        'avg_height': df['Height_Ft_x'].mean(),
+        'avg_area': df['Area_1000'].mean(),
+        'avg_envelope': df['Env_1000_Area_Height'].mean(),
+        'avg_prob_redev': df['prob_redev_high'].mean(),
+        'total_units_high': df['fzp_expected_units_high'].sum(),
+        'units_per_parcel': df['fzp_expected_units_high'].sum() / len(df) if len(df) > 0 else 0,
+        'sdb_pct': df['SDB_2016_5Plus'].astype(float).mean() * 100,
+        'historic_pct': df['Historic'].astype(float).mean() * 100,
+        'residential_pct': df['Res_Dummy'].astype(float).mean() * 100
+    }
+
+
+@check('east_west', 'EAST-SIDE VS WEST-SIDE COMPARISON')
+def east_west(context, result):
+    merged = context.merged
+    in_fzp_source = context.in_fzp_source
+
+    result.print(f'Parcels in FZP source: {result.metric("in_fzp_source", int(in_fzp_source.sum())):,}')
+    result.print(f'Parcels NOT in FZP source (east-side + other): {result.metric("not_in_fzp_source", int((~in_fzp_source).sum())):,}')
+
+    result.print('\nWest (FZP) vs East (non-FZP) Summary:')
+    for key, grp in [('west', _summarize_group(merged[in_fzp_source], 'West (FZP)')),
+                     ('east', _summarize_group(merged[~in_fzp_source], 'East (non-FZP)'))]:
+        result.print(f"\n{grp['group']}:")
+        for k, v in grp.items():
+            if k == 'group':
+                continue
+            result.metric(f'{key}_{k}', v)
+            if isinstance(v, float):
+                result.print(f'  {k}: {v:,.2f}')
+            else:
+                result.print(f'  {k}: {v:,}')
+
+
+@check('east_by_neighborhood', 'EAST-SIDE PARCELS BY NEIGHBORHOOD')
+def east_by_neighborhood(context, result):
+    east_side = context.merged[~context.in_fzp_source]
+    east_by_hood = east_side.groupby('analysis_neighborhood').agg(
+        parcels=('BlockLot', 'count'),
+        units_high=('fzp_expected_units_high', 'sum'),
+        avg_prob=('prob_redev_high', 'mean'),
+        avg_height=('Height_Ft_x', 'mean')
+    ).reset_index()
+    result.table(east_by_hood.sort_values('parcels', ascending=False).round(3), index=False)
+
+
+@check('sdb_heuristic', 'SDB HEURISTIC VALIDATION')
+def sdb_heuristic(context, result):
+    merged = context.merged
+    sdb_zoning_match = merged['zoning_code'].str.contains('|'.join(SDB_ZONE_PATTERNS), case=False, regex=True, na=False)
+    sdb_envelope_match = merged['Env_1000_Area_Height'] > SDB_ENVELOPE_THRESHOLD
+    sdb_height_match = merged['Height_Ft_x'] <= SDB_HEIGHT_CAP
+
+    predicted_sdb = sdb_zoning_match & sdb_envelope_match & sdb_height_match
+    actual_sdb = merged['SDB_2016_5Plus'] == 1
+
+    cm = pd.crosstab(actual_sdb, predicted_sdb, rownames=['Actual SDB'], colnames=['Predicted SDB'])
+    result.print('\nConfusion Matrix:')
+    result.print(cm)
+
+    tp = int((predicted_sdb & actual_sdb).sum())
+    fp = int((predicted_sdb & ~actual_sdb).sum())
+    fn = int((~predicted_sdb & actual_sdb).sum())
+    tn = int((~predicted_sdb & ~actual_sdb).sum())
+
+    precision = tp / (tp + fp) if (tp + fp) > 0 else 0
+    recall = tp / (tp + fn) if (tp + fn) > 0 else 0
+    accuracy = (tp + tn) / len(merged)
+
+    result.print(f'\nPrecision: {result.metric("precision", precision):.4f}')
+    result.print(f'Recall: {result.metric("recall", recall):.4f}')
+    result.print(f'Accuracy: {result.metric("accuracy", accuracy):.4f}')
+    result.print(f'False positives: {result.metric("false_positives", fp)}')
+    result.print(f'False negatives: {result.metric("false_negatives", fn)}')
+
+    samples = merged.assign(in_fzp_source=context.in_fzp_source)
+    cols = ['BlockLot', 'analysis_neighborhood', 'zoning_code', 'Height_Ft_x', 'Env_1000_Area_Height', 'in_fzp_source']
+    if fp > 0:
+        result.print('\n--- Sample False Positives ---')
+        result.table(samples[predicted_sdb & ~actual_sdb][cols].head(10), index=False)
+    if fn > 0:
+        result.print('\n--- Sample False Negatives ---')
+        result.table(samples[~predicted_sdb & actual_sdb][cols].head(10), index=False)
+
+
+@check('envelope', 'ENVELOPE FORMULA DISCREPANCIES', tags=[CHEAP_TAG])
+def envelope(context, result):
+    merged = context.merged
+    calc_envelope = merged['Area_1000'] * merged['Height_Ft_x'] / 10
+    envelope_diff = (merged['Env_1000_Area_Height'] - calc_envelope).abs()
+    large_diffs = envelope_diff > 0.5
+
+    result.print(f'Parcels with Env diff > 0.5: {result.metric("large_diffs", int(large_diffs.sum()))}')
+    result.print('\nEnvelope diff distribution:')
+    result.print(envelope_diff.describe())
+
+    if large_diffs.any():
+        result.print('\n--- Sample Large Discrepancies ---')
+        samples = merged.assign(calc_envelope=calc_envelope, envelope_diff=envelope_diff)[large_diffs]
+        cols = ['BlockLot', 'analysis_neighborhood', 'Height_Ft_x', 'Area_1000', 'Env_1000_Area_Height', 'calc_envelope', 'envelope_diff']
+        result.table(samples[cols].head(20).round(3), index=False)
+
+
+@check('zoning_coverage', 'ZONING CATEGORY COVERAGE', tags=[CHEAP_TAG])
+def zoning_coverage(context, result):
+    merged = context.merged
+    zp_cols = [c for c in merged.columns if c.startswith('zp_')]
+    no_zoning_cat = merged[~(merged[zp_cols].sum(axis=1) > 0)]
+
+    missing = result.metric('without_zoning_category', len(no_zoning_cat))
+    result.print(f'Parcels without zoning category: {missing:,} ({missing / len(merged) * 100:.1f}%)')
+    result.print('\nBy zoning_code:')
+    result.print(no_zoning_cat['zoning_code'].value_counts().head(20))
+
+
+@check('districts', 'DISTRICT ASSIGNMENT CHECK', tags=[CHEAP_TAG])
+def districts(context, result):
+    merged = context.merged
+    dist_cols = [c for c in merged.columns if c.startswith('DIST_')]
+    district_count = merged[dist_cols].sum(axis=1)
+
+    result.print(f'Parcels with no district: {result.metric("no_district", int((district_count == 0).sum()))}')
+    result.print(f'Parcels with 1 district: {result.metric("one_district", int((district_count == 1).sum()))}')
+    result.print(f'Parcels with >1 district: {result.metric("multiple_districts", int((district_count > 1).sum()))}')
+
+    no_district = merged[district_count == 0]
+    if len(no_district) > 0:
+        result.print('\nNeighborhoods of parcels with no district:')
+        result.print(no_district['analysis_neighborhood'].value_counts().head(20))
+
+
+@check('unusual_combinations', 'UNUSUAL COMBINATIONS', tags=[CHEAP_TAG])
+def unusual_combinations(context, result):
+    merged = context.merged
+
+    very_tall = merged[merged['Height_Ft_x'] > 200]
+    result.print(f'\nVery tall parcels (>200 ft): {result.metric("very_tall", len(very_tall))}')
+    if len(very_tall) > 0:
+        cols = ['BlockLot', 'analysis_neighborhood', 'zoning_code', 'Height_Ft_x', 'Area_1000', 'fzp_expected_units_high']
+        result.table(very_tall.nlargest(10, 'Height_Ft_x')[cols], index=False)
+
+    very_large = merged[merged['Area_1000'] > 50]
+    result.print(f'\nVery large parcels (>50k sqft): {result.metric("very_large", len(very_large))}')
+    if len(very_large) > 0:
+        cols = ['BlockLot', 'analysis_neighborhood', 'zoning_code', 'Height_Ft_x', 'Area_1000', 'fzp_expected_units_high']
+        result.table(very_large.nlargest(20, 'Area_1000')[cols].round(1), index=False)
+
+    historic_high_prob = merged[(merged['Historic'] == 1) & (merged['prob_redev_high'] > 0.3)]
+    result.print(f'\nHistoric parcels with P(redev) > 30%: {result.metric("historic_high_prob", len(historic_high_prob))}')
+    if len(historic_high_prob) > 0:
+        cols = ['BlockLot', 'analysis_neighborhood', 'zoning_code', 'Height_Ft_x', 'prob_redev_high', 'fzp_expected_units_high']
+        result.table(historic_high_prob.nlargest(10, 'prob_redev_high')[cols].round(3), index=False)
+
+    rh1_high_prob = merged[(merged['zoning_code'].str.startswith('RH-1', na=False)) & (merged['prob_redev_high'] > 0.2)]
+    result.print(f'\nRH-1 parcels with P(redev) > 20%: {result.metric("rh1_high_prob", len(rh1_high_prob))}')
+    if len(rh1_high_prob) > 0:
+        cols = ['BlockLot', 'analysis_neighborhood', 'zoning_code', 'Height_Ft_x', 'Area_1000', 'prob_redev_high']
+        result.table(rh1_high_prob.nlargest(10, 'prob_redev_high')[cols].round(3), index=False)
+
+
+def _compare_field(fzp_compare, calc_col, fzp_col, name):
+    calc = pd.to_numeric(fzp_compare[calc_col], errors='coerce').fillna(0)
+    fzp = pd.to_numeric(fzp_compare[fzp_col], errors='coerce').fillna(0)
+    diff = (calc - fzp).abs()
+    return {
+        'field': name,
+        'exact_match': int((diff < 0.001).sum()),
+        'close_match': int((diff < 1.0).sum()),
+        'large_diff': int((diff >= 1.0).sum()),
+        'max_diff': diff.max()
+    }
+
+
+@check('fzp_source_comparison', 'FZP SOURCE DATA COMPARISON')
+def fzp_source_comparison(context, result):
+    merged = context.merged
+    fzp_compare = merged[context.in_fzp_source].merge(context.fzp_source, on='BlockLot', suffixes=('_calc', '_fzp'))
+    result.print(f'Parcels available for FZP comparison: {result.metric("compared", len(fzp_compare)):,}')
+
+    comparisons = pd.DataFrame([
+        _compare_field(fzp_compare, 'Height_Ft_x', 'Height_Ft', 'Height_Ft'),
+        _compare_field(fzp_compare, 'Area_1000_calc', 'Area_1000_fzp', 'Area_1000'),
+        _compare_field(fzp_compare, 'Env_1000_Area_Height_calc', 'Env_1000_Area_Height_fzp', 'Envelope'),
+        _compare_field(fzp_compare, 'SDB_2016_5Plus_calc', 'SDB_2016_5Plus_fzp', 'SDB'),
+        _compare_field(fzp_compare, 'Historic_calc', 'Historic_fzp', 'Historic'),
+        _compare_field(fzp_compare, 'SDB_2016_5Plus_EnvFull_calc', 'SDB_2016_5Plus_EnvFull_fzp', 'SDB_EnvFull'),
+    ])
+    result.metric('fields', comparisons.set_index('field').to_dict('index'))
+    result.print('\nFZP SOURCE VS CALCULATED COMPARISON')
+    result.table(comparisons, index=False)
+
+    fzp_compare['height_diff'] = (pd.to_numeric(fzp_compare['Height_Ft_x'], errors='coerce').fillna(0) -
+                                  pd.to_numeric(fzp_compare['Height_Ft'], errors='coerce').fillna(0)).abs()
+
+    height_mismatch = fzp_compare[fzp_compare['height_diff'] > 1.0]
+    result.print(f'\nParcels with height mismatch > 1ft: {result.metric("height_mismatches", len(height_mismatch))}')
+    if len(height_mismatch) > 0:
+        cols = ['BlockLot', 'analysis_neighborhood', 'zoning_code', 'Height_Ft_x', 'Height_Ft', 'height_diff']
+        result.table(height_mismatch.nlargest(20, 'height_diff')[cols].round(1), index=False)
+
+
+def _upzoned_fields(fields, height):
+    # The web app's height rule: raise the limit and recompute the envelope
+    # and SDB eligibility, leaving every other field alone.
+    height = np.maximum(fields['Height_Ft'].to_numpy(dtype=float), height)
+    env = fields['Area_1000'].to_numpy(dtype=float) * height / 10
+    sdb = ((env > SDB_ENVELOPE_THRESHOLD) & (height <= SDB_HEIGHT_CAP)).astype(int)
+    return fields.assign(Height_Ft=height, Env_1000_Area_Height=env, SDB_2016_5Plus=sdb, SDB_2016_5Plus_EnvFull=sdb * env)
+
+
+@check('parcel_terms', 'PRECOMPUTED PARCEL TERMS PARITY', tags=[CHEAP_TAG])
+def parcel_terms(context, result):
+    fields = context.model_fields.fillna(0)
+    terms = fill_parcel_terms(fields)[PARCEL_TERM_COLUMNS]
+
+    rows = []
+    for height in [None] + UPZONING_HEIGHTS:
+        scenario_fields = fields if height is None else _upzoned_fields(fields, height)
+        expected = calculate_expected_units(scenario_fields)
+        parcel_z, units = combine_parcel_terms(terms['fixed_z'].values, terms['fixed_units'].values,
+                                               *calculate_variable_terms(scenario_fields))
+        row = {'height': 'baseline' if height is None else f'{height} ft'}
+        for scenario in ['low', 'high']:
+            split = calculate_20_year_prob(parcel_z, scenario) * units
+            row[f'mismatches_{scenario}'] = int((split != expected[f'fzp_expected_units_{scenario}'].values).sum())
+        rows.append(row)
+
+    parity = pd.DataFrame(rows)
+    result.print('Expected units rebuilt from fixed_z/fixed_units plus the height-dependent terms,')
+    result.print('compared bit for bit with calculate_expected_units:')
+    result.table(parity, index=False)
+    mismatches = result.metric('mismatches', int(parity.filter(like='mismatches').to_numpy().sum()))
+    if mismatches:
+        result.set_status('error')
+
+    # MapView scores from the terms in the model CSV when it carries them.
+    model_text = pd.read_csv(context.model_path, dtype=str, keep_default_na=False)
+    if set(PARCEL_TERM_COLUMNS).issubset(model_text.columns):
+        exported = parse_like_browser(model_text, PARCEL_TERM_COLUMNS).to_numpy()
+        fresh = np.column_stack(calculate_fixed_terms(parse_like_browser(model_text, MODEL_TERM_INPUTS)))
+        stale = result.metric('model_csv_mismatches', int((exported != fresh).any(axis=1).sum()))
+        result.print(f'\nParcels whose terms in the model CSV differ from a fresh computation: {stale:,}')
+        if stale:
+            result.set_status('warn')
+    else:
+        result.print('\nThe model CSV has no fixed_z/fixed_units, so the web app scores with the full dot product;')
+        result.print('run export_model_terms.py to add them')
+        result.set_status('warn')
+
+    if not os.path.exists(BUNDLE_PATH):
+        result.print(f'\nNo parcel bundle at {os.path.normpath(BUNDLE_PATH)}, skipping the export comparison')
+        return
+    bundle = read_parcel_bundle(BUNDLE_PATH).set_index('mapblklot')
+    exported = bundle.reindex(context.merged['BlockLot'].astype(str))[PARCEL_TERM_COLUMNS].to_numpy()
+    stale = result.metric('bundle_mismatches', int((exported != terms.to_numpy()).any(axis=1).sum()))
+    result.print(f'\nParcels whose exported terms differ from a fresh computation: {stale:,}')
+    if stale:
+        result.set_status('warn')
+
+
+@check('summary', 'OVERALL SUMMARY')
+def summary(context, result):
+    merged = context.merged
+    in_fzp_source = context.in_fzp_source
+    upzoning = context.upzoning['fzp_expected_units_high'].groupby(level='min_height').sum()
+
+    summary = {
+        'Total parcels': len(merged),
+        'Calculable parcels': int(merged['is_calculable'].sum()),
+        'Uncalculable parcels': int((~merged['is_calculable']).sum()),
+        'In FZP source': int(in_fzp_source.sum()),
+        'East-side (non-FZP)': int((~in_fzp_source).sum()),
+        'With SDB qualification': int(merged['SDB_2016_5Plus'].sum()),
+        'Historic': int(merged['Historic'].sum()),
+        'Residential': int(merged['Res_Dummy'].sum()),
+        '---': '---',
+        'FZP Units (low)': merged['fzp_expected_units_low'].sum(),
+        'FZP Units (high)': merged['fzp_expected_units_high'].sum(),
+        '85ft Blanket Units (high)': upzoning[85.0],
+        '130ft Blanket Units (high)': upzoning[130.0],
+        '----': '----',
+        'Avg P(redev) high': merged['prob_redev_high'].mean(),
+        'Max P(redev) high': merged['prob_redev_high'].max(),
+        'Parcels P(redev) > 50%': int((merged['prob_redev_high'] > 0.5).sum()),
+    }
+    for k, v in summary.items():
+        if not k.startswith('---'):
+            result.metric(k, v)
+    _print_summary(result, summary)
+
+
+@check('key_findings', 'KEY FINDINGS TO INVESTIGATE')
+def key_findings(context, result):
+    merged = context.merged
+    findings = []
+
+    uncalc_pct = (~merged['is_calculable']).sum() / len(merged) * 100
+    if uncalc_pct > UNCALCULABLE_PCT_WARNING:
+        result.set_status('warn')
+        findings.append(f'⚠️  {uncalc_pct:.2f}% parcels are uncalculable (missing required data)')
+    else:
+        findings.append(f'✅ Only {uncalc_pct:.2f}% parcels are uncalculable')
+
+    east_units = result.metric('east_units_high', merged.loc[~context.in_fzp_source, 'fzp_expected_units_high'].sum())
+    total_units = merged['fzp_expected_units_high'].sum()
+    east_pct = east_units / total_units * 100
+    findings.append(f'📊 East-side parcels contribute {east_units:,.0f} units ({east_pct:.1f}% of total)')
+
+    high_prob_count = (merged['prob_redev_high'] > 0.5).sum()
+    if high_prob_count > 0:
+        findings.append(f'🔥 {high_prob_count:,} parcels have P(redevelopment) > 50%')
+
+    actual_low = result.metric('units_low', merged['fzp_expected_units_low'].sum())
+    actual_high = result.metric('units_high', merged['fzp_expected_units_high'].sum())
+
+    findings.append(f'📈 Expected ~10k/~18k units (FZP), got {actual_low:,.0f}/{actual_high:,.0f}')
+    units_diff = result.metric('units_high_diff', (actual_high - EXPECTED_FZP_UNITS_HIGH) / EXPECTED_FZP_UNITS_HIGH)
+    if abs(units_diff) > EXPECTED_UNITS_TOLERANCE:
+        result.set_status('warn')
+        findings.append(f'⚠️  Total units differ from expected FZP by {units_diff * 100:.0f}%')
+
+    for finding in findings:
+        result.print(finding)
@@ -0,0 +1,109 @@
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from transforms import parse_numeric, read_input, sweep_blanket_upzoning
+from transforms.calculate_units import PARCEL_FIELDS, calculate_parcel_terms, calculate_20_year_prob
+
+DATA_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODEL_PATH = os.path.join(DATA_DIR, '..', 'public', 'data', 'parcels-model.csv')
+OVERLAY_PATH = os.path.join(DATA_DIR, '..', 'public', 'data', 'parcels-overlay.csv')
+BUNDLE_PATH = os.path.join(DATA_DIR, '..', 'public', 'data', 'parcels.bin')
+FZP_SOURCE_PATH = os.path.join(DATA_DIR, 'input', 'parcels-w-fzp-model-data.csv')
+CACHE_DIR = os.path.join(DATA_DIR, 'input', '.cache', 'validation')
+
+KEY_COLUMNS = ['BlockLot', 'mapblklot', 'blklot', 'blklots']
+REQUIRED_FIELDS = ['Height_Ft_x', 'Area_1000', 'Env_1000_Area_Height', 'Bldg_SqFt_1000',
+                   'Res_Dummy', 'Historic', 'SDB_2016_5Plus']
+MERGED_FIELD_NAMES = {'Height_Ft': 'Height_Ft_x'}
+UPZONING_HEIGHTS = [85, 130]
+
+
+def _infer_numeric(df):
+    # read_input types the model schema columns and keeps the rest as strings,
+    # so convert the others that parse cleanly the way read_csv would have.
+    for col in df.columns:
+        if col in KEY_COLUMNS or pd.api.types.is_numeric_dtype(df[col]):
+            continue
+        if not (pd.api.types.is_object_dtype(df[col]) or pd.api.types.is_string_dtype(df[col])):
+            continue
+        parsed = parse_numeric(df[col], errors='coerce')
+        if parsed.notna().sum() != df[col].notna().sum():
+            continue
+        if parsed.notna().all() and (parsed % 1 == 0).all():
+            parsed = parsed.astype('int64')
+        df[col] = parsed
+    return df
+
+
+def load_frame(csv_path, cache_dir=CACHE_DIR):
+    return _infer_numeric(read_input(csv_path, cache_dir=cache_dir))
+
+
+class ValidationContext:
+    def __init__(self, model_path=MODEL_PATH, overlay_path=OVERLAY_PATH, fzp_source_path=FZP_SOURCE_PATH,
+                 cache_dir=CACHE_DIR, fast=False):
+        self.model_path = model_path
+        self.overlay_path = overlay_path
+        self.fzp_source_path = fzp_source_path
+        self.cache_dir = cache_dir
+        self.fast = fast
+        self._lock = threading.Lock()
+        self._locks = {}
+        self._cache = {}
+
+        model_df = load_frame(model_path, cache_dir)
+        overlay_df = load_frame(overlay_path, cache_dir)
+        self.model_parcels = len(model_df)
+        self.overlay_parcels = len(overlay_df)
+
+        merged = model_df.merge(overlay_df, left_on='BlockLot', right_on='mapblklot', how='left')
+        self.merged = self._derive(merged)
+
+    def _derive(self, merged):
+        missing = merged[REQUIRED_FIELDS].isna()
+        merged['is_calculable'] = ~missing.any(axis=1)
+        missing_fields = pd.Series(None, index=merged.index, dtype=object)
+        names = np.array([field.replace('_x', '') for field in REQUIRED_FIELDS], dtype=object)
+        for i in np.flatnonzero(~merged['is_calculable'].values):
+            missing_fields.iat[i] = list(names[missing.values[i]])
+        merged['missing_fields'] = missing_fields
+
+        fields = pd.DataFrame({
+            field: merged[MERGED_FIELD_NAMES.get(field, field)]
+            for field in PARCEL_FIELDS + ['SDB_2016_5Plus_EnvFull', 'Zoning_DR_EnvFull']
+            if MERGED_FIELD_NAMES.get(field, field) in merged.columns
+        }, index=merged.index)
+        self.model_fields = fields
+        parcel_z, units = calculate_parcel_terms(fields)
+        merged['prob_redev_high'] = calculate_20_year_prob(parcel_z, 'high', self.fast)
+        merged['units_if_redev'] = units
+        return merged
+
+    def _cached(self, name, build):
+        with self._lock:
+            lock = self._locks.setdefault(name, threading.Lock())
+        with lock:
+            if name not in self._cache:
+                self._cache[name] = build()
+            return self._cache[name]
+
+    def _load_fzp_source(self):
+        fzp_source = load_frame(self.fzp_source_path, self.cache_dir)
+        fzp_source['BlockLot'] = fzp_source['BlockLot'].astype(str)
+        return fzp_source
+
+    @property
+    def fzp_source(self):
+        return self._cached('fzp_source', self._load_fzp_source)
+
+    @property
+    def in_fzp_source(self):
+        return self._cached('in_fzp_source', lambda: self.merged['BlockLot'].astype(str).isin(set(self.fzp_source['BlockLot'])))
+
+    @property
+    def upzoning(self):
+        return self._cached('upzoning', lambda: sweep_blanket_upzoning(
+            self.merged, UPZONING_HEIGHTS, height_col='Height_Ft_x', fast=self.fast))
@@ -0,0 +1,151 @@
+import json
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+CHECK_STATUSES = ['ok', 'info', 'warn', 'error']
+CHEAP_TAG = 'cheap'
+
+CHECKS = {}
+
+
+class Check:
+    def __init__(self, name, title, func, tags=()):
+        self.name = name
+        self.title = title
+        self.func = func
+        self.tags = set(tags)
+
+
+def check(name, title, tags=()):
+    def register(func):
+        if name in CHECKS:
+            raise ValueError(f"Check '{name}' is already registered")
+        CHECKS[name] = Check(name, title, func, tags)
+        return func
+    return register
+
+
+def _jsonable(value):
+    if isinstance(value, (np.integer, np.bool_)):
+        return value.item()
+    if isinstance(value, np.floating):
+        return None if np.isnan(value) else value.item()
+    if isinstance(value, float) and np.isnan(value):
+        return None
+    if isinstance(value, dict):
+        return {str(k): _jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(v) for v in value]
+    return value
+
+
+class CheckResult:
+    def __init__(self, check):
+        self.name = check.name
+        self.title = check.title
+        self.status = 'ok'
+        self.lines = []
+        self.metrics = {}
+        self.duration = None
+        self.error = None
+
+    def print(self, text=''):
+        self.lines.append(str(text))
+
+    def table(self, df, **kwargs):
+        self.lines.append(df.to_string(**kwargs))
+
+    def metric(self, key, value):
+        self.metrics[key] = _jsonable(value)
+        return value
+
+    def set_status(self, status):
+        if CHECK_STATUSES.index(status) > CHECK_STATUSES.index(self.status):
+            self.status = status
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'title': self.title,
+            'status': self.status,
+            'duration_s': self.duration,
+            'metrics': self.metrics,
+            'error': self.error,
+        }
+
+
+def select_checks(names=None, tags=None):
+    unknown = [name for name in names or [] if name not in CHECKS]
+    if unknown:
+        raise KeyError(f'Unknown checks {unknown}, expected some of {list(CHECKS)}')
+
+    selected = []
+    for name, registered in CHECKS.items():
+        if names and name not in names:
+            continue
+        if tags and not registered.tags & set(tags):
+            continue
+        selected.append(registered)
+    return selected
+
+
+def _run_check(registered, context):
+    result = CheckResult(registered)
+    start = time.perf_counter()
+    try:
+        registered.func(context, result)
+    except Exception:
+        result.status = 'error'
+        result.error = traceback.format_exc()
+    result.duration = time.perf_counter() - start
+    return result
+
+
+def run_checks(context, names=None, tags=None, max_workers=None):
+    selected = select_checks(names, tags)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(_run_check, registered, context) for registered in selected]
+        return [future.result() for future in futures]
+
+
+def print_results(results):
+    for i, result in enumerate(results, start=1):
+        print('\n' + '=' * 80)
+        print(f'{i}. {result.title}')
+        print('=' * 80)
+        for line in result.lines:
+            print(line)
+        if result.error is not None:
+            print(result.error)
+
+
+def _flatten(metrics, prefix=''):
+    for key, value in metrics.items():
+        if isinstance(value, dict):
+            yield from _flatten(value, f'{prefix}{key}.')
+        else:
+            yield f'{prefix}{key}', value
+
+
+def results_frame(results):
+    rows = []
+    for result in results:
+        for key, value in _flatten(result.metrics):
+            rows.append({'check': result.name, 'status': result.status, 'metric': key, 'value': value})
+    return pd.DataFrame(rows, columns=['check', 'status', 'metric', 'value'])
+
+
+def write_report(results, path):
+    if path.endswith('.csv'):
+        results_frame(results).to_csv(path, index=False)
+    else:
+        with open(path, 'w') as f:
+            json.dump({
+                'statuses': {result.name: result.status for result in results},
+                'checks': [result.to_dict() for result in results],
+            }, f, indent=2)
+    return path
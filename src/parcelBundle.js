@@ -0,0 +1,78 @@
+const BUNDLE_MAGIC = 'PBND'
+const BUNDLE_VERSION = 1
+
+const ARRAY_TYPES = {
+  uint8: Uint8Array,
+  uint16: Uint16Array,
+  uint32: Uint32Array,
+  int16: Int16Array,
+  int32: Int32Array,
+  float32: Float32Array,
+  float64: Float64Array
+}
+
+// The bundle stores little-endian arrays, which typed arrays can only view in
+// place on little-endian machines (every browser platform in practice).
+const LITTLE_ENDIAN = new Uint8Array(new Uint16Array([1]).buffer)[0] === 1
+
+function decodeParcelBundle(buffer) {
+  const view = new DataView(buffer)
+  const magic = new TextDecoder().decode(new Uint8Array(buffer, 0, BUNDLE_MAGIC.length))
+  if (magic !== BUNDLE_MAGIC) {
+    throw new Error('Not a parcel bundle')
+  }
+  if (!LITTLE_ENDIAN) {
+    throw new Error('Parcel bundles need a little-endian platform')
+  }
+
+  const headerLength = view.getUint32(BUNDLE_MAGIC.length, true)
+  const headerStart = BUNDLE_MAGIC.length + 4
+  const header = JSON.parse(new TextDecoder().decode(new Uint8Array(buffer, headerStart, headerLength)))
+  if (header.version !== BUNDLE_VERSION) {
+    throw new Error(`Unsupported parcel bundle version ${header.version}, expected ${BUNDLE_VERSION}`)
+  }
+
+  const dataStart = headerStart + headerLength
+  const columns = {}
+  const dictionaries = {}
+  const missing = {}
+  for (const spec of header.columns) {
+    const ArrayType = ARRAY_TYPES[spec.type === 'dictionary' ? spec.codes : spec.type]
+    columns[spec.name] = new ArrayType(buffer, dataStart + spec.offset, header.rows)
+    if (spec.type === 'dictionary') {
+      dictionaries[spec.name] = spec.dictionary
+    } else if ('missing' in spec) {
+      missing[spec.name] = spec.missing
+    }
+  }
+
+  return {
+    rows: header.rows,
+    columns,
+    dictionaries,
+    missing,
+    value(name, row) {
+      const value = columns[name][row]
+      if (name in dictionaries) return dictionaries[name][value]
+      return value === missing[name] ? null : value
+    },
+    row(row) {
+      const record = {}
+      for (const name of Object.keys(columns)) {
+        record[name] = this.value(name, row)
+      }
+      return record
+    }
+  }
+}
+
+async function loadParcelBundle(url) {
+  const response = await fetch(url)
+  return decodeParcelBundle(await response.arrayBuffer())
+}
+
+export const ParcelBundle = {
+  decodeParcelBundle,
+  loadParcelBundle,
+  BUNDLE_VERSION
+}
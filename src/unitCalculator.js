@@ -74,6 +74,18 @@ const PARCEL_FIELDS = [
   'DIST_Marina', 'DIST_Mission'
 ]
 
+// Fields a height rule changes. The rest of parcel_z and unit capacity comes
+// precomputed from the pipeline as fixed_z and fixed_units.
+const VARIABLE_PROB_FIELDS = ['Height_Ft', 'Env_1000_Area_Height', 'SDB_2016_5Plus']
+
+// The SDB rule the pipeline's fill_sdb_columns applies, reapplied when a height rule changes a parcel.
+const SDB_ENVELOPE_THRESHOLD = 9.0
+const SDB_HEIGHT_CAP = 130
+
+function computeSdbQualification(envelope, height) {
+  return envelope > SDB_ENVELOPE_THRESHOLD && height <= SDB_HEIGHT_CAP ? 1 : 0
+}
+
 function sigmoid(z) {
   return 1 / (1 + Math.exp(-z))
 }
@@ -116,6 +128,36 @@ function calcExpectedUnits(parcel, scenario) {
   return prob * units
 }
 
+function calc20YearProbabilityFromZ(parcelZ, scenario) {
+  let probNotDeveloped = 1.0
+  for (let year = 2026; year <= 2045; year++) {
+    const macro = MACRO_SCENARIOS[year]
+    const price = scenario === 'high' ? macro.priceHigh : macro.priceLow
+    const z = PROB_WEIGHTS.Intercept + PROB_WEIGHTS.Const_Costs_Real * macro.costs + PROB_WEIGHTS.Zillow_Price_Real * price + parcelZ
+    probNotDeveloped *= (1 - sigmoid(z))
+  }
+  return 1 - probNotDeveloped
+}
+
+function calcVariableTerms(parcel) {
+  let z = 0
+  for (const field of VARIABLE_PROB_FIELDS) {
+    z += PROB_WEIGHTS[field] * (parcel[field] || 0)
+  }
+  const units = UNITS_WEIGHTS.Env_1000_Area_Height * (parcel.Env_1000_Area_Height || 0) +
+    UNITS_WEIGHTS.SDB_2016_5Plus_EnvFull * (parcel.SDB_2016_5Plus_EnvFull || 0)
+  return { z, units }
+}
+
+// Same result as calcExpectedUnits for parcels carrying the exported
+// fixed_z and fixed_units, summed in the pipeline's order.
+function calcExpectedUnitsFromTerms(parcel, scenario) {
+  const variable = calcVariableTerms(parcel)
+  const prob = calc20YearProbabilityFromZ(parcel.fixed_z + variable.z, scenario)
+  const units = Math.max(0, variable.units + parcel.fixed_units)
+  return prob * units
+}
+
 function calcTotalExpectedUnits(parcels, scenario) {
   return parcels.reduce((sum, parcel) => sum + calcExpectedUnits(parcel, scenario), 0)
 }
@@ -125,8 +167,14 @@ export const UnitCalculator = {
   calc20YearProbability,
   calcUnitsIfRedeveloped,
   calcExpectedUnits,
+  calc20YearProbabilityFromZ,
+  calcVariableTerms,
+  calcExpectedUnitsFromTerms,
   calcTotalExpectedUnits,
+  computeSdbQualification,
   PROB_WEIGHTS,
   UNITS_WEIGHTS,
-  MACRO_SCENARIOS
+  MACRO_SCENARIOS,
+  SDB_ENVELOPE_THRESHOLD,
+  SDB_HEIGHT_CAP
 }
@@ -0,0 +1,55 @@
+import { ParcelBundle } from '../src/parcelBundle.js'
+import { readFileSync } from 'fs'
+import { parse } from 'csv-parse/sync'
+import { fileURLToPath } from 'url'
+import { dirname, join } from 'path'
+
+const __filename = fileURLToPath(import.meta.url)
+const __dirname = dirname(__filename)
+
+const dataDir = join(__dirname, '../public/data')
+const file = readFileSync(join(dataDir, 'parcels.bin'))
+const bundle = ParcelBundle.decodeParcelBundle(file.buffer.slice(file.byteOffset, file.byteOffset + file.byteLength))
+const modelRows = parse(readFileSync(join(dataDir, 'parcels-model.csv'), 'utf-8'), { columns: true, skip_empty_lines: true })
+
+console.log(`Loaded ${bundle.rows.toLocaleString()} parcels, ${Object.keys(bundle.columns).length} columns from the bundle`)
+console.log(`Loaded ${modelRows.length.toLocaleString()} model parcels from CSV`)
+
+const rowOf = new Map()
+for (let i = 0; i < bundle.rows; i++) {
+  rowOf.set(bundle.value('mapblklot', i), i)
+}
+
+// Measures are stored as float32, so compare to float32 precision.
+const RELATIVE_TOLERANCE = 1e-6
+let checked = 0
+let mismatches = 0
+let missing = 0
+for (const row of modelRows) {
+  const i = rowOf.get(row.BlockLot)
+  if (i === undefined) {
+    missing++
+    continue
+  }
+  for (const [column, text] of Object.entries(row)) {
+    if (column === 'BlockLot' || !(column in bundle.columns)) continue
+    const expected = parseFloat(text)
+    const actual = bundle.value(column, i)
+    checked++
+    if (isNaN(expected) ? !(actual === null || Number.isNaN(actual)) : Math.abs(actual - expected) > RELATIVE_TOLERANCE * Math.max(1, Math.abs(expected))) {
+      if (mismatches < 10) console.log(`  ${row.BlockLot} ${column}: expected ${text}, got ${actual}`)
+      mismatches++
+    }
+  }
+}
+
+console.log(`\nChecked ${checked.toLocaleString()} model values`)
+console.log(`Missing parcels: ${missing}`)
+console.log(`Mismatches: ${mismatches}`)
+
+const withDistance = bundle.columns.distance_to_transit.filter(Number.isFinite).length
+console.log(`Parcels with distance_to_transit: ${withDistance.toLocaleString()}`)
+
+if (missing || mismatches || !('centroid_lat' in bundle.columns)) {
+  process.exitCode = 1
+}
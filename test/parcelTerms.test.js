@@ -0,0 +1,66 @@
+import { UnitCalculator } from '../src/unitCalculator.js'
+import { ParcelBundle } from '../src/parcelBundle.js'
+import { readFileSync } from 'fs'
+import { fileURLToPath } from 'url'
+import { dirname, join } from 'path'
+
+const __filename = fileURLToPath(import.meta.url)
+const __dirname = dirname(__filename)
+
+const UPZONED_HEIGHT = 85
+const BASELINE_TOLERANCE = 1e-12
+// Bldg_SqFt_1000 and the other non-scoring measures are float32 in the bundle,
+// so the full dot product on bundle values only agrees to float32 precision.
+const FULL_PATH_TOLERANCE = 1e-6
+
+const file = readFileSync(join(__dirname, '../public/data/parcels.bin'))
+const bundle = ParcelBundle.decodeParcelBundle(file.buffer.slice(file.byteOffset, file.byteOffset + file.byteLength))
+
+const parcels = []
+for (let i = 0; i < bundle.rows; i++) {
+  if (bundle.value('in_model', i)) parcels.push(bundle.row(i))
+}
+console.log(`Loaded ${parcels.length.toLocaleString()} model parcels from the bundle`)
+
+function upzone(parcel, height) {
+  const modified = { ...parcel }
+  modified.Height_Ft = Math.max(parcel.Height_Ft, height)
+  modified.Env_1000_Area_Height = parcel.Area_1000 * modified.Height_Ft / 10
+  modified.SDB_2016_5Plus = UnitCalculator.computeSdbQualification(modified.Env_1000_Area_Height, modified.Height_Ft)
+  modified.SDB_2016_5Plus_EnvFull = modified.SDB_2016_5Plus * modified.Env_1000_Area_Height
+  return modified
+}
+
+let failed = false
+for (const scenario of ['low', 'high']) {
+  // Baseline: the split must reproduce the pipeline's expected units. The sums
+  // match the pipeline's order, but Math.exp and numpy's exp can differ in the
+  // last bit, so allow rounding-level differences.
+  let mismatches = 0
+  let maxDiff = 0
+  let total = 0
+  for (const parcel of parcels) {
+    const units = UnitCalculator.calcExpectedUnitsFromTerms(parcel, scenario)
+    const expected = parcel[`fzp_expected_units_${scenario}`]
+    total += units
+    if (units !== expected) mismatches++
+    maxDiff = Math.max(maxDiff, Math.abs(units - expected))
+  }
+  console.log(`\n${scenario}: ${Math.round(total).toLocaleString()} units from terms, ${mismatches} not bit-identical, max diff ${maxDiff.toExponential(2)}`)
+  if (maxDiff > BASELINE_TOLERANCE) failed = true
+
+  // Upzoned: only the variable terms change, and the split must still match the full calculation.
+  let worst = 0
+  for (const parcel of parcels) {
+    const modified = upzone(parcel, UPZONED_HEIGHT)
+    const split = UnitCalculator.calcExpectedUnitsFromTerms(modified, scenario)
+    const full = UnitCalculator.calcExpectedUnits(modified, scenario)
+    worst = Math.max(worst, Math.abs(split - full) / Math.max(1, Math.abs(full)))
+  }
+  console.log(`${scenario} at ${UPZONED_HEIGHT} ft: max relative diff vs full dot product ${worst.toExponential(2)}`)
+  if (worst > FULL_PATH_TOLERANCE) failed = true
+}
+
+if (failed) {
+  process.exitCode = 1
+}